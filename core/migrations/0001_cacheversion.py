@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='Anahtar')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Damga')),
+            ],
+            options={
+                'verbose_name': 'Önbellek Damgası',
+                'verbose_name_plural': 'Önbellek Damgaları',
+            },
+        ),
+    ]
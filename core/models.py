@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+
+class CacheVersionManager(models.Manager):
+    """Süreçler arası önbellek geçersiz kılma damgaları
+    
+    Damgalar veritabanında tutulur; her süreç okuduğu damgayı kısa süre
+    (``CACHE_VERSION_TIMEOUT``) kendi önbelleğinde saklar. Önbelleğe alınan
+    değerlerin anahtarına damga eklenir; ``bump`` sonrası diğer süreçler en
+    geç bu süre dolunca yeni damgayı görür ve eski değerleri kullanmaz.
+    """
+    
+    LOCAL_KEY = 'cache_version:{key}'
+    
+    def current(self, key):
+        """Anahtarın damgası (veritabanından, kısa süreli önbellekli)"""
+        return self.current_many([key])[key]
+    
+    def current_many(self, keys):
+        """Anahtarların damgaları: {anahtar: damga}; eksikler tek sorguda okunur"""
+        local_keys = {key: self.LOCAL_KEY.format(key=key) for key in keys}
+        cached = cache.get_many(list(local_keys.values()))
+        versions = {key: cached[local_key] for key, local_key in local_keys.items() if local_key in cached}
+        
+        missing = [key for key in local_keys if key not in versions]
+        if missing:
+            stored = dict(self.filter(key__in=missing).values_list('key', 'version'))
+            loaded = {key: stored.get(key, 0) for key in missing}
+            cache.set_many(
+                {local_keys[key]: version for key, version in loaded.items()},
+                getattr(settings, 'CACHE_VERSION_TIMEOUT', 5)
+            )
+            versions.update(loaded)
+        return versions
+    
+    def bump(self, *keys):
+        """Anahtarların damgalarını tek sorguda yeniler"""
+        if not keys:
+            return
+        version = time.time_ns()
+        self.bulk_create(
+            [CacheVersion(key=key, version=version) for key in dict.fromkeys(keys)],
+            update_conflicts=True, unique_fields=['key'], update_fields=['version']
+        )
+        cache.delete_many([self.LOCAL_KEY.format(key=key) for key in keys])
+
+
+class CacheVersion(models.Model):
+    """Önbellek Damgası - Önbelleğe alınan sayım/istatistiklerin geçerlilik sürümü"""
+    
+    key = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Anahtar"
+    )
+    
+    version = models.BigIntegerField(
+        default=0,
+        verbose_name="Damga"
+    )
+    
+    objects = CacheVersionManager()
+    
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+    
+    class Meta:
+        verbose_name = "Önbellek Damgası"
+        verbose_name_plural = "Önbellek Damgaları"
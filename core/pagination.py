@@ -0,0 +1,233 @@
+"""Liste görünümleri için ortak sayfalama yardımcıları
+
+İki mod desteklenir:
+- Numaralı sayfalama: Django Paginator, toplam kayıt sayısı filtre imzasına
+  göre önbellekten okunur.
+- Keyset (seek) sayfalama: ``after``/``before`` imleçleri ile OFFSET
+  kullanmadan sonraki/önceki sayfa okunur; derin sayfalarda maliyet sabittir.
+
+Sayım önbelleği isim alanı (``orders``, ``customers`` vb.) bazında
+sürümlenir; ilgili kayıtlar değiştiğinde ``invalidate_cached_counts`` ile
+sürüm artırılır ve eski sayımlar kullanılmaz. Sürümler veritabanında
+(``CacheVersion``) tutulduğundan geçersiz kılma tüm süreçlere ulaşır.
+"""
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from core.models import CacheVersion
+
+
+COUNT_VERSION_KEY = 'list_count_version:{namespace}'
+COUNT_KEY = 'list_count:{namespace}:{version}:{signature}'
+
+# Varsayılan sıralama için keyset anahtarı
+DEFAULT_KEYSET_ORDERING = ('-created_at', '-id')
+
+
+def _count_cache_timeout():
+    return getattr(settings, 'LIST_COUNT_CACHE_TIMEOUT', 300)
+
+
+def invalidate_cached_counts(*namespaces):
+    """Verilen isim alanlarındaki önbelleğe alınmış sayımları geçersiz kılar"""
+    CacheVersion.objects.bump(*(COUNT_VERSION_KEY.format(namespace=namespace) for namespace in namespaces))
+
+
+def cached_count(queryset, namespace):
+    """Sorgunun kayıt sayısını filtre imzasına göre önbellekten döner"""
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    
+    version = CacheVersion.objects.current(COUNT_VERSION_KEY.format(namespace=namespace))
+    signature = hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
+    cache_key = COUNT_KEY.format(namespace=namespace, version=version, signature=signature)
+    
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, _count_cache_timeout())
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """Toplam sayıyı önbellekten okuyan Paginator"""
+    
+    def __init__(self, object_list, per_page, namespace, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.namespace = namespace
+    
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list, self.namespace)
+
+
+def _parse_ordering(ordering):
+    return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def encode_cursor(obj, ordering=DEFAULT_KEYSET_ORDERING):
+    """Kaydın sıralama alanlarından URL'de taşınabilir imleç üretir"""
+    values = []
+    for field_name, _ in _parse_ordering(ordering):
+        value = getattr(obj, field_name)
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering=DEFAULT_KEYSET_ORDERING):
+    """İmleci sıralama alanlarının Python değerlerine çevirir, geçersizse None"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        fields = _parse_ordering(ordering)
+        if not isinstance(values, list) or len(values) != len(fields):
+            return None
+        return [
+            model._meta.get_field(field_name).to_python(value)
+            for (field_name, _), value in zip(fields, values)
+        ]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _seek_filter(ordering, values, forward=True):
+    """(a, b) > (x, y) karşılaştırmasını OR/AND zinciri olarak kurar"""
+    fields = _parse_ordering(ordering)
+    condition = Q()
+    for index, (field_name, descending) in enumerate(fields):
+        lookup = 'lt' if descending == forward else 'gt'
+        step = Q(**{f'{field_name}__{lookup}': values[index]})
+        for previous_index, (previous_name, _) in enumerate(fields[:index]):
+            step &= Q(**{previous_name: values[previous_index]})
+        condition |= step
+    return condition
+
+
+class KeysetPage:
+    """Keyset sayfası; şablonlarda Page ile aynı temel arayüzü sunar"""
+    
+    is_keyset = True
+    number = None
+    
+    def __init__(self, object_list, paginator, has_next, has_previous, ordering):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.ordering = ordering
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def __getitem__(self, index):
+        return self.object_list[index]
+    
+    def has_next(self):
+        return self._has_next
+    
+    def has_previous(self):
+        return self._has_previous
+    
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+    
+    @cached_property
+    def next_cursor(self):
+        if self.object_list and self._has_next:
+            return encode_cursor(self.object_list[-1], self.ordering)
+        return None
+    
+    @cached_property
+    def previous_cursor(self):
+        if self.object_list and self._has_previous:
+            return encode_cursor(self.object_list[0], self.ordering)
+        return None
+
+
+class KeysetPaginator:
+    """OFFSET kullanmadan (sıralama alanları, id) imleci ile sayfalar"""
+    
+    def __init__(self, queryset, per_page, namespace=None, ordering=DEFAULT_KEYSET_ORDERING):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.namespace = namespace
+        self.ordering = tuple(ordering)
+    
+    @cached_property
+    def count(self):
+        if self.namespace:
+            return cached_count(self.queryset, self.namespace)
+        return self.queryset.count()
+    
+    @cached_property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+    
+    def get_page(self, after=None, before=None):
+        """after imlecinden sonraki veya before imlecinden önceki sayfayı döner"""
+        model = self.queryset.model
+        after_values = decode_cursor(after, model, self.ordering) if after else None
+        before_values = decode_cursor(before, model, self.ordering) if before else None
+        
+        if before_values is not None:
+            reverse_ordering = [
+                field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering
+            ]
+            rows = list(
+                self.queryset.filter(_seek_filter(self.ordering, before_values, forward=False))
+                .order_by(*reverse_ordering)[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            return KeysetPage(object_list, self, True, has_previous, self.ordering)
+        
+        queryset = self.queryset.order_by(*self.ordering)
+        if after_values is not None:
+            queryset = queryset.filter(_seek_filter(self.ordering, after_values))
+        
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next, after_values is not None, self.ordering)
+
+
+def paginate_queryset(queryset, params, per_page, namespace, ordering=DEFAULT_KEYSET_ORDERING):
+    """GET parametrelerine göre sayfa döner
+    
+    ``after``/``before`` imleci varsa ve sıralama keyset'e uygunsa keyset
+    sayfası, yoksa numaralı sayfa döner. Numaralı sayfaya da sonraki/önceki
+    imleçleri eklenir; böylece ileri/geri gezinme her zaman OFFSET'siz yapılır.
+    ``ordering`` None ise (özel sıralama) sadece numaralı sayfalama kullanılır.
+    """
+    if ordering is not None:
+        after = params.get('after')
+        before = params.get('before')
+        if after or before:
+            paginator = KeysetPaginator(queryset, per_page, namespace, ordering)
+            return paginator.get_page(after=after, before=before)
+        queryset = queryset.order_by(*ordering)
+    
+    paginator = CachedCountPaginator(queryset, per_page, namespace)
+    page = paginator.get_page(params.get('page'))
+    page.is_keyset = False
+    
+    if ordering is not None and page.object_list:
+        rows = list(page.object_list)
+        page.object_list = rows
+        page.next_cursor = encode_cursor(rows[-1], ordering) if page.has_next() else None
+        page.previous_cursor = encode_cursor(rows[0], ordering) if page.has_previous() else None
+    else:
+        page.next_cursor = page.previous_cursor = None
+    return page
@@ -0,0 +1,12 @@
+"""Akışlı (StreamingHttpResponse) export'lar için ortak yardımcılar"""
+
+
+class Echo:
+    """csv.writer için yazılanı doğrudan döndüren sahte dosya nesnesi
+    
+    ``csv.writer(Echo()).writerow(row)`` satırı biçimlendirilmiş metin olarak
+    döner; satırlar belleğe toplanmadan yanıta akıtılabilir.
+    """
+    
+    def write(self, value):
+        return value
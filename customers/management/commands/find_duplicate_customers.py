@@ -0,0 +1,79 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from customers.models import Customer
+from customers.services import CustomerDuplicateService
+
+
+class Command(BaseCommand):
+    """Mükerrer olabilecek müşterileri bulur, istenirse birleştirir"""
+    
+    help = (
+        'Aktif müşteriler arasında telefon, soyad+ilçe ve fonetik ad bloklarıyla '
+        'mükerrer kayıt arar. --merge verilirse çiftler birleştirilir.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=CustomerDuplicateService.DEFAULT_THRESHOLD,
+            help='En düşük benzerlik skoru (0-1)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Ekrana yazılacak en fazla çift sayısı'
+        )
+        parser.add_argument(
+            '--csv',
+            help='Tüm çiftlerin yazılacağı CSV dosyası'
+        )
+        parser.add_argument(
+            '--merge',
+            action='store_true',
+            help='Bulunan çiftleri birleştir (siparişler kalan müşteriye taşınır)'
+        )
+    
+    def handle(self, *args, **options):
+        duplicates = CustomerDuplicateService.find_duplicates(options['threshold'])
+        customers = Customer.objects.in_bulk(
+            {pk for pair in duplicates for pk in (pair['keep_id'], pair['drop_id'])}
+        )
+        
+        def describe(pk):
+            customer = customers[pk]
+            return f'#{pk} {customer.get_full_name()} {customer.phone_number} {customer.get_short_address()}'
+        
+        for pair in duplicates[:options['limit']]:
+            self.stdout.write(f"{pair['score']:.3f}  {describe(pair['keep_id'])}  <=  {describe(pair['drop_id'])}")
+        
+        if options['csv']:
+            with open(options['csv'], 'w', encoding='utf-8', newline='') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=['keep_id', 'drop_id', 'score'])
+                writer.writeheader()
+                writer.writerows(duplicates)
+        
+        self.stdout.write(self.style.SUCCESS(f'{len(duplicates)} olası mükerrer çift bulundu.'))
+        
+        if options['merge']:
+            merged_ids = set()
+            merged_count = moved_orders = 0
+            for pair in duplicates:
+                # Bu çalışmada birleştirilen kayıtlar tekrar kullanılmaz (zincir birleştirme yok)
+                if merged_ids & {pair['keep_id'], pair['drop_id']}:
+                    continue
+                try:
+                    moved_orders += CustomerDuplicateService.merge(pair['keep_id'], pair['drop_id'])
+                except ValidationError as e:
+                    self.stderr.write(f"#{pair['drop_id']}: {'; '.join(e.messages)}")
+                    continue
+                merged_ids.update((pair['keep_id'], pair['drop_id']))
+                merged_count += 1
+            
+            self.stdout.write(self.style.SUCCESS(
+                f'{merged_count} müşteri birleştirildi, {moved_orders} sipariş taşındı.'
+            ))
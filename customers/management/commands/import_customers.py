@@ -0,0 +1,78 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from customers.services import CustomerImportService
+
+
+class Command(BaseCommand):
+    """CSV dosyasındaki müşterileri toplu aktarır"""
+    
+    help = (
+        'Bayi müşteri listelerini (CSV, ; veya , ayırıcılı) aktarır. Telefonu kayıtlı '
+        'veya dosyada tekrar eden satırlar atlanır, hatalı satırlar raporlanır.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV dosyası')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Müşterileri oluşturan kullanıcı adı'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CustomerImportService.CHUNK_SIZE,
+            help='Tek seferde işlenecek satır sayısı'
+        )
+        parser.add_argument(
+            '--encoding',
+            default='utf-8-sig',
+            help='Dosya karakter kodlaması (Excel çıktıları için cp1254 olabilir)'
+        )
+        parser.add_argument(
+            '--report',
+            help='Satır bazlı raporun yazılacağı CSV dosyası'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Kayıt eklemeden sadece raporla'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Kullanıcı bulunamadı: {options['user']}")
+        
+        try:
+            with open(options['path'], encoding=options['encoding'], newline='') as stream:
+                report = CustomerImportService.import_csv(
+                    stream, user, chunk_size=options['chunk_size'], dry_run=options['dry_run']
+                )
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f'Dosya okunamadı: {e}')
+        
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8', newline='') as report_file:
+                writer = csv.DictWriter(
+                    report_file, fieldnames=['line', 'status', 'phone_number', 'name', 'message']
+                )
+                writer.writeheader()
+                writer.writerows(report['rows'])
+        else:
+            for row in report['rows']:
+                if row['status'] != CustomerImportService.CREATED:
+                    self.stdout.write(f"{row['line']}: {row['status']} - {row['name']} {row['phone_number']} {row['message']}")
+        
+        prefix = 'Deneme: ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{report['created']} müşteri eklendi, {report['skipped']} satır atlandı, "
+            f"{report['invalid']} satır hatalı."
+        ))
@@ -0,0 +1,24 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from customers.services import CustomerDuplicateService
+
+
+class Command(BaseCommand):
+    """İki müşteri kaydını birleştirir"""
+    
+    help = 'Düşen müşterinin siparişlerini kalan müşteriye taşır ve düşen kaydı pasifleştirir'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('keep_id', type=int, help='Kalacak müşteri')
+        parser.add_argument('drop_id', type=int, help='Birleştirilip pasifleştirilecek müşteri')
+    
+    def handle(self, *args, **options):
+        try:
+            moved = CustomerDuplicateService.merge(options['keep_id'], options['drop_id'])
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"#{options['drop_id']} müşterisi #{options['keep_id']} ile birleştirildi, {moved} sipariş taşındı."
+        ))
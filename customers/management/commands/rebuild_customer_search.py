@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from customers import search
+
+
+class Command(BaseCommand):
+    """Müşteri tam metin arama tablosunu yeniden doldurur"""
+    
+    help = 'Müşteri FTS arama tablosunu müşteri kayıtlarından yeniden oluşturur'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Arama tablosunun bulunduğu veritabanı'
+        )
+    
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_available(using):
+            raise CommandError('Bu veritabanında müşteri arama tablosu bulunmuyor.')
+        
+        search.rebuild_search_index(using)
+        self.stdout.write(self.style.SUCCESS('Müşteri arama tablosu yeniden oluşturuldu.'))
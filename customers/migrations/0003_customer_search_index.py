@@ -0,0 +1,84 @@
+from django.db import migrations
+
+
+class SQLiteRunSQL(migrations.RunSQL):
+    """Sadece SQLite veritabanlarında çalışan RunSQL (FTS5 SQLite'a özgü)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+# customers.search modülündeki tanımların bu migration anındaki kopyası;
+# modül değişse de migration aynı şemayı kurar
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS customers_customer_fts USING fts5(
+        name, phone, location, address,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customers_customer_fts_ai AFTER INSERT ON customers_customer BEGIN
+        INSERT INTO customers_customer_fts (rowid, name, phone, location, address) VALUES (
+            new.id,
+            replace(replace(new.first_name || ' ' || new.last_name, 'İ', 'i'), 'ı', 'i'),
+            ltrim(new.phone_number, '0'),
+            replace(replace(new.city || ' ' || new.district || ' ' || new.neighborhood, 'İ', 'i'), 'ı', 'i'),
+            replace(replace(new.address, 'İ', 'i'), 'ı', 'i')
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customers_customer_fts_au AFTER UPDATE OF
+        first_name, last_name, phone_number, city, district, neighborhood, address
+    ON customers_customer BEGIN
+        DELETE FROM customers_customer_fts WHERE rowid = old.id;
+        INSERT INTO customers_customer_fts (rowid, name, phone, location, address) VALUES (
+            new.id,
+            replace(replace(new.first_name || ' ' || new.last_name, 'İ', 'i'), 'ı', 'i'),
+            ltrim(new.phone_number, '0'),
+            replace(replace(new.city || ' ' || new.district || ' ' || new.neighborhood, 'İ', 'i'), 'ı', 'i'),
+            replace(replace(new.address, 'İ', 'i'), 'ı', 'i')
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customers_customer_fts_ad AFTER DELETE ON customers_customer BEGIN
+        DELETE FROM customers_customer_fts WHERE rowid = old.id;
+    END
+    """,
+    'DELETE FROM customers_customer_fts',
+    """
+    INSERT INTO customers_customer_fts (rowid, name, phone, location, address)
+    SELECT
+        id,
+        replace(replace(first_name || ' ' || last_name, 'İ', 'i'), 'ı', 'i'),
+        ltrim(phone_number, '0'),
+        replace(replace(city || ' ' || district || ' ' || neighborhood, 'İ', 'i'), 'ı', 'i'),
+        replace(replace(address, 'İ', 'i'), 'ı', 'i')
+    FROM customers_customer
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS customers_customer_fts_ai',
+    'DROP TRIGGER IF EXISTS customers_customer_fts_au',
+    'DROP TRIGGER IF EXISTS customers_customer_fts_ad',
+    'DROP TABLE IF EXISTS customers_customer_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_last_name_idx'),
+    ]
+
+    operations = [
+        SQLiteRunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+
+class SQLiteRunSQL(migrations.RunSQL):
+    """Sadece SQLite veritabanlarında çalışan RunSQL (FTS5 SQLite'a özgü)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+# Tetikleyiciler turkish_fold fonksiyonu yerine yerleşik replace ile katlar;
+# müşteri tablosu Django dışından da yazılabilir
+FORWARD_SQL = [
+    'DROP TRIGGER IF EXISTS customers_customer_fts_ai',
+    'DROP TRIGGER IF EXISTS customers_customer_fts_au',
+    """
+    CREATE TRIGGER customers_customer_fts_ai AFTER INSERT ON customers_customer BEGIN
+        INSERT INTO customers_customer_fts (rowid, name, phone, location, address) VALUES (
+            new.id,
+            replace(replace(new.first_name || ' ' || new.last_name, 'İ', 'i'), 'ı', 'i'),
+            ltrim(new.phone_number, '0'),
+            replace(replace(new.city || ' ' || new.district || ' ' || new.neighborhood, 'İ', 'i'), 'ı', 'i'),
+            replace(replace(new.address, 'İ', 'i'), 'ı', 'i')
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER customers_customer_fts_au AFTER UPDATE OF
+        first_name, last_name, phone_number, city, district, neighborhood, address
+    ON customers_customer BEGIN
+        DELETE FROM customers_customer_fts WHERE rowid = old.id;
+        INSERT INTO customers_customer_fts (rowid, name, phone, location, address) VALUES (
+            new.id,
+            replace(replace(new.first_name || ' ' || new.last_name, 'İ', 'i'), 'ı', 'i'),
+            ltrim(new.phone_number, '0'),
+            replace(replace(new.city || ' ' || new.district || ' ' || new.neighborhood, 'İ', 'i'), 'ı', 'i'),
+            replace(replace(new.address, 'İ', 'i'), 'ı', 'i')
+        );
+    END
+    """,
+    'DELETE FROM customers_customer_fts',
+    """
+    INSERT INTO customers_customer_fts (rowid, name, phone, location, address)
+    SELECT
+        id,
+        replace(replace(first_name || ' ' || last_name, 'İ', 'i'), 'ı', 'i'),
+        ltrim(phone_number, '0'),
+        replace(replace(city || ' ' || district || ' ' || neighborhood, 'İ', 'i'), 'ı', 'i'),
+        replace(replace(address, 'İ', 'i'), 'ı', 'i')
+    FROM customers_customer
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_search_index'),
+    ]
+
+    operations = [
+        SQLiteRunSQL(FORWARD_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,14 +1,38 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.core.validators import RegexValidator
 from django.urls import reverse
 from django.utils import timezone
 
 from accounts.models import User
+from core.models import CacheVersion
+from core.pagination import invalidate_cached_counts
+
+# Renk sınıfları ve istatistik grupları
+COLOR_CLASSES = [
+    ('#0d5016', 'A Sınıfı'),
+    ('#2c9c3e', 'B Sınıfı'),
+    ('#8bc34a', 'C Sınıfı'),
+    ('#ffeb3b', 'D Sınıfı'),
+    ('#ff9800', 'E Sınıfı'),
+    ('#ff5722', 'F Sınıfı'),
+    ('#d32f2f', 'G Sınıfı'),
+]
+COLOR_CATEGORIES = {color_code: color_name.split()[0] for color_code, color_name in COLOR_CLASSES}
+PREMIUM_COLORS = ['#0d5016', '#2c9c3e']
+STANDARD_COLORS = ['#8bc34a', '#ffeb3b']
+ATTENTION_COLORS = ['#ff9800', '#ff5722', '#d32f2f']
+
 
 # Create your models here.
 class CustomerManager(models.Manager):
     """Customer modeli için optimized manager"""
     
+    # Damga veritabanında tutulur (CacheVersion), geçersiz kılma tüm süreçlere ulaşır
+    STATS_CACHE_KEY = 'customer_stats_snapshot:{version}'
+    STATS_VERSION_KEY = 'customer_stats_snapshot'
+    
     def get_queryset(self):
         """Base queryset with select_related for better performance"""
         return super().get_queryset().select_related('created_by')
@@ -70,6 +94,13 @@ class CustomerManager(models.Manager):
         if not query:
             return self.none()
         
+        # Tam metin araması (Türkçe harf katlamalı, önek eşleşmeli, sıralı)
+        from .search import search_queryset
+        results = search_queryset(self.get_queryset(), query)
+        if results is not None:
+            return results
+        
+        # FTS yoksa alan bazlı arama
         # Telefon numarası temizle
         clean_phone = ''.join(filter(str.isdigit, query))
         
@@ -85,62 +116,101 @@ class CustomerManager(models.Manager):
     
     def bulk_activate(self, customer_ids):
         """Toplu aktifleştirme"""
-        return self.filter(id__in=customer_ids).update(
+        updated = self.filter(id__in=customer_ids).update(
             is_active=True,
             updated_at=timezone.now()
         )
+        invalidate_cached_counts('customers')
+        self.invalidate_stats()
+        return updated
     
     def bulk_deactivate(self, customer_ids):
         """Toplu pasifleştirme"""
-        return self.filter(id__in=customer_ids).update(
+        updated = self.filter(id__in=customer_ids).update(
             is_active=False,
             updated_at=timezone.now()
         )
+        invalidate_cached_counts('customers')
+        self.invalidate_stats()
+        return updated
+    
+    def stats_snapshot(self):
+        """(renk, aktiflik, şehir, adet) satırları; tek gruplu sorgu, önbellekli
+        
+        Genel, renk ve şehir istatistiklerinin hepsi bu satırlardan türetilir.
+        Müşteri kaydı, silme ve toplu güncellemeler önbellek damgasını yeniler.
+        """
+        cache_key = self.STATS_CACHE_KEY.format(version=CacheVersion.objects.current(self.STATS_VERSION_KEY))
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            snapshot = list(
+                super().get_queryset().order_by().values_list('color', 'is_active', 'city').annotate(
+                    count=models.Count('id')
+                )
+            )
+            cache.set(
+                cache_key, snapshot,
+                getattr(settings, 'CUSTOMER_STATS_CACHE_TIMEOUT', 300)
+            )
+        return snapshot
+    
+    def invalidate_stats(self):
+        """İstatistik önbelleğinin damgasını yeniler"""
+        CacheVersion.objects.bump(self.STATS_VERSION_KEY)
     
     def stats(self):
         """Müşteri istatistikleri"""
-        total = self.count()
-        active = self.active().count()
-        inactive = self.inactive().count()
+        total = active = 0
+        color_counts = {color_code: 0 for color_code, _ in COLOR_CLASSES}
+        for color, is_active, _, count in self.stats_snapshot():
+            total += count
+            if is_active:
+                active += count
+            color_counts[color] = color_counts.get(color, 0) + count
+        inactive = total - active
+        
+        def percentage(count):
+            return round((count / total * 100) if total > 0 else 0, 2)
         
         # Renk bazlı istatistikler
-        color_stats = {}
-        for color_code, color_name in [
-            ('#0d5016', 'A Sınıfı'),
-            ('#2c9c3e', 'B Sınıfı'),
-            ('#8bc34a', 'C Sınıfı'),
-            ('#ffeb3b', 'D Sınıfı'),
-            ('#ff9800', 'E Sınıfı'),
-            ('#ff5722', 'F Sınıfı'),
-            ('#d32f2f', 'G Sınıfı'),
-        ]:
-            count = self.filter(color=color_code).count()
-            color_stats[color_name] = {
-                'count': count,
-                'percentage': round((count / total * 100) if total > 0 else 0, 2)
-            }
+        color_stats = {
+            color_name: {'count': color_counts[color_code], 'percentage': percentage(color_counts[color_code])}
+            for color_code, color_name in COLOR_CLASSES
+        }
         
         return {
             'total': total,
             'active': active,
             'inactive': inactive,
-            'active_percentage': round((active / total * 100) if total > 0 else 0, 2),
-            'premium_customers': self.premium_customers().count(),
-            'attention_needed': self.attention_needed_customers().count(),
+            'active_percentage': percentage(active),
+            'premium_customers': sum(color_counts[color] for color in PREMIUM_COLORS),
+            'standard_customers': sum(color_counts[color] for color in STANDARD_COLORS),
+            'attention_needed': sum(color_counts[color] for color in ATTENTION_COLORS),
+            'color_counts': color_counts,
             'color_breakdown': color_stats
         }
     
+    def cities_with_count(self):
+        """Şehirler ve müşteri sayıları (çoktan aza), istatistik önbelleğinden"""
+        city_counts = {}
+        for _, _, city, count in self.stats_snapshot():
+            city_counts[city] = city_counts.get(city, 0) + count
+        return [
+            {'city': city, 'count': count}
+            for city, count in sorted(city_counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+    
     def premium_customers(self):
         """Premium müşteriler (A ve B sınıfı)"""
-        return self.filter(color__in=['#0d5016', '#2c9c3e'])
+        return self.filter(color__in=PREMIUM_COLORS)
     
     def standard_customers(self):
         """Standart müşteriler (C ve D sınıfı)"""
-        return self.filter(color__in=['#8bc34a', '#ffeb3b'])
+        return self.filter(color__in=STANDARD_COLORS)
     
     def attention_needed_customers(self):
         """Dikkat gereken müşteriler (E, F, G sınıfı)"""
-        return self.filter(color__in=['#ff9800', '#ff5722', '#d32f2f'])
+        return self.filter(color__in=ATTENTION_COLORS)
 
 
 class Customer(models.Model):
@@ -254,6 +324,7 @@ class Customer(models.Model):
             models.Index(fields=['city', 'district'], name='city_district_idx'),
             models.Index(fields=['is_active', 'created_at'], name='active_created_idx'),
             models.Index(fields=['first_name', 'last_name'], name='full_name_idx'),
+            models.Index(fields=['last_name'], name='last_name_idx'),
             models.Index(fields=['created_by', 'is_active'], name='creator_active_idx'),
             models.Index(fields=['color', 'is_active'], name='color_active_idx'),
             models.Index(fields=['color', 'city'], name='color_city_idx'),
@@ -313,24 +384,12 @@ class Customer(models.Model):
     @property
     def color_category(self):
         """Renk kategorisini döndürür (A, B, C, D, E, F, G)"""
-        color_map = {
-            '#0d5016': 'A',
-            '#2c9c3e': 'B',
-            '#8bc34a': 'C', 
-            '#ffeb3b': 'D',
-            '#ff9800': 'E',
-            '#ff5722': 'F',
-            '#d32f2f': 'G'
-        }
-        return color_map.get(self.color, 'D')
+        return COLOR_CATEGORIES.get(self.color, 'D')
     
     @property
     def color_display_name(self):
         """Renk görüntü adını döndürür"""
-        for choice in self.COLOR_CHOICES:
-            if choice[0] == self.color:
-                return choice[1]
-        return "Bilinmeyen"
+        return dict(self.COLOR_CHOICES).get(self.color, "Bilinmeyen")
     
     @property
     def is_premium_customer(self):
@@ -380,11 +439,21 @@ class Customer(models.Model):
             models.Q(phone_number__icontains=query)
         )
     
+    @staticmethod
+    def normalize_name(value):
+        """İsim, şehir, ilçe ve mahalle alanlarının kayıt biçimi"""
+        return value.strip().title()
+    
+    @staticmethod
+    def normalize_phone(value):
+        """Telefon numarasının kayıt biçimi (sadece rakamlar)"""
+        return ''.join(filter(str.isdigit, value))
+    
     def save(self, *args, **kwargs):
         """Kaydetmeden önce veri temizleme ve validasyon"""
         # İsim ve soyismi başharflerini büyük yap
-        self.first_name = self.first_name.strip().title()
-        self.last_name = self.last_name.strip().title()
+        self.first_name = self.normalize_name(self.first_name)
+        self.last_name = self.normalize_name(self.last_name)
         
         # Boş isim kontrolü
         if not self.first_name:
@@ -393,13 +462,23 @@ class Customer(models.Model):
             raise ValueError("Soyad alanı boş olamaz")
         
         # Şehir ve ilçe isimlerini düzenle
-        self.city = self.city.strip().title()
-        self.district = self.district.strip().title()
-        self.neighborhood = self.neighborhood.strip().title()
+        self.city = self.normalize_name(self.city)
+        self.district = self.normalize_name(self.district)
+        self.neighborhood = self.normalize_name(self.neighborhood)
         
         # Telefon numarasını temizle (sadece rakamlar)
-        self.phone_number = ''.join(filter(str.isdigit, self.phone_number))
+        self.phone_number = self.normalize_phone(self.phone_number)
         
         super().save(*args, **kwargs)
+        
+        # Liste sayım ve istatistik önbelleklerini geçersiz kıl
+        invalidate_cached_counts('customers')
+        Customer.objects.invalidate_stats()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_counts('customers')
+        Customer.objects.invalidate_stats()
+        return result
 
 
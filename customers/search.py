@@ -0,0 +1,199 @@
+"""Müşteri tam metin araması (SQLite FTS5)
+
+Ad, telefon, konum ve adres ``customers_customer_fts`` sanal tablosunda
+tutulur ve müşteri tablosundaki tetikleyicilerle güncel kalır. Tetikleyiciler
+yalnızca yerleşik SQL fonksiyonlarını kullanır; müşteri tablosu Django
+dışından (sqlite3 komut satırı, yedekten dönüş vb.) da güncellenebilir.
+
+Türkçe harf katlama iki adımda yapılır: ``unicode61`` ayırıcısı büyük/küçük
+harf ve şapka/çengel farklarını kaldırır (Ş -> s, Ğ -> g, Ü -> u, Ö -> o,
+Ç -> c, Â -> a). Ayırıcının katlayamadığı noktalı/noktasız i (İ, ı)
+tetikleyicilerde ``replace`` ile ``i`` yapılır. Arama ifadesi aynı sonucu
+veren ``fold_turkish`` ile hazırlanır.
+
+FTS5 kullanılamıyorsa (başka veritabanı, tablo yok) arama fonksiyonları
+``None`` döner ve çağıranlar ``icontains`` aramasına geri düşer.
+"""
+import re
+
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'customers_customer_fts'
+
+# Ad sütunu en yüksek ağırlıkta; bm25 değeri küçüldükçe eşleşme iyileşir
+RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+TURKISH_FOLD_MAP = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'î': 'i', 'Î': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u', 'û': 'u', 'Û': 'u',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+    'Â': 'a', 'â': 'a',
+})
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def _fold_sql(expression):
+    # unicode61 ayırıcısının katlamadığı Türkçe i harfleri
+    return f"replace(replace({expression}, 'İ', 'i'), 'ı', 'i')"
+
+
+def _row_values(prefix=''):
+    """FTS satırının (rowid, name, phone, location, address) SQL ifadeleri"""
+    return ', '.join([
+        f'{prefix}id',
+        _fold_sql(f"{prefix}first_name || ' ' || {prefix}last_name"),
+        f"ltrim({prefix}phone_number, '0')",
+        _fold_sql(f"{prefix}city || ' ' || {prefix}district || ' ' || {prefix}neighborhood"),
+        _fold_sql(f'{prefix}address'),
+    ])
+
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, phone, location, address,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON customers_customer BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, phone, location, address) VALUES ({_row_values('new.')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF
+        first_name, last_name, phone_number, city, district, neighborhood, address
+    ON customers_customer BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} (rowid, name, phone, location, address) VALUES ({_row_values('new.')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON customers_customer BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+
+DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+REBUILD_SQL = [
+    f'DELETE FROM {FTS_TABLE}',
+    f"""
+    INSERT INTO {FTS_TABLE} (rowid, name, phone, location, address)
+    SELECT {_row_values()} FROM customers_customer
+    """,
+]
+
+# Tablosu bulunan bağlantı takma adları (her aramada şema sorgusu yapılmasın)
+_ready_aliases = set()
+
+
+def fold_turkish(text):
+    """Türkçe büyük/küçük harf ve şapkalı harf farklarını kaldırır"""
+    if text is None:
+        return ''
+    return text.translate(TURKISH_FOLD_MAP).lower()
+
+
+def is_available(using='default'):
+    """FTS tablosu bu veritabanında var mı?"""
+    if using in _ready_aliases:
+        return True
+    
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    
+    with connection.cursor() as cursor:
+        if FTS_TABLE not in connection.introspection.table_names(cursor):
+            return False
+    _ready_aliases.add(using)
+    return True
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_index(connection):
+    """FTS tablosunu ve tetikleyicileri oluşturup mevcut müşterilerle doldurur"""
+    _execute(connection, CREATE_SQL)
+    _execute(connection, REBUILD_SQL)
+
+
+def drop_search_index(connection):
+    """FTS tablosunu ve tetikleyicileri kaldırır"""
+    _execute(connection, DROP_SQL)
+    _ready_aliases.discard(connection.alias)
+
+
+def rebuild_search_index(using='default'):
+    """FTS tablosunu müşteri tablosundan yeniden doldurur"""
+    _execute(connections[using], REBUILD_SQL)
+
+
+def build_match_query(query):
+    """Kullanıcı girdisini FTS5 önek eşleşme ifadesine çevirir
+    
+    Harf içermeyen girdiler telefon numarası kabul edilir ve baştaki sıfırlar
+    atılarak telefon sütununda önek aranır. Diğer girdilerde her kelime
+    önek olarak aranır ve tüm kelimelerin eşleşmesi gerekir.
+    """
+    if not any(char.isalpha() for char in query):
+        digits = ''.join(filter(str.isdigit, query)).lstrip('0')
+        return f'phone : "{digits}"*' if digits else None
+    
+    tokens = TOKEN_RE.findall(fold_turkish(query))
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_queryset(queryset: QuerySet, query, ranked=True):
+    """Sorgu setini FTS eşleşmesiyle süzer; FTS kullanılamıyorsa None döner
+    
+    ``ranked`` verilirse kayıtlar ``search_rank`` (bm25) değerine göre
+    sıralanır, aksi halde sorgu setinin kendi sıralaması korunur.
+    """
+    if not is_available(queryset.db):
+        return None
+    
+    match = build_match_query(query)
+    if match is None:
+        return queryset.none()
+    
+    matched = queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+    )
+    if not ranked:
+        return matched
+    
+    # bm25 sadece eşleşmenin kendisinde hesaplanabildiği için skorlar alt
+    # sorguda bir kez hesaplanır; LIMIT -1 alt sorgunun dış sorguya katılıp
+    # her müşteri satırında eşleşmenin tekrarlanmasını engeller
+    table = queryset.model._meta.db_table
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    return matched.annotate(
+        search_rank=RawSQL(
+            f'SELECT ranks.rank FROM ('
+            f'SELECT rowid AS id, bm25({FTS_TABLE}, {weights}) AS rank '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT -1'
+            f') AS ranks WHERE ranks.id = {table}.id',
+            (match,)
+        )
+    ).order_by('search_rank', 'first_name', 'last_name', 'id')
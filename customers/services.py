@@ -1,8 +1,18 @@
+import csv
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations, islice
+
 from django.core.exceptions import ValidationError
-from django.db.models import Q, Count
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
-from django.core.paginator import Paginator
-from .models import Customer
+from core.pagination import paginate_queryset, invalidate_cached_counts
+from .models import Customer, COLOR_CATEGORIES
+
+# Akışlı export'larda veritabanından tek seferde okunacak satır sayısı
+EXPORT_CHUNK_SIZE = 500
 
 
 class CustomerService:
@@ -59,28 +69,32 @@ class CustomerService:
     
     @staticmethod
     def get_customer_list(search_query=None, color_filter=None, city_filter=None, 
-                         is_active=None, page=1, per_page=20):
+                         is_active=None, page=1, per_page=20, after=None, before=None):
         """Filtrelenmiş müşteri listesi"""
         queryset = Customer.objects.all()
         
         # Arama filtresi
         if search_query:
-            # search metodunu kullanmak yerine burada direkt filtreleme yapacağız
-            from django.db.models import Q
-            # Telefon numarası temizle
-            clean_phone = ''.join(filter(str.isdigit, search_query))
-            
-            search_q = Q(first_name__icontains=search_query) | \
-                      Q(last_name__icontains=search_query) | \
-                      Q(city__icontains=search_query) | \
-                      Q(district__icontains=search_query) | \
-                      Q(neighborhood__icontains=search_query) | \
-                      Q(address__icontains=search_query)
-            
-            if clean_phone:
-                search_q |= Q(phone_number__icontains=clean_phone)
+            # Tam metin araması; sıralama sayfalama için kayıt tarihinde kalır
+            from .search import search_queryset
+            results = search_queryset(queryset, search_query, ranked=False)
+            if results is not None:
+                queryset = results
+            else:
+                # FTS yoksa alan bazlı arama (telefon numarası temizlenir)
+                clean_phone = ''.join(filter(str.isdigit, search_query))
                 
-            queryset = queryset.filter(search_q)
+                search_q = Q(first_name__icontains=search_query) | \
+                          Q(last_name__icontains=search_query) | \
+                          Q(city__icontains=search_query) | \
+                          Q(district__icontains=search_query) | \
+                          Q(neighborhood__icontains=search_query) | \
+                          Q(address__icontains=search_query)
+                
+                if clean_phone:
+                    search_q |= Q(phone_number__icontains=clean_phone)
+                
+                queryset = queryset.filter(search_q)
         
         # Renk filtresi
         if color_filter:
@@ -94,19 +108,56 @@ class CustomerService:
         if is_active is not None:
             queryset = queryset.filter(is_active=is_active)
         
-        # Sıralama
-        queryset = queryset.order_by('-created_at', 'first_name', 'last_name')
-        
-        # Sayfalama
-        paginator = Paginator(queryset, per_page)
-        page_obj = paginator.get_page(page)
+        # Sayfalama (kayıt tarihine göre; ileri/geri gezinme keyset ile)
+        page_obj = paginate_queryset(
+            queryset, {'page': page, 'after': after, 'before': before}, per_page, 'customers'
+        )
         
         return {
             'customers': page_obj,
-            'total_count': queryset.count(),
+            'total_count': page_obj.paginator.count,
             'page_obj': page_obj
         }
     
+    @staticmethod
+    def _prefix_range(field, prefix):
+        """Önek eşleşmesini indeks kullanılabilen aralık koşuluna çevirir"""
+        return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + '\U0010ffff'})
+    
+    @staticmethod
+    def typeahead(query, page=1, page_size=20, active_only=True):
+        """Seçim kutuları için sayfalı müşteri önek araması
+        
+        Ad, soyad ve telefon önekleri indeksli aralık sorgularıyla aranır.
+        Toplam sayı hesaplanmaz; sayfadan bir fazla kayıt okunarak devamı
+        olup olmadığı belirlenir. (müşteriler, devamı_var) döner.
+        """
+        query = ' '.join(query.split())
+        if len(query) < 2:
+            return [], False
+        
+        # İsimler kaydedilirken title() ile düzenlendiği için arama da aynı biçime getirilir
+        name = query.title()
+        conditions = (
+            CustomerService._prefix_range('first_name', name)
+            | CustomerService._prefix_range('last_name', name)
+        )
+        if ' ' in name:
+            first_name, last_name = name.rsplit(' ', 1)
+            conditions |= Q(first_name=first_name) & CustomerService._prefix_range('last_name', last_name)
+        
+        digits = ''.join(filter(str.isdigit, query)).lstrip('0')
+        if len(digits) >= 3:
+            conditions |= CustomerService._prefix_range('phone_number', digits)
+        
+        queryset = Customer.objects.filter(conditions)
+        if active_only:
+            queryset = queryset.filter(is_active=True)
+        
+        offset = (max(page, 1) - 1) * page_size
+        customers = list(queryset.order_by('first_name', 'last_name', 'id')[offset:offset + page_size + 1])
+        return customers[:page_size], len(customers) > page_size
+    
     @staticmethod
     def get_customer_stats():
         """Müşteri istatistikleri"""
@@ -115,9 +166,7 @@ class CustomerService:
     @staticmethod
     def get_cities_with_count():
         """Şehirleri müşteri sayısı ile birlikte getir"""
-        return Customer.objects.values('city').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        return Customer.objects.cities_with_count()
     
     @staticmethod
     def bulk_update_color(customer_ids, new_color):
@@ -126,6 +175,8 @@ class CustomerService:
             updated = Customer.objects.filter(
                 id__in=customer_ids
             ).update(color=new_color, updated_at=timezone.now())
+            invalidate_cached_counts('customers')
+            Customer.objects.invalidate_stats()
             return updated, None
         except Exception as e:
             return 0, f"Toplu güncelleme hatası: {str(e)}"
@@ -141,35 +192,466 @@ class CustomerService:
         return Customer.objects.bulk_deactivate(customer_ids)
     
     @staticmethod
-    def export_customers_data(filters=None):
-        """Müşteri verilerini export için hazırla"""
-        queryset = Customer.objects.all()
+    def get_customers_for_export(filters=None):
+        """Export sorgusu (renk, şehir ve aktiflik filtreleriyle, id sırasında)"""
+        queryset = Customer.objects.select_related('created_by').order_by('id')
         
         if filters:
             if filters.get('color'):
-                queryset = queryset.by_color(filters['color'])
+                queryset = queryset.filter(color=filters['color'])
             if filters.get('city'):
-                queryset = queryset.by_city(filters['city'])
+                queryset = queryset.filter(city__iexact=filters['city'])
             if filters.get('is_active') is not None:
-                if filters['is_active']:
-                    queryset = queryset.active()
-                else:
-                    queryset = queryset.inactive()
+                queryset = queryset.filter(is_active=filters['is_active'])
+        
+        return queryset
+    
+    @staticmethod
+    def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+        """Müşterileri parça parça okuyup export satırlarını tek tek üretir
         
-        customers_data = []
-        for customer in queryset:
-            customers_data.append({
+        Renk sınıfı ve adı her satırda property çağrısı yerine bir kez
+        hazırlanan sözlüklerden okunur.
+        """
+        color_names = dict(Customer.COLOR_CHOICES)
+        
+        for customer in queryset.iterator(chunk_size=chunk_size):
+            yield {
                 'id': customer.id,
                 'full_name': customer.get_full_name(),
                 'phone': customer.formatted_phone,
                 'city': customer.city,
                 'district': customer.district,
                 'address': customer.get_full_address(),
-                'color_category': customer.color_category,
-                'color_display': customer.color_display_name,
+                'color_category': COLOR_CATEGORIES.get(customer.color, 'D'),
+                'color_display': color_names.get(customer.color, 'Bilinmeyen'),
                 'is_active': 'Aktif' if customer.is_active else 'Pasif',
-                'created_at': customer.created_at.strftime('%d.%m.%Y %H:%M'),
+                'created_at': timezone.localtime(customer.created_at).strftime('%d.%m.%Y %H:%M'),
                 'created_by': customer.created_by.get_full_name()
+            }
+    
+    @staticmethod
+    def export_customers_data(filters=None):
+        """Müşteri verilerini export için hazırla"""
+        return list(CustomerService.iter_export_rows(CustomerService.get_customers_for_export(filters)))
+
+
+class CustomerImportService:
+    """Bayilerden gelen CSV müşteri listelerinin toplu aktarımı
+    
+    Satırlar parça parça okunur; her parça Customer.save ile aynı biçimde
+    düzenlenir, telefon numaraları tek bir IN sorgusuyla mevcut kayıtlara
+    karşı kontrol edilir ve yeni müşteriler bulk_create ile eklenir.
+    """
+    
+    CHUNK_SIZE = 1000
+    
+    # Kabul edilen sütun başlıkları (Türkçe harfler katlanarak karşılaştırılır)
+    COLUMN_ALIASES = {
+        'first_name': ['first_name', 'ad', 'adı'],
+        'last_name': ['last_name', 'soyad', 'soyadı'],
+        'phone_number': ['phone_number', 'phone', 'telefon', 'telefon numarası'],
+        'city': ['city', 'şehir', 'sehir', 'il'],
+        'district': ['district', 'ilçe', 'ilce'],
+        'neighborhood': ['neighborhood', 'mahalle'],
+        'address': ['address', 'adres'],
+        'color': ['color', 'renk'],
+    }
+    REQUIRED_FIELDS = ['first_name', 'last_name', 'phone_number', 'city', 'district', 'address']
+    NAME_FIELDS = ['first_name', 'last_name', 'city', 'district', 'neighborhood']
+    PHONE_RE = re.compile(r'^5[0-9]{9}$')
+    
+    CREATED = 'created'
+    SKIPPED = 'skipped'
+    INVALID = 'invalid'
+    
+    @staticmethod
+    def _open_reader(stream):
+        """Başlık satırına göre ayırıcıyı (; veya ,) seçip satır okuyucu döner"""
+        header = stream.readline()
+        delimiter = ';' if header.count(';') > header.count(',') else ','
+        columns = next(csv.reader([header], delimiter=delimiter), [])
+        
+        from .search import fold_turkish
+        field_map = {}
+        for index, column in enumerate(columns):
+            column = fold_turkish(column.strip())
+            for field, aliases in CustomerImportService.COLUMN_ALIASES.items():
+                if column in map(fold_turkish, aliases) and field not in field_map:
+                    field_map[field] = index
+        
+        missing = [field for field in CustomerImportService.REQUIRED_FIELDS if field not in field_map]
+        if missing:
+            labels = ', '.join(str(Customer._meta.get_field(field).verbose_name) for field in missing)
+            raise ValidationError(f'Eksik sütunlar: {labels}')
+        
+        return csv.reader(stream, delimiter=delimiter), field_map
+    
+    @staticmethod
+    def _normalize_chunk(rows, field_map, first_line):
+        """Parçadaki satırları Customer.save biçimine getirir
+        
+        (satır no, değerler, hata) listesi döner; hata boşsa satır geçerlidir.
+        """
+        max_lengths = {
+            field: Customer._meta.get_field(field).max_length
+            for field in CustomerImportService.COLUMN_ALIASES
+        }
+        valid_colors = {code for code, _ in Customer.COLOR_CHOICES}
+        default_color = Customer._meta.get_field('color').default
+        
+        normalized = []
+        for line, row in enumerate(rows, first_line):
+            if not any(cell.strip() for cell in row):
+                continue  # boş satır
+            values = {
+                field: (row[index] if index < len(row) else '').strip()
+                for field, index in field_map.items()
+            }
+            for field in CustomerImportService.NAME_FIELDS:
+                values[field] = Customer.normalize_name(values.get(field, ''))
+            
+            # Baştaki ülke kodu veya 0 atılır (0532..., 90532...)
+            phone = Customer.normalize_phone(values['phone_number'])
+            if len(phone) == 12 and phone.startswith('90'):
+                phone = phone[2:]
+            elif len(phone) == 11 and phone.startswith('0'):
+                phone = phone[1:]
+            values['phone_number'] = phone
+            
+            if values.get('color') not in valid_colors:
+                values['color'] = default_color
+            
+            errors = [
+                f'{Customer._meta.get_field(field).verbose_name} boş'
+                for field in CustomerImportService.REQUIRED_FIELDS if not values[field]
+            ]
+            if values['phone_number'] and not CustomerImportService.PHONE_RE.match(phone):
+                errors.append('Telefon numarası 5XXXXXXXXX formatında olmalıdır')
+            errors.extend(
+                f'{Customer._meta.get_field(field).verbose_name} en fazla {max_length} karakter olabilir'
+                for field, max_length in max_lengths.items() if len(values[field]) > max_length
+            )
+            normalized.append((line, values, '; '.join(errors)))
+        return normalized
+    
+    @staticmethod
+    def _insert_chunk(customers, batch_size):
+        """Parçayı ekler; eklenemeyen (araya kaydedilmiş) telefonları döner
+        
+        Kontrol ile ekleme arasında aynı telefon başka bir işlemle kaydedilirse
+        toplu ekleme geri alınır ve satırlar tek tek denenir.
+        """
+        try:
+            with transaction.atomic():
+                Customer.objects.bulk_create(customers, batch_size=batch_size)
+            return set()
+        except IntegrityError:
+            pass
+        
+        collisions = set()
+        for customer in customers:
+            # Geri alınan toplu eklemenin atamış olabileceği id temizlenir
+            customer.pk = None
+            try:
+                with transaction.atomic():
+                    Customer.objects.bulk_create([customer])
+            except IntegrityError:
+                collisions.add(customer.phone_number)
+        return collisions
+    
+    @staticmethod
+    def import_csv(stream, user, chunk_size=None, dry_run=False):
+        """CSV akışındaki müşterileri aktarır ve satır bazlı rapor döner
+        
+        Rapor: {'created', 'skipped', 'invalid': adet, 'rows': [{'line',
+        'status', 'phone_number', 'name', 'message'}]}. Dosyada veya
+        veritabanında telefonu bulunan satırlar atlanır. ``dry_run`` ile
+        hiçbir kayıt eklenmez, rapor aynı şekilde üretilir.
+        """
+        chunk_size = chunk_size or CustomerImportService.CHUNK_SIZE
+        reader, field_map = CustomerImportService._open_reader(stream)
+        report = {
+            CustomerImportService.CREATED: 0,
+            CustomerImportService.SKIPPED: 0,
+            CustomerImportService.INVALID: 0,
+            'rows': []
+        }
+        seen_phones = set()
+        
+        def add_row(line, values, status, message=''):
+            report[status] += 1
+            report['rows'].append({
+                'line': line,
+                'status': status,
+                'phone_number': values.get('phone_number', ''),
+                'name': f"{values.get('first_name', '')} {values.get('last_name', '')}".strip(),
+                'message': message
             })
         
-        return customers_data
+        first_line = 2  # 1. satır başlık
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                break
+            chunk = CustomerImportService._normalize_chunk(rows, field_map, first_line)
+            first_line += len(rows)
+            
+            phones = {values['phone_number'] for _, values, error in chunk if not error}
+            existing = set(
+                Customer.objects.filter(phone_number__in=phones).values_list('phone_number', flat=True)
+            ) if phones else set()
+            
+            outcomes = []
+            new_customers = []
+            for line, values, error in chunk:
+                if error:
+                    outcomes.append((line, values, CustomerImportService.INVALID, error))
+                elif values['phone_number'] in existing:
+                    outcomes.append((line, values, CustomerImportService.SKIPPED, 'Telefon numarası kayıtlı'))
+                elif values['phone_number'] in seen_phones:
+                    outcomes.append((
+                        line, values, CustomerImportService.SKIPPED, 'Telefon numarası dosyada tekrar ediyor'
+                    ))
+                else:
+                    seen_phones.add(values['phone_number'])
+                    new_customers.append(Customer(created_by=user, **values))
+                    outcomes.append((line, values, CustomerImportService.CREATED, ''))
+            
+            collisions = set()
+            if new_customers and not dry_run:
+                collisions = CustomerImportService._insert_chunk(new_customers, chunk_size)
+            
+            for line, values, status, message in outcomes:
+                if status == CustomerImportService.CREATED and values['phone_number'] in collisions:
+                    status, message = CustomerImportService.SKIPPED, 'Telefon numarası kayıtlı'
+                add_row(line, values, status, message)
+        
+        if report[CustomerImportService.CREATED] and not dry_run:
+            # bulk_create save() çağırmadığı için önbellekler burada temizlenir
+            invalidate_cached_counts('customers')
+            Customer.objects.invalidate_stats()
+        
+        return report
+
+
+class CustomerDuplicateService:
+    """Mükerrer müşteri tespiti (bloklama anahtarlarıyla) ve birleştirme
+    
+    Tüm çiftleri karşılaştırmak yerine müşteriler üç anahtara göre bloklara
+    ayrılır ve sadece aynı bloktaki kayıtlar karşılaştırılır:
+    - telefonun son 7 hanesi
+    - katlanmış soyad + ilçe
+    - ad için fonetik kod + şehir
+    Büyük bloklarda (yaygın soyad/ad) kayıtlar isme göre sıralanıp her kayıt
+    sadece sonraki WINDOW_SIZE kayıtla karşılaştırılır.
+    """
+    
+    PHONE_SUFFIX_LENGTH = 7
+    PHONE_MIN_SIMILARITY = 0.8
+    MAX_BLOCK_SIZE = 50
+    WINDOW_SIZE = 10
+    DEFAULT_THRESHOLD = 0.85
+    
+    # Skor ağırlıkları: ad soyad benzerliği, telefon benzerliği, aynı ilçe/şehir
+    NAME_WEIGHT = 0.5
+    PHONE_WEIGHT = 0.3
+    LOCATION_WEIGHT = 0.2
+    
+    # Fonetik kod için benzer sesli ünsüz grupları (ünlüler, h, y, w atılır)
+    PHONETIC_GROUPS = {
+        **dict.fromkeys('bp', '1'),
+        **dict.fromkeys('cjsxz', '2'),
+        **dict.fromkeys('dt', '3'),
+        **dict.fromkeys('fv', '4'),
+        **dict.fromkeys('gkq', '5'),
+        'l': '6',
+        **dict.fromkeys('mn', '7'),
+        'r': '8',
+    }
+    
+    @staticmethod
+    def phonetic_key(name):
+        """Türkçe için sadeleştirilmiş Soundex: Mehmet/Mehmed -> m73, Ahmet/Ahmed -> a73"""
+        from .search import fold_turkish
+        letters = [char for char in fold_turkish(name) if char.isalpha()]
+        if not letters:
+            return ''
+        
+        groups = CustomerDuplicateService.PHONETIC_GROUPS
+        code = [letters[0]]
+        previous = groups.get(letters[0])
+        for char in letters[1:]:
+            group = groups.get(char)
+            if group:
+                if group != previous:
+                    code.append(group)
+                previous = group
+            elif char not in 'hyw':
+                previous = None  # ünlüler aynı grubun tekrarını ayırır
+        return ''.join(code[:4])
+    
+    @staticmethod
+    def _load_records(queryset):
+        """Karşılaştırma için (id, katlanmış ad soyad, telefon, konum) kayıtları"""
+        from .search import fold_turkish
+        records = {}
+        for pk, first_name, last_name, phone, city, district in queryset.order_by().values_list(
+            'id', 'first_name', 'last_name', 'phone_number', 'city', 'district'
+        ):
+            records[pk] = (
+                fold_turkish(f'{first_name} {last_name}'),
+                fold_turkish(first_name),
+                fold_turkish(last_name),
+                phone,
+                fold_turkish(city),
+                fold_turkish(district),
+            )
+        return records
+    
+    @staticmethod
+    def _blocks(records):
+        """Anahtar -> id listesi; tek kayıtlı bloklar atılır"""
+        suffix_length = CustomerDuplicateService.PHONE_SUFFIX_LENGTH
+        phonetic_cache = {}
+        blocks = defaultdict(list)
+        for pk, (_, first_name, last_name, phone, city, district) in records.items():
+            if len(phone) >= suffix_length:
+                blocks[('phone', phone[-suffix_length:])].append(pk)
+            if last_name:
+                blocks[('surname', last_name, district)].append(pk)
+            if first_name not in phonetic_cache:
+                phonetic_cache[first_name] = CustomerDuplicateService.phonetic_key(first_name)
+            if phonetic_cache[first_name]:
+                blocks[('phonetic', phonetic_cache[first_name], city)].append(pk)
+        return [ids for ids in blocks.values() if len(ids) > 1]
+    
+    @staticmethod
+    def _candidate_pairs(block, records):
+        """Blok içindeki karşılaştırılacak çiftler (büyük bloklarda kayan pencere)"""
+        if len(block) <= CustomerDuplicateService.MAX_BLOCK_SIZE:
+            return combinations(block, 2)
+        
+        block = sorted(block, key=lambda pk: records[pk][0])
+        window = CustomerDuplicateService.WINDOW_SIZE
+        return (
+            (block[i], block[j])
+            for i in range(len(block))
+            for j in range(i + 1, min(i + 1 + window, len(block)))
+        )
+    
+    @staticmethod
+    def phone_similarity(phone_a, phone_b):
+        """Son 7 hane aynıysa 1; değilse aynı konumdaki hanelerin oranı
+        
+        Rastgele iki numara da birkaç hanede denk gelebildiği için oran
+        PHONE_MIN_SIMILARITY altında kalırsa (2'den fazla farklı hane) 0 sayılır.
+        """
+        suffix_length = CustomerDuplicateService.PHONE_SUFFIX_LENGTH
+        if phone_a[-suffix_length:] == phone_b[-suffix_length:]:
+            return 1.0
+        length = max(len(phone_a), len(phone_b))
+        if not length:
+            return 0.0
+        similarity = sum(1 for digit_a, digit_b in zip(phone_a, phone_b) if digit_a == digit_b) / length
+        return similarity if similarity >= CustomerDuplicateService.PHONE_MIN_SIMILARITY else 0.0
+    
+    @staticmethod
+    def score(first, second):
+        """İki kaydın 0-1 arası benzerlik skoru"""
+        return CustomerDuplicateService._score(first, second, 0)
+    
+    @staticmethod
+    def _score(first, second, threshold):
+        """Skor; ucuz bileşenlerle eşiğe ulaşamayacağı anlaşılırsa None"""
+        name_a, _, _, phone_a, city_a, district_a = first
+        name_b, _, _, phone_b, city_b, district_b = second
+        
+        partial = (
+            CustomerDuplicateService.PHONE_WEIGHT * CustomerDuplicateService.phone_similarity(phone_a, phone_b)
+            + CustomerDuplicateService.LOCATION_WEIGHT * ((city_a, district_a) == (city_b, district_b))
+        )
+        if partial + CustomerDuplicateService.NAME_WEIGHT < threshold:
+            return None
+        
+        matcher = SequenceMatcher(None, name_a, name_b)
+        if partial + CustomerDuplicateService.NAME_WEIGHT * matcher.quick_ratio() < threshold:
+            return None
+        return partial + CustomerDuplicateService.NAME_WEIGHT * matcher.ratio()
+    
+    @staticmethod
+    def find_duplicates(threshold=None, queryset=None):
+        """Mükerrer olabilecek müşteri çiftlerini skora göre azalan sırada döner
+        
+        Her çift için {'keep_id', 'drop_id', 'score'} döner. Kalacak kayıt
+        siparişi çok olan, eşitse daha önce oluşturulan (küçük id) kayıttır.
+        """
+        threshold = CustomerDuplicateService.DEFAULT_THRESHOLD if threshold is None else threshold
+        records = CustomerDuplicateService._load_records(
+            queryset if queryset is not None else Customer.objects.filter(is_active=True)
+        )
+        
+        seen = set()
+        matches = []
+        for block in CustomerDuplicateService._blocks(records):
+            for first_id, second_id in CustomerDuplicateService._candidate_pairs(block, records):
+                pair = (first_id, second_id) if first_id < second_id else (second_id, first_id)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                
+                score = CustomerDuplicateService._score(records[pair[0]], records[pair[1]], threshold)
+                if score is not None and score >= threshold:
+                    matches.append((pair, score))
+        
+        if not matches:
+            return []
+        
+        from orders.models import Order
+        customer_ids = {pk for pair, _ in matches for pk in pair}
+        order_counts = dict(
+            Order.objects.filter(customer_id__in=customer_ids).order_by().values('customer_id').annotate(
+                count=Count('id')
+            ).values_list('customer_id', 'count')
+        )
+        
+        duplicates = []
+        for (first_id, second_id), score in sorted(matches, key=lambda match: -match[1]):
+            keep_id, drop_id = first_id, second_id
+            if order_counts.get(second_id, 0) > order_counts.get(first_id, 0):
+                keep_id, drop_id = second_id, first_id
+            duplicates.append({'keep_id': keep_id, 'drop_id': drop_id, 'score': round(score, 3)})
+        return duplicates
+    
+    @staticmethod
+    def merge(keep_id, drop_id):
+        """Düşen müşterinin siparişlerini kalan müşteriye taşır ve onu pasifleştirir
+        
+        Siparişler tek bir UPDATE ile taşınır; bağlı ekim taleplerinin müşteri
+        sayıları yeniden hesaplanır. Taşınan sipariş sayısı döner.
+        """
+        from orders.models import Order, PlantingRequest
+        
+        if keep_id == drop_id:
+            raise ValidationError('Müşteri kendisiyle birleştirilemez.')
+        
+        with transaction.atomic():
+            customers = Customer.objects.select_for_update().in_bulk([keep_id, drop_id])
+            if len(customers) != 2:
+                raise ValidationError('Birleştirilecek müşteri bulunamadı.')
+            
+            request_ids = list(
+                PlantingRequest.order_items.through.objects.filter(
+                    orderitem__order__customer_id=drop_id
+                ).values_list('plantingrequest_id', flat=True)
+            )
+            moved = Order.objects.filter(customer_id=drop_id).update(
+                customer_id=keep_id, updated_at=timezone.now()
+            )
+            PlantingRequest.recalculate_totals(request_ids)
+            
+            customers[drop_id].deactivate()
+        
+        # Müşteriye göre süzülmüş sipariş listesi sayımları değişti
+        invalidate_cached_counts('orders')
+        return moved
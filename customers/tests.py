@@ -1,3 +1,310 @@
+import io
+from datetime import date
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from orders.models import Order, OrderItem, PlantingRequest
+from products.models import Rootstock, SeedBrand, Species, Variety
+from seasons.models import Season, SeasonProduct
+
+from .models import Customer
+from .search import build_match_query, search_queryset
+from .services import CustomerDuplicateService, CustomerImportService
+
+
+class CustomerSearchTests(TestCase):
+    """Türkçe harf katlamalı, önek eşleşmeli tam metin araması"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='arama', role='admin', phone_number='5300000400', pin_code='1234')
+        cls.isik = cls.create_customer('Işık', 'Çağlar', '5321112233', 'İstanbul', 'Kadıköy', 'Moda', 'Bahariye Cd')
+        cls.isikci = cls.create_customer('Ahmet', 'Işıkçı', '5339998877', 'İzmir', 'Bornova', 'Erzene', 'Kampüs Sk')
+        cls.street = cls.create_customer('Mehmet', 'Yılmaz', '5424445566', 'Ankara', 'Çankaya', 'Kızılay', 'Işık Sk')
+    
+    @classmethod
+    def create_customer(cls, first_name, last_name, phone_number, city, district, neighborhood, address):
+        return Customer.objects.create(
+            first_name=first_name, last_name=last_name, phone_number=phone_number, city=city,
+            district=district, neighborhood=neighborhood, address=address, created_by=cls.user
+        )
+    
+    def search_ids(self, query):
+        return set(Customer.objects.search(query).values_list('id', flat=True))
+    
+    def test_turkish_letters_are_folded(self):
+        expected = {self.isik.pk, self.isikci.pk, self.street.pk}
+        for query in ('ışık', 'IŞIK', 'isik', 'Işı'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search_ids(query), expected)
+        
+        self.assertEqual(self.search_ids('istanbul'), {self.isik.pk})
+        self.assertEqual(self.search_ids('İSTANBUL'), {self.isik.pk})
+        self.assertEqual(self.search_ids('kadikoy'), {self.isik.pk})
+        self.assertEqual(self.search_ids('cankaya kizilay'), {self.street.pk})
+    
+    def test_all_tokens_must_match(self):
+        self.assertEqual(self.search_ids('işık istanbul'), {self.isik.pk})
+        self.assertEqual(self.search_ids('işık ankara'), {self.street.pk})
+        self.assertEqual(self.search_ids('işık trabzon'), set())
+    
+    def test_phone_prefix_ignores_leading_zero(self):
+        self.assertEqual(self.search_ids('0532 111'), {self.isik.pk})
+        self.assertEqual(self.search_ids('533'), {self.isikci.pk})
+        self.assertEqual(self.search_ids('0'), set())
+        self.assertEqual(build_match_query('0532-111'), 'phone : "532111"*')
+        self.assertIsNone(build_match_query('  - '))
+    
+    def test_name_matches_rank_above_address_matches(self):
+        results = list(Customer.objects.search('ışık'))
+        
+        self.assertEqual(results[-1], self.street)
+        self.assertEqual({customer.pk for customer in results[:2]}, {self.isik.pk, self.isikci.pk})
+        self.assertEqual([customer.search_rank for customer in results], sorted(c.search_rank for c in results))
+    
+    def test_unranked_search_keeps_queryset_order(self):
+        queryset = Customer.objects.order_by('-phone_number')
+        results = search_queryset(queryset, 'ışık', ranked=False)
+        
+        self.assertEqual(list(results), [self.street, self.isikci, self.isik])
+        self.assertFalse(search_queryset(queryset, '...').exists())
+    
+    def test_index_follows_updates_and_deletes(self):
+        customer = Customer.objects.get(pk=self.street.pk)
+        customer.address = 'Gül Sk'
+        customer.save()
+        self.assertEqual(self.search_ids('gul'), {self.street.pk})
+        self.assertNotIn(self.street.pk, self.search_ids('ışık'))
+        
+        # Django dışından yapılan değişiklikler de tetikleyicilerle yansır
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE customers_customer SET last_name = %s WHERE id = %s', ['Şimşek', self.isikci.pk]
+            )
+        self.assertEqual(self.search_ids('simsek'), {self.isikci.pk})
+        
+        Customer.objects.filter(pk=self.isik.pk).delete()
+        self.assertEqual(self.search_ids('ışık'), set())
+
+
+class CustomerImportTests(TestCase):
+    """CSV müşteri aktarımında satır raporu ve toplu ekleme"""
+    
+    CSV = (
+        'Ad;Soyad;Telefon;İl;İlçe;Mahalle;Adres;Renk\n'
+        'ahmet;yılmaz;0532 111 22 33;izmir;bornova;erzene;Kampüs Sk;#d32f2f\n'
+        'Ayşe;Kaya;905334445566;İzmir;Karşıyaka;;Cumhuriyet Cd;mor\n'
+        'Ali;Veli;05321112233;İzmir;Buca;;Adres\n'
+        'Mehmet;Demir;5300000500;Manisa;Akhisar;;Adres\n'
+        ';Eksik;5345556677;Manisa;Akhisar;;Adres\n'
+        'Can;Er;12345;Manisa;Akhisar;;Adres\n'
+        ';;;;;;;\n'
+        'Ece;Su;5356667788;Aydın;Söke;;Adres\n'
+    )
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='aktarim', role='admin', phone_number='5300000501', pin_code='1234')
+        cls.existing = Customer.objects.create(
+            first_name='Mehmet', last_name='Demir', phone_number='5300000500', city='Manisa',
+            district='Akhisar', address='-', created_by=cls.user
+        )
+    
+    def run_import(self, content=None, **kwargs):
+        return CustomerImportService.import_csv(io.StringIO(content or self.CSV), self.user, **kwargs)
+    
+    def statuses(self, report):
+        return [(row['line'], row['status'], row['phone_number']) for row in report['rows']]
+    
+    def assert_report(self, report, duplicate_message='Telefon numarası dosyada tekrar ediyor'):
+        self.assertEqual(
+            (report['created'], report['skipped'], report['invalid']), (3, 2, 2)
+        )
+        self.assertEqual(self.statuses(report), [
+            (2, 'created', '5321112233'),
+            (3, 'created', '5334445566'),
+            (4, 'skipped', '5321112233'),
+            (5, 'skipped', '5300000500'),
+            (6, 'invalid', '5345556677'),
+            (7, 'invalid', '12345'),
+            (9, 'created', '5356667788'),
+        ])
+        messages = {row['line']: row['message'] for row in report['rows']}
+        self.assertEqual(messages[4], duplicate_message)
+        self.assertEqual(messages[5], 'Telefon numarası kayıtlı')
+        self.assertIn('boş', messages[6])
+        self.assertEqual(messages[7], 'Telefon numarası 5XXXXXXXXX formatında olmalıdır')
+    
+    def test_import_creates_new_customers_and_reports_rows(self):
+        report = self.run_import()
+        
+        self.assert_report(report)
+        self.assertEqual(Customer.objects.count(), 4)
+        ahmet = Customer.objects.get(phone_number='5321112233')
+        self.assertEqual((ahmet.first_name, ahmet.last_name, ahmet.city), ('Ahmet', 'Yılmaz', 'Izmir'))
+        self.assertEqual(ahmet.color, '#d32f2f')
+        self.assertEqual(ahmet.created_by, self.user)
+        # Geçersiz renk varsayılana döner
+        self.assertEqual(Customer.objects.get(phone_number='5334445566').color, '#ffeb3b')
+    
+    def test_dry_run_reports_without_writing(self):
+        report = self.run_import(dry_run=True)
+        
+        self.assert_report(report)
+        self.assertEqual(Customer.objects.count(), 1)
+    
+    def test_small_chunks_give_the_same_report(self):
+        # Geçerli satırı olan 3 parçada telefon kontrolü, yeni müşterisi olan
+        # 2 parçada savepoint ile INSERT, sonunda iki önbellek sürümü
+        with self.assertNumQueries(11):
+            report = self.run_import(chunk_size=2)
+        
+        # Tekrarın ilk satırı önceki parçada eklendiği için kayıtlı sayılır
+        self.assert_report(report, duplicate_message='Telefon numarası kayıtlı')
+        self.assertEqual(Customer.objects.count(), 4)
+    
+    def test_comma_delimiter_and_english_headers(self):
+        report = self.run_import(
+            'first_name,last_name,phone,city,district,address\n'
+            'Zeynep,Ak,0 532 999 88 77,Bursa,Nilüfer,Adres\n'
+        )
+        
+        self.assertEqual(self.statuses(report), [(2, 'created', '5329998877')])
+        self.assertTrue(Customer.objects.filter(phone_number='5329998877', neighborhood='').exists())
+    
+    def test_missing_required_columns_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.run_import('Ad;Soyad;Telefon\nAli;Veli;5321112233\n')
+        self.assertEqual(Customer.objects.count(), 1)
+    
+    def test_phone_registered_during_import_is_skipped(self):
+        insert_chunk = CustomerImportService._insert_chunk
+        
+        def register_then_insert(customers, batch_size):
+            # Kontrolden sonra başka bir işlem aynı telefonu kaydeder
+            Customer.objects.create(
+                first_name='Ayşe', last_name='Kaya', phone_number='5334445566', city='İzmir',
+                district='Karşıyaka', address='-', created_by=self.user
+            )
+            return insert_chunk(customers, batch_size)
+        
+        with mock.patch.object(CustomerImportService, '_insert_chunk', side_effect=register_then_insert):
+            report = self.run_import()
+        
+        self.assertEqual((report['created'], report['skipped'], report['invalid']), (2, 3, 2))
+        row = next(row for row in report['rows'] if row['line'] == 3)
+        self.assertEqual((row['status'], row['message']), ('skipped', 'Telefon numarası kayıtlı'))
+        self.assertEqual(
+            set(Customer.objects.values_list('phone_number', flat=True)),
+            {'5300000500', '5321112233', '5334445566', '5356667788'}
+        )
+
+
+class CustomerDuplicateTests(TestCase):
+    """Bloklama anahtarlarıyla mükerrer tespiti ve müşteri birleştirme"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='mukerrer', role='admin', phone_number='5300000600', pin_code='1234')
+        cls.mehmet = cls.create_customer('Mehmet', 'Yılmaz', '5321234567', 'İzmir', 'Bornova')
+        cls.mehmed = cls.create_customer('Mehmed', 'Yilmaz', '5421234567', 'İzmir', 'Bornova')
+        cls.ahmet = cls.create_customer('Ahmet', 'Yılmaz', '5559876543', 'İzmir', 'Bornova')
+        cls.create_customer('Ayşe', 'Kaya', '5331112233', 'Ankara', 'Çankaya')
+        cls.create_customer('Mehmet', 'Yılmaz', '5361234567', 'İzmir', 'Bornova', is_active=False)
+        
+        species = Species.objects.create(name='Domates')
+        seed_brand = SeedBrand.objects.create(name='Marka', price_per_packet=10, seeds_per_packet=100)
+        cls.rootstock = Rootstock.objects.create(name='Anaç', species=species)
+        cls.season = Season.objects.create(name='2026', start_date=date(2026, 1, 1))
+        cls.season_product = SeasonProduct.objects.create(
+            season=cls.season, rootstock=cls.rootstock,
+            variety=Variety.objects.create(name='Çeşit', species=species, seed_brand=seed_brand)
+        )
+    
+    @classmethod
+    def create_customer(cls, first_name, last_name, phone_number, city, district, **kwargs):
+        return Customer.objects.create(
+            first_name=first_name, last_name=last_name, phone_number=phone_number, city=city,
+            district=district, address='-', created_by=cls.user, **kwargs
+        )
+    
+    def create_order(self, customer, quantity=10):
+        order = Order.objects.create(
+            customer=customer, season=self.season, requested_delivery_date=date(2026, 6, 1), created_by=self.user
+        )
+        item = OrderItem.objects.create(
+            order=order, season_product=self.season_product, quantity=quantity, viol_count=1, unit_price=1
+        )
+        return order, item
+    
+    def pairs(self, duplicates):
+        return [(duplicate['keep_id'], duplicate['drop_id']) for duplicate in duplicates]
+    
+    def test_phonetic_key_and_phone_similarity(self):
+        key = CustomerDuplicateService.phonetic_key
+        self.assertEqual(key('Mehmet'), 'm73')
+        self.assertEqual(key('Mehmed'), 'm73')
+        self.assertEqual(key('Ahmet'), 'a73')
+        self.assertEqual(key('Şükrü'), key('sukru'))
+        self.assertEqual(key('...'), '')
+        
+        similarity = CustomerDuplicateService.phone_similarity
+        self.assertEqual(similarity('5321234567', '5421234567'), 1.0)
+        self.assertEqual(similarity('5321234567', '5321234568'), 0.9)
+        self.assertEqual(similarity('5321234567', '5559876543'), 0.0)
+    
+    def test_find_duplicates_compares_only_blocked_pairs(self):
+        duplicates = CustomerDuplicateService.find_duplicates()
+        
+        self.assertEqual(self.pairs(duplicates), [(self.mehmet.pk, self.mehmed.pk)])
+        self.assertGreaterEqual(duplicates[0]['score'], CustomerDuplicateService.DEFAULT_THRESHOLD)
+        
+        # Düşük eşikte aynı soyad/ilçe bloğundaki kayıt da eşleşir, skorlar azalan sırada
+        duplicates = CustomerDuplicateService.find_duplicates(threshold=0.5)
+        self.assertEqual(duplicates[0]['drop_id'], self.mehmed.pk)
+        self.assertIn((self.mehmet.pk, self.ahmet.pk), self.pairs(duplicates))
+        self.assertEqual(
+            [duplicate['score'] for duplicate in duplicates],
+            sorted((duplicate['score'] for duplicate in duplicates), reverse=True)
+        )
+    
+    def test_customer_with_more_orders_is_kept(self):
+        self.create_order(self.mehmed)
+        
+        self.assertEqual(
+            self.pairs(CustomerDuplicateService.find_duplicates()), [(self.mehmed.pk, self.mehmet.pk)]
+        )
+    
+    def test_merge_moves_orders_and_recalculates_requests(self):
+        dropped_order, dropped_item = self.create_order(self.mehmet, quantity=40)
+        kept_order, kept_item = self.create_order(self.mehmed, quantity=60)
+        planting_request = PlantingRequest.objects.create(
+            rootstock=self.rootstock, planting_type=PlantingRequest.PlantingType.ROOTSTOCK,
+            requested_planting_date=date(2026, 3, 1), season=self.season
+        )
+        planting_request.order_items.add(dropped_item, kept_item)
+        planting_request.refresh_from_db()
+        self.assertEqual(planting_request.customer_count, 2)
+        
+        moved = CustomerDuplicateService.merge(self.mehmed.pk, self.mehmet.pk)
+        
+        self.assertEqual(moved, 1)
+        self.assertEqual(
+            set(Order.objects.filter(customer=self.mehmed).values_list('id', flat=True)),
+            {dropped_order.pk, kept_order.pk}
+        )
+        self.assertFalse(Customer.objects.get(pk=self.mehmet.pk).is_active)
+        planting_request.refresh_from_db()
+        self.assertEqual((planting_request.order_count, planting_request.customer_count), (2, 1))
+        self.assertEqual(CustomerDuplicateService.find_duplicates(), [])
+    
+    def test_merge_rejects_invalid_pairs(self):
+        with self.assertRaises(ValidationError):
+            CustomerDuplicateService.merge(self.mehmet.pk, self.mehmet.pk)
+        with self.assertRaises(ValidationError):
+            CustomerDuplicateService.merge(self.mehmet.pk, 0)
+        self.assertTrue(Customer.objects.get(pk=self.mehmet.pk).is_active)
@@ -7,6 +7,8 @@ urlpatterns = [
     # Ana sayfalar
     path('', views.customer_list_view, name='list'),
     path('create/', views.customer_create_view, name='create'),
+    path('import/', views.customer_import_view, name='import'),
+    path('export/', views.customer_export_view, name='export'),
     path('<int:customer_id>/', views.customer_detail_view, name='detail'),
     path('<int:customer_id>/edit/', views.customer_edit_view, name='edit'),
     path('<int:customer_id>/delete/', views.customer_delete_view, name='delete'),
@@ -15,6 +17,7 @@ urlpatterns = [
     # AJAX endpoints
     path('ajax/toggle-status/<int:customer_id>/', views.ajax_toggle_customer_status, name='ajax_toggle_status'),
     path('ajax/search/', views.ajax_customer_search, name='ajax_search'),
+    path('ajax/typeahead/', views.ajax_customer_typeahead, name='ajax_typeahead'),
     path('ajax/bulk-update-color/', views.ajax_bulk_update_color, name='ajax_bulk_update_color'),
     path('ajax/bulk-toggle-status/', views.ajax_bulk_toggle_status, name='ajax_bulk_toggle_status'),
 ]
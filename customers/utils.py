@@ -1,3 +1,5 @@
+import csv
+import json
 from functools import wraps
 from django.http import JsonResponse
 from django.core.exceptions import PermissionDenied
@@ -6,6 +8,8 @@ from django.contrib import messages
 from django.db.models import Q
 import re
 
+from core.streaming import Echo
+
 
 def customer_permission_required(allowed_roles=None):
     """Customer modülü için rol bazlı yetki kontrolü"""
@@ -101,6 +105,13 @@ def search_customers_advanced(search_term):
     if not search_term:
         return Customer.objects.none()
     
+    # Tam metin araması (Türkçe harf katlamalı, önek eşleşmeli, sıralı)
+    from .search import search_queryset
+    results = search_queryset(Customer.objects.all(), search_term)
+    if results is not None:
+        return results
+    
+    # FTS yoksa alan bazlı arama
     # Telefon araması için rakamları temizle
     clean_phone = ''.join(filter(str.isdigit, search_term))
     
@@ -131,6 +142,35 @@ def search_customers_advanced(search_term):
     return Customer.objects.filter(search_query)
 
 
+CUSTOMER_EXPORT_COLUMNS = [
+    ('id', 'ID'),
+    ('full_name', 'Ad Soyad'),
+    ('phone', 'Telefon'),
+    ('city', 'Şehir'),
+    ('district', 'İlçe'),
+    ('address', 'Adres'),
+    ('color_category', 'Sınıf'),
+    ('color_display', 'Renk'),
+    ('is_active', 'Durum'),
+    ('created_at', 'Kayıt Tarihi'),
+    ('created_by', 'Oluşturan'),
+]
+
+
+def iter_customers_csv(rows):
+    """Export satırlarını tek tek CSV metni olarak üretir (StreamingHttpResponse için)"""
+    writer = csv.writer(Echo())
+    yield writer.writerow([label for _, label in CUSTOMER_EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([row[key] for key, _ in CUSTOMER_EXPORT_COLUMNS])
+
+
+def iter_customers_jsonl(rows):
+    """Export satırlarını her satırda bir JSON nesnesi olarak üretir"""
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
 def get_customer_dashboard_url_by_role(role):
     """Role göre müşteri dashboard URL'i"""
     role_urls = {
@@ -1,18 +1,21 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
 from django.db.models import Q
+import io
 import json
 
 from .models import Customer
-from .services import CustomerService
+from .services import CustomerService, CustomerImportService
 from .utils import (
     customer_permission_required, can_edit_customers, can_delete_customers,
     format_customer_info, get_color_choices, validate_customer_data,
-    clean_customer_data, ajax_response_helper
+    clean_customer_data, ajax_response_helper, iter_customers_csv, iter_customers_jsonl
 )
 
 
@@ -39,7 +42,9 @@ def customer_list_view(request):
         city_filter=city_filter,
         is_active=is_active,
         page=page,
-        per_page=20
+        per_page=20,
+        after=request.GET.get('after'),
+        before=request.GET.get('before')
     )
     
     # Şehir listesi (filtreleme için)
@@ -122,6 +127,65 @@ def customer_create_view(request):
     return render(request, 'customers/customer_create.html', context)
 
 
+@customer_permission_required(['admin', 'readonly'])
+def customer_export_view(request):
+    """Müşteri listesini CSV veya JSON Lines olarak akıtır (liste filtreleriyle)"""
+    status_filter = request.GET.get('status', '')
+    filters = {
+        'color': request.GET.get('color', ''),
+        'city': request.GET.get('city', ''),
+        'is_active': {'active': True, 'inactive': False}.get(status_filter),
+    }
+    rows = CustomerService.iter_export_rows(CustomerService.get_customers_for_export(filters))
+    
+    if request.GET.get('format') == 'jsonl':
+        response = StreamingHttpResponse(iter_customers_jsonl(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="musteriler.jsonl"'
+    else:
+        response = StreamingHttpResponse(iter_customers_csv(rows), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="musteriler.csv"'
+    
+    return response
+
+
+@customer_permission_required(['admin'])
+def customer_import_view(request):
+    """CSV dosyasından toplu müşteri aktarımı"""
+    report = None
+    
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, 'Lütfen bir CSV dosyası seçin.')
+        else:
+            dry_run = request.POST.get('dry_run') == 'on'
+            try:
+                stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+                report = CustomerImportService.import_csv(stream, request.user, dry_run=dry_run)
+            except ValidationError as e:
+                messages.error(request, '; '.join(e.messages))
+            except UnicodeDecodeError:
+                messages.error(request, 'Dosya UTF-8 kodlamalı CSV olmalıdır.')
+            else:
+                prefix = 'Deneme: ' if dry_run else ''
+                messages.success(
+                    request,
+                    f"{prefix}{report['created']} müşteri eklendi, {report['skipped']} satır atlandı, "
+                    f"{report['invalid']} satır hatalı."
+                )
+                report['problem_rows'] = [
+                    row for row in report['rows'] if row['status'] != CustomerImportService.CREATED
+                ][:500]
+                report['dry_run'] = dry_run
+    
+    context = {
+        'report': report,
+        'columns': CustomerImportService.COLUMN_ALIASES,
+    }
+    
+    return render(request, 'customers/customer_import.html', context)
+
+
 @customer_permission_required(['admin'])
 def customer_edit_view(request, customer_id):
     """Müşteri düzenleme sayfası"""
@@ -197,57 +261,16 @@ def customer_stats_view(request):
     cities = CustomerService.get_cities_with_count()
     
     # Renk bilgilerini template için düzenle
-    color_choices = get_color_choices()
-    color_list = []
-    
-    # Her renk için istatistik hesapla
     total_customers = stats['total'] if stats['total'] > 0 else 1  # Division by zero'dan korunmak için
-    
-    for color_code, color_name in color_choices:
-        # Bu renkteki müşteri sayısını al - color_breakdown'dan al
-        count = 0
-        for color_key, color_data in stats.get('color_breakdown', {}).items():
-            # Color code'u karşılaştır
-            if color_code == '#0d5016' and 'A Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-            elif color_code == '#2c9c3e' and 'B Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-            elif color_code == '#8bc34a' and 'C Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-            elif color_code == '#ffeb3b' and 'D Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-            elif color_code == '#ff9800' and 'E Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-            elif color_code == '#ff5722' and 'F Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-            elif color_code == '#d32f2f' and 'G Sınıfı' in color_key:
-                count = color_data.get('count', 0)
-                break
-        
-        percentage = round((count / total_customers) * 100, 1) if count > 0 else 0
-        
-        color_list.append({
+    stats['color_list'] = [
+        {
             'name': color_name,
             'color_code': color_code,
-            'count': count,
-            'percentage': percentage
-        })
-    
-    # Standard customers hesapla (C ve D sınıfı)
-    standard_customers = 0
-    for color_info in color_list:
-        if 'C Sınıfı' in color_info['name'] or 'D Sınıfı' in color_info['name']:
-            standard_customers += color_info['count']
-    
-    # Stats'e ek bilgileri ekle
-    stats['color_list'] = color_list
-    stats['standard_customers'] = standard_customers
+            'count': stats['color_counts'].get(color_code, 0),
+            'percentage': round(stats['color_counts'].get(color_code, 0) / total_customers * 100, 1)
+        }
+        for color_code, color_name in get_color_choices()
+    ]
     
     context = {
         'stats': stats,
@@ -312,6 +335,33 @@ def ajax_customer_search(request):
     return JsonResponse({'customers': customer_list})
 
 
+@login_required
+@require_http_methods(["GET"])
+def ajax_customer_typeahead(request):
+    """Sipariş formlarındaki müşteri seçimi için sayfalı arama"""
+    query = request.GET.get('q', '')
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 1
+    
+    customers, has_more = CustomerService.typeahead(query, page=page)
+    
+    return JsonResponse({
+        'results': [
+            {
+                'id': customer.id,
+                'text': customer.get_full_name(),
+                'phone': customer.formatted_phone,
+                'city': customer.get_short_address()
+            }
+            for customer in customers
+        ],
+        'page': page,
+        'has_more': has_more
+    })
+
+
 @csrf_exempt
 @customer_permission_required(['admin'])
 @require_http_methods(["POST"])
@@ -3,12 +3,17 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.db import models
+from django.db.models import Min, Max, Prefetch
 from django.forms import TextInput, Textarea
 from django.utils import timezone
 from decimal import Decimal
 
-from .models import Order, OrderItem, OrderStatusHistory, PlantingRequest, PlantingRequestHistory
+from .models import (
+    Order, OrderItem, OrderStatusHistory, PlantingRequest, PlantingRequestHistory,
+    defer_total_recalculation
+)
 from .services import OrderService, OrderItemService
+from core.pagination import CachedCountPaginator
 
 
 class OrderItemInline(admin.TabularInline):
@@ -20,6 +25,7 @@ class OrderItemInline(admin.TabularInline):
         'quantity', 'viol_count', 'unit_price', 'total_price', 'status', 'notes'
     ]
     readonly_fields = ['total_price']
+    autocomplete_fields = ['season_product']
     
     formfield_overrides = {
         models.CharField: {'widget': TextInput(attrs={'size': '10'})},
@@ -63,16 +69,38 @@ class PlantingRequestHistoryInline(admin.TabularInline):
         return False
 
 
+class CachedCountAdminMixin:
+    """Değişiklik listesinde toplam sayıyı önbellekten okur
+    
+    Filtresiz toplam için ikinci COUNT sorgusu çalıştırılmaz; filtreli sayım
+    ``count_namespace`` isim alanında önbelleklenir ve kayıt değiştikçe yenilenir.
+    """
+    
+    count_namespace = None
+    show_full_result_count = False
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return CachedCountPaginator(
+            queryset, per_page, self.count_namespace,
+            orphans=orphans, allow_empty_first_page=allow_empty_first_page
+        )
+
+
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(CachedCountAdminMixin, admin.ModelAdmin):
     """Sipariş admin konfigürasyonu"""
     
     list_display = [
         'order_number', 'customer_info', 'season', 'status_badge', 
-        'total_amount_formatted', 'order_date', 'requested_delivery_date',
+        'total_amount_formatted', 'quantity_summary', 'order_date', 'requested_delivery_date',
+        'planned_delivery_date_display', 'stage_dates_info',
         'production_progress', 'urgency_indicator', 'actions_column'
     ]
     
+    list_select_related = ['customer', 'season']
+    count_namespace = 'orders'
+    autocomplete_fields = ['customer']
+    
     list_filter = [
         'status', 'season', 'urgent', 'special_packaging',
         'order_date', 'requested_delivery_date', 'created_at'
@@ -134,9 +162,19 @@ class OrderAdmin(admin.ModelAdmin):
     }
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'customer', 'season', 'created_by'
-        ).prefetch_related('items')
+        # Kalem toplamları ve aşama tarihleri satır başına sorgu yerine alt sorgularla gelir;
+        # select_related verildiği için list_select_related ilişkileri burada da istenir
+        queryset = OrderService.annotate_item_totals(
+            super().get_queryset(request).select_related(*self.list_select_related)
+        )
+        return queryset.annotate(
+            first_planting_date=OrderService.items_subquery(
+                Min('rootstock_planting_date'), models.DateField()
+            ),
+            last_head_formation_date=OrderService.items_subquery(
+                Max('head_formation_date'), models.DateField()
+            )
+        )
     
     def customer_info(self, obj):
         """Müşteri bilgisi"""
@@ -176,6 +214,27 @@ class OrderAdmin(admin.ModelAdmin):
     total_amount_formatted.short_description = 'Toplam Tutar'
     total_amount_formatted.admin_order_field = 'total_amount'
     
+    def quantity_summary(self, obj):
+        """Kalem, fide ve viol toplamları"""
+        return format_html(
+            '<strong>{}</strong> fide<br><small>{} kalem / {} viol</small>',
+            obj.items_quantity, obj.items_count, obj.items_viol_count
+        )
+    quantity_summary.short_description = 'Miktar'
+    quantity_summary.admin_order_field = 'items_quantity'
+    
+    def stage_dates_info(self, obj):
+        """İlk anaç ekimi ve son kafa kesimi tarihleri"""
+        if obj.first_planting_date or obj.last_head_formation_date:
+            return format_html(
+                '<small>Anaç: {}<br>Kafa: {}</small>',
+                obj.first_planting_date.strftime('%d.%m.%Y') if obj.first_planting_date else '-',
+                obj.last_head_formation_date.strftime('%d.%m.%Y') if obj.last_head_formation_date else '-'
+            )
+        return '-'
+    stage_dates_info.short_description = 'Üretim Tarihleri'
+    stage_dates_info.admin_order_field = 'first_planting_date'
+    
     def production_progress(self, obj):
         """Üretim ilerleme çubuğu"""
         progress = obj.production_status
@@ -213,20 +272,21 @@ class OrderAdmin(admin.ModelAdmin):
     
     def planned_delivery_date_display(self, obj):
         """Planlanan teslimat tarihi"""
-        date = obj.calculate_planned_delivery_date()
+        date = obj.planned_delivery_date
         if date:
             return date.strftime('%d.%m.%Y')
         return '-'
     planned_delivery_date_display.short_description = 'Planlanan Teslimat'
+    planned_delivery_date_display.admin_order_field = 'planned_delivery_date'
     
     def total_quantity_display(self, obj):
         """Toplam miktar"""
-        return f'{obj.total_quantity} fide'
+        return f'{obj.items_quantity} fide'
     total_quantity_display.short_description = 'Toplam Miktar'
     
     def total_viol_count_display(self, obj):
         """Toplam viol"""
-        return f'{obj.total_viol_count} viol'
+        return f'{obj.items_viol_count} viol'
     total_viol_count_display.short_description = 'Toplam Viol'
     
     def save_model(self, request, obj, form, change):
@@ -234,53 +294,55 @@ class OrderAdmin(admin.ModelAdmin):
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
     
+    def save_related(self, request, form, formsets, change):
+        # Inline kalemler kaydedilirken toplam tutar sonda bir kez hesaplanır
+        with defer_total_recalculation():
+            super().save_related(request, form, formsets, change)
+    
     actions = ['mark_as_confirmed', 'mark_as_waiting', 'mark_as_cancelled']
     
+    def _bulk_transition(self, queryset, request, to_status, notes):
+        result = OrderService.bulk_transition(
+            list(queryset.values_list('id', flat=True)),
+            to_status,
+            user=request.user,
+            notes=notes
+        )
+        return len(result['updated'])
+    
     def mark_as_confirmed(self, request, queryset):
         """Seçilen siparişleri onayla"""
-        updated = 0
-        for order in queryset:
-            if order.status == Order.OrderStatus.DRAFT:
-                OrderService.update_order_status(
-                    order.id, Order.OrderStatus.CONFIRMED, 
-                    request.user.id, 'Admin panelinden toplu onaylandı'
-                )
-                updated += 1
+        updated = self._bulk_transition(
+            queryset, request, Order.OrderStatus.CONFIRMED,
+            'Admin panelinden toplu onaylandı'
+        )
         
         self.message_user(request, f'{updated} sipariş onaylandı.')
     mark_as_confirmed.short_description = 'Seçilen siparişleri onayla'
     
     def mark_as_waiting(self, request, queryset):
         """Seçilen siparişleri bekleyene çevir"""
-        updated = 0
-        for order in queryset:
-            if order.status in [Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED]:
-                OrderService.update_order_status(
-                    order.id, Order.OrderStatus.WAITING,
-                    request.user.id, 'Admin panelinden toplu bekleyene çevrildi'
-                )
-                updated += 1
+        updated = self._bulk_transition(
+            queryset, request, Order.OrderStatus.WAITING,
+            'Admin panelinden toplu bekleyene çevrildi'
+        )
         
         self.message_user(request, f'{updated} sipariş bekleyene çevrildi.')
     mark_as_waiting.short_description = 'Seçilen siparişleri bekleyene çevir'
     
     def mark_as_cancelled(self, request, queryset):
         """Seçilen siparişleri iptal et"""
-        updated = 0
-        for order in queryset:
-            if order.status != Order.OrderStatus.DELIVERED:
-                OrderService.update_order_status(
-                    order.id, Order.OrderStatus.CANCELLED,
-                    request.user.id, 'Admin panelinden toplu iptal edildi'
-                )
-                updated += 1
+        updated = self._bulk_transition(
+            queryset, request, Order.OrderStatus.CANCELLED,
+            'Admin panelinden toplu iptal edildi'
+        )
         
         self.message_user(request, f'{updated} sipariş iptal edildi.')
     mark_as_cancelled.short_description = 'Seçilen siparişleri iptal et'
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(CachedCountAdminMixin, admin.ModelAdmin):
     """Sipariş kalemi admin konfigürasyonu"""
     
     list_display = [
@@ -289,6 +351,10 @@ class OrderItemAdmin(admin.ModelAdmin):
         'status_badge', 'planting_dates_info'
     ]
     
+    list_select_related = ['order', 'variety__species', 'rootstock']
+    count_namespace = 'orders'
+    autocomplete_fields = ['order', 'season_product', 'variety', 'rootstock']
+    
     list_filter = [
         'stem_type', 'viol_type', 'status', 'order__status', 'order__season',
         'variety__species', 'created_at'
@@ -341,10 +407,9 @@ class OrderItemAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'order__customer', 'order__season', 'variety__species', 
-            'rootstock', 'season_product__variety', 'season_product__rootstock'
-        )
+        # select_related verilince ChangeList list_select_related'ı uygulamaz; aynı
+        # ilişkiler burada da istenir (otomatik tamamlamada __str__ için de gerekli)
+        return super().get_queryset(request).select_related(*self.list_select_related)
     
     def order_link(self, obj):
         """Sipariş linki"""
@@ -451,13 +516,16 @@ class OrderItemAdmin(admin.ModelAdmin):
 
 
 @admin.register(OrderStatusHistory)
-class OrderStatusHistoryAdmin(admin.ModelAdmin):
+class OrderStatusHistoryAdmin(CachedCountAdminMixin, admin.ModelAdmin):
     """Sipariş durum geçmişi admin konfigürasyonu"""
     
     list_display = [
         'order_link', 'status_change', 'changed_at', 'changed_by', 'notes_preview'
     ]
     
+    list_select_related = ['order', 'changed_by']
+    count_namespace = 'orders'
+    
     list_filter = [
         'from_status', 'to_status', 'changed_at'
     ]
@@ -468,11 +536,6 @@ class OrderStatusHistoryAdmin(admin.ModelAdmin):
     
     readonly_fields = ['order', 'from_status', 'to_status', 'changed_at', 'changed_by']
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'order', 'changed_by'
-        )
-    
     def order_link(self, obj):
         """Sipariş linki"""
         url = reverse('admin:orders_order_change', args=[obj.order.pk])
@@ -509,7 +572,7 @@ class OrderStatusHistoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(PlantingRequest)
-class PlantingRequestAdmin(admin.ModelAdmin):
+class PlantingRequestAdmin(CachedCountAdminMixin, admin.ModelAdmin):
     """Ekim Talep Kartı admin konfigürasyonu"""
     
     list_display = [
@@ -518,6 +581,10 @@ class PlantingRequestAdmin(admin.ModelAdmin):
         'order_customer_count', 'days_remaining', 'location_display'
     ]
     
+    list_select_related = ['variety__species', 'rootstock']
+    count_namespace = 'planting_requests'
+    autocomplete_fields = ['variety', 'rootstock', 'order_items']
+    
     list_filter = [
         'planting_type', 'status', 'season', 'variety__species',
         'requested_planting_date', 'actual_planting_date', 'planting_area'
@@ -572,13 +639,13 @@ class PlantingRequestAdmin(admin.ModelAdmin):
         }),
     )
     
-    filter_horizontal = ['order_items']
     inlines = [PlantingRequestHistoryInline]
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'variety__species', 'rootstock', 'season', 'created_by'
-        ).prefetch_related('order_items__order__customer')
+        # Başlıktaki çeşit adları için kalemler tek sorguda yüklenir
+        return super().get_queryset(request).prefetch_related(
+            Prefetch('order_items', queryset=OrderItem.objects.select_related('variety'))
+        )
     
     def product_display_admin(self, obj):
         """Ürün görüntü adı"""
@@ -630,6 +697,7 @@ class PlantingRequestAdmin(admin.ModelAdmin):
             obj.order_count, obj.customer_count
         )
     order_customer_count.short_description = 'Sipariş/Müşteri'
+    order_customer_count.admin_order_field = 'order_count'
     
     def days_remaining(self, obj):
         """Kalan gün sayısı"""
@@ -695,13 +763,16 @@ class PlantingRequestAdmin(admin.ModelAdmin):
 
 
 @admin.register(PlantingRequestHistory)
-class PlantingRequestHistoryAdmin(admin.ModelAdmin):
+class PlantingRequestHistoryAdmin(CachedCountAdminMixin, admin.ModelAdmin):
     """Ekim talep geçmişi admin konfigürasyonu"""
     
     list_display = [
         'planting_request_link', 'status_change', 'changed_at', 'changed_by', 'location_info'
     ]
     
+    list_select_related = ['planting_request', 'changed_by']
+    count_namespace = 'planting_requests'
+    
     list_filter = [
         'from_status', 'to_status', 'changed_at'
     ]
@@ -712,11 +783,6 @@ class PlantingRequestHistoryAdmin(admin.ModelAdmin):
     
     readonly_fields = ['planting_request', 'from_status', 'to_status', 'changed_at', 'changed_by']
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'planting_request', 'changed_by'
-        )
-    
     def planting_request_link(self, obj):
         """Ekim talebi linki"""
         url = reverse('admin:orders_plantingrequest_change', args=[obj.planting_request.pk])
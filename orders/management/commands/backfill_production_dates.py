@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import OrderItem
+from orders.services import OrderItemService
+
+
+class Command(BaseCommand):
+    """Sipariş kalemlerinin üretim aşaması tarihlerini doldurur"""
+    
+    help = 'Sipariş kalemlerinin anaç/kalem ekim, aşılama ve kafa kesimi tarihlerini yeniden hesaplar'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Sadece belirtilen sezonun kalemlerini güncelle'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tek seferde güncellenecek kalem sayısı'
+        )
+    
+    def handle(self, *args, **options):
+        queryset = OrderItem.objects.all()
+        if options['season']:
+            queryset = queryset.filter(order__season_id=options['season'])
+        
+        updated_count = OrderItemService.refresh_production_dates(
+            queryset, batch_size=options['batch_size']
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'{updated_count} sipariş kaleminin üretim tarihleri güncellendi.'
+        ))
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from orders import query_plans
+
+
+DEFAULT_SNAPSHOT = Path(query_plans.__file__).with_name('query_plans.txt')
+
+
+class Command(BaseCommand):
+    """Sık kullanılan sorguların SQLite planlarını raporlar ve anlık görüntüyle karşılaştırır"""
+    
+    help = (
+        'Görünümlerin arkasındaki sorguları EXPLAIN QUERY PLAN ile çalıştırır, '
+        'tam tarama ve geçici B-tree adımlarını işaretler. Anlık görüntü boş '
+        '(yeni migrate edilmiş) bir veritabanında üretilmelidir.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Planların alınacağı veritabanı'
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            dest='queries',
+            help='Sadece belirtilen sorguyu raporla (birden fazla verilebilir)'
+        )
+        parser.add_argument(
+            '--snapshot',
+            default=str(DEFAULT_SNAPSHOT),
+            help='Anlık görüntü dosyası'
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            '--write',
+            action='store_true',
+            help='Raporu anlık görüntü dosyasına yaz'
+        )
+        group.add_argument(
+            '--check',
+            action='store_true',
+            help='Rapor anlık görüntüden farklıysa hata ver'
+        )
+    
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError('Sorgu planı raporu sadece SQLite için destekleniyor.')
+        
+        names = options['queries']
+        unknown = set(names or []) - {name for name, _, _ in query_plans.HOT_QUERIES}
+        if unknown:
+            raise CommandError(f'Bilinmeyen sorgu: {", ".join(sorted(unknown))}')
+        
+        report, flag_counts = query_plans.build_report(using, names)
+        snapshot = Path(options['snapshot'])
+        
+        if options['write']:
+            snapshot.write_text(report, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Sorgu planları {snapshot} dosyasına yazıldı.'))
+        elif options['check']:
+            if not snapshot.exists():
+                raise CommandError(f'{snapshot} bulunamadı, önce --write ile oluşturun.')
+            diff = query_plans.diff_report(snapshot.read_text(encoding='utf-8'), report)
+            if diff:
+                self.stdout.write(diff)
+                raise CommandError('Sorgu planları anlık görüntüden farklı.')
+            self.stdout.write(self.style.SUCCESS('Sorgu planları anlık görüntüyle aynı.'))
+        else:
+            self.stdout.write(report)
+        
+        summary = ', '.join(f'{flag}: {count}' for flag, count in flag_counts.items())
+        style = self.style.WARNING if any(flag_counts.values()) else self.style.SUCCESS
+        self.stdout.write(style(f'İşaretlenen adımlar - {summary}'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from orders.services import PlantingRequestService
+
+
+class Command(BaseCommand):
+    """Ekim taleplerinin miktar ve sayaçlarını onarır"""
+    
+    help = 'Ekim taleplerinin toplam miktar, viol, sipariş ve müşteri sayılarını kalemlerden yeniden hesaplar'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Sadece belirtilen sezonun taleplerini onar'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tek seferde güncellenecek talep sayısı'
+        )
+    
+    def handle(self, *args, **options):
+        updated_count = PlantingRequestService.repair_totals(
+            season_id=options['season'], batch_size=options['batch_size']
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'{updated_count} ekim talebinin sayaçları güncellendi.'
+        ))
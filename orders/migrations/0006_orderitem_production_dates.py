@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_remove_plantingrequest_unique_planting_request_and_more'),
+        ('products', '0001_initial'),
+        ('seasons', '0004_seasonproduct_waiting_on_room_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='grafting_date',
+            field=models.DateField(blank=True, help_text='Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır', null=True, verbose_name='Aşılama Tarihi'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='head_formation_date',
+            field=models.DateField(blank=True, help_text='Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır', null=True, verbose_name='Kafa Kesimi Tarihi'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='rootstock_planting_date',
+            field=models.DateField(blank=True, help_text='Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır', null=True, verbose_name='Anaç Ekim Tarihi'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='scion_planting_date',
+            field=models.DateField(blank=True, help_text='Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır', null=True, verbose_name='Kalem Ekim Tarihi'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['rootstock_planting_date'], name='orderitem_rootstock_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['scion_planting_date'], name='orderitem_scion_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['grafting_date'], name='orderitem_grafting_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['head_formation_date'], name='orderitem_head_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_orderitem_production_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(help_text='Belge türü öneki (ORD, PLT vs.)', max_length=10, verbose_name='Önek')),
+                ('year', models.PositiveIntegerField(verbose_name='Yıl')),
+                ('last_value', models.PositiveIntegerField(default=0, help_text='Dağıtılmış en büyük numara', verbose_name='Son Değer')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Belge Numarası Sayacı',
+                'verbose_name_plural': 'Belge Numarası Sayaçları',
+                'db_table': 'orders_documentsequence',
+                'constraints': [models.UniqueConstraint(fields=('prefix', 'year'), name='unique_document_sequence')],
+            },
+        ),
+    ]
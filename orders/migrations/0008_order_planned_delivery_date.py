@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:57
+
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_planned_delivery_dates(apps, schema_editor):
+    """Mevcut siparişlerin planlanan teslimat tarihini kalemlerden doldurur"""
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    
+    planned_dates = {}
+    items = OrderItem.objects.order_by().values_list(
+        'order_id', 'order__order_date', 'stem_type',
+        'season_product__rootstock_planting_duration',
+        'season_product__scion_planting_duration',
+        'season_product__waiting_on_room_duration',
+        'season_product__head_formation_duration',
+        'season_product__single_stem_grafting_duration',
+        'season_product__double_stem_grafting_duration',
+    ).distinct()
+    for order_id, order_date, stem_type, *durations in items:
+        grafting_days = durations[4] if stem_type == 'single' else durations[5]
+        delivery_date = order_date.date() + timedelta(days=sum(durations[:4]) + grafting_days)
+        if order_id not in planned_dates or delivery_date > planned_dates[order_id]:
+            planned_dates[order_id] = delivery_date
+    
+    Order.objects.bulk_update(
+        [Order(pk=order_id, planned_delivery_date=planned_date) for order_id, planned_date in planned_dates.items()],
+        ['planned_delivery_date'],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('orders', '0007_documentsequence'),
+        ('seasons', '0004_seasonproduct_waiting_on_room_duration'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='planned_delivery_date',
+            field=models.DateField(blank=True, editable=False, help_text='Kalemlerin üretim sürelerinden otomatik hesaplanır (en geç teslimat)', null=True, verbose_name='Planlanan Teslimat Tarihi'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['planned_delivery_date'], name='order_planned_delivery_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('planned_delivery_date__gt', models.F('requested_delivery_date'))), fields=['season', 'planned_delivery_date'], name='order_planned_late_idx'),
+        ),
+        migrations.RunPython(fill_planned_delivery_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:04
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_planting_request_counters(apps, schema_editor):
+    """Mevcut taleplerin sipariş ve müşteri sayılarını bağlı kalemlerden doldurur"""
+    PlantingRequest = apps.get_model('orders', 'PlantingRequest')
+    links = PlantingRequest.order_items.through.objects.order_by().values('plantingrequest_id').annotate(
+        order_count=Count('orderitem__order_id', distinct=True),
+        customer_count=Count('orderitem__order__customer_id', distinct=True)
+    )
+    PlantingRequest.objects.bulk_update(
+        [
+            PlantingRequest(
+                pk=row['plantingrequest_id'],
+                order_count=row['order_count'],
+                customer_count=row['customer_count']
+            )
+            for row in links
+        ],
+        ['order_count', 'customer_count'],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_planned_delivery_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantingrequest',
+            name='customer_count',
+            field=models.PositiveIntegerField(default=0, help_text='Bu talepteki farklı müşteri sayısı', verbose_name='Müşteri Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='plantingrequest',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0, help_text='Bu talepteki farklı sipariş sayısı', verbose_name='Sipariş Sayısı'),
+        ),
+        migrations.RunPython(fill_planting_request_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_last_name_idx'),
+        ('orders', '0009_plantingrequest_counters'),
+        ('products', '0001_initial'),
+        ('seasons', '0004_seasonproduct_waiting_on_room_duration'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['season', 'created_at'], name='order_season_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['season', 'status', 'created_at'], name='order_season_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'status'], name='orderitem_order_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantingrequest',
+            index=models.Index(fields=['season', 'created_at'], name='planting_season_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantingrequest',
+            index=models.Index(fields=['season', 'status', 'created_at'], name='planting_season_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantingrequest',
+            index=models.Index(fields=['season', 'status', 'requested_planting_date'], name='planting_season_overdue_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:25
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_blank_areas(apps, schema_editor):
+    # Boş alanlar NULL olarak tutulur (PlantingRequest.save ile aynı)
+    PlantingRequest = apps.get_model('orders', 'PlantingRequest')
+    PlantingRequest.objects.filter(planting_area='').update(planting_area=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_hot_query_indexes'),
+        ('products', '0001_initial'),
+        ('seasons', '0004_seasonproduct_waiting_on_room_duration'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_blank_areas, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='plantingrequest',
+            name='unique_planting_request',
+        ),
+        migrations.AddConstraint(
+            model_name='plantingrequest',
+            constraint=models.UniqueConstraint(models.F('rootstock'), models.F('planting_type'), models.F('requested_planting_date'), models.F('season'), django.db.models.functions.comparison.Coalesce('planting_area', models.Value('')), name='unique_planting_request'),
+        ),
+    ]
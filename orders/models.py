@@ -1,12 +1,110 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from decimal import Decimal
+from contextlib import contextmanager
+import threading
 
 from customers.models import Customer
 from seasons.models import Season, SeasonProduct
 from products.models import Variety, Rootstock
 from accounts.models import User
+from core.pagination import invalidate_cached_counts
+
+
+class DocumentSequence(models.Model):
+    """Belge Numarası Sayacı - Önek ve yıl bazında artan numaralar (ORD, PLT, ...)"""
+    
+    prefix = models.CharField(
+        max_length=10,
+        verbose_name="Önek",
+        help_text="Belge türü öneki (ORD, PLT vs.)"
+    )
+    
+    year = models.PositiveIntegerField(
+        verbose_name="Yıl"
+    )
+    
+    last_value = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Son Değer",
+        help_text="Dağıtılmış en büyük numara"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Güncellenme Tarihi"
+    )
+    
+    def __str__(self):
+        return f"{self.prefix}-{self.year}: {self.last_value}"
+    
+    class Meta:
+        db_table = 'orders_documentsequence'
+        verbose_name = "Belge Numarası Sayacı"
+        verbose_name_plural = "Belge Numarası Sayaçları"
+        
+        constraints = [
+            models.UniqueConstraint(
+                fields=['prefix', 'year'],
+                name='unique_document_sequence'
+            )
+        ]
+
+
+_total_recalculation = threading.local()
+
+
+@contextmanager
+def defer_total_recalculation():
+    """Toplu kalem işlemlerinde sipariş toplamlarını blok sonunda bir kez hesaplar
+    
+    Blok içinde kaydedilen/silinen kalemlerin siparişleri toplanır ve çıkışta
+    her sipariş için tek bir UPDATE çalıştırılır. İç içe kullanılabilir.
+    """
+    pending = getattr(_total_recalculation, 'pending', None)
+    if pending is not None:
+        yield pending
+        return
+    
+    from seasons.services import SeasonPriceMatrixService
+    
+    # Kalem fiyat ve teslimat hesapları blok boyunca sezon başına tek tablo kullanır
+    with SeasonPriceMatrixService.batch():
+        pending = _total_recalculation.pending = {}
+        planned = _total_recalculation.planned = {}
+        try:
+            yield pending
+        finally:
+            _total_recalculation.pending = None
+            _total_recalculation.planned = None
+        
+        Order.recalculate_totals(pending.keys())
+        for order in pending.values():
+            order.__dict__.pop('total_amount', None)
+        
+        planned_dates = Order.recalculate_planned_delivery_dates(planned.keys())
+        for order_id, order in planned.items():
+            order.planned_delivery_date = planned_dates.get(order_id)
+
+
+def schedule_total_recalculation(order):
+    """Sipariş toplamını hemen veya ertelenmiş blok sonunda günceller"""
+    pending = getattr(_total_recalculation, 'pending', None)
+    if pending is None:
+        order.calculate_total_amount()
+    else:
+        pending.setdefault(order.pk, order)
+
+
+def schedule_planned_date_recalculation(order):
+    """Siparişin planlanan teslimat tarihini hemen veya ertelenmiş blok sonunda günceller"""
+    planned = getattr(_total_recalculation, 'planned', None)
+    if planned is None:
+        order.calculate_planned_delivery_date()
+    else:
+        planned.setdefault(order.pk, order)
 
 
 class Order(models.Model):
@@ -65,6 +163,14 @@ class Order(models.Model):
         help_text="Müşterinin talep ettiği teslimat tarihi"
     )
     
+    planned_delivery_date = models.DateField(
+        verbose_name="Planlanan Teslimat Tarihi",
+        help_text="Kalemlerin üretim sürelerinden otomatik hesaplanır (en geç teslimat)",
+        blank=True,
+        null=True,
+        editable=False
+    )
+    
     actual_shipment_date = models.DateField(
         verbose_name="Fiili Sevk Tarihi",
         help_text="Siparişin gerçekte sevk edildiği tarih",
@@ -143,30 +249,95 @@ class Order(models.Model):
         blank=True
     )
     
+    # Kalemlerden hesaplanan, save() ile üzerine yazılmayan alanlar
+    DERIVED_FIELDS = ['total_amount', 'planned_delivery_date']
+    
+    PLANNED_DATE_BATCH_SIZE = 500
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Teslimat ve sipariş tarihi değişikliğini save() sırasında tespit etmek için sakla
+        instance._loaded_delivery_date = instance.__dict__.get('requested_delivery_date')
+        instance._loaded_order_date = instance.__dict__.get('order_date')
+        instance._loaded_customer_id = instance.__dict__.get('customer_id')
+        return instance
+    
     def save(self, *args, **kwargs):
         # Sipariş numarası otomatik oluştur
         if not self.order_number:
             self.order_number = self.generate_order_number()
         
+        delivery_date_changed = self.delivery_date_changed()
+        order_date_changed = self.order_date_changed()
+        
+        # Toplam tutar ve planlanan teslimat kalemlerden SQL ile güncellenir, eski değerin üzerine yazılmasın
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred_fields = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DERIVED_FIELDS
+                and field.attname not in deferred_fields
+            ]
+        
         super().save(*args, **kwargs)
         
-        # Toplam tutarı hesapla
-        self.calculate_total_amount()
+        # Teslimat tarihi değiştiyse kalemlerin üretim tarihlerini güncelle
+        if delivery_date_changed:
+            from .services import OrderItemService
+            OrderItemService.refresh_production_dates(self.items.all())
+        self._loaded_delivery_date = self._current_delivery_date()
+        
+        # Planlanan teslimat sipariş tarihinden ileri doğru hesaplanır
+        if order_date_changed:
+            self.calculate_planned_delivery_date()
+        self._loaded_order_date = self.order_date
+        
+        # Müşteri değişirse bağlı ekim taleplerinin müşteri sayısı değişebilir
+        if hasattr(self, '_loaded_customer_id') and self.customer_id != self._loaded_customer_id:
+            PlantingRequest.recalculate_totals_for_items(self.items.values_list('id', flat=True))
+        self._loaded_customer_id = self.customer_id
+        
+        from .services import OrderService
+        OrderService.invalidate_season_statistics(self.season_id)
+        invalidate_cached_counts('orders')
+    
+    def delete(self, *args, **kwargs):
+        season_id = self.season_id
+        # Kalemlerle birlikte silinecek talep bağlantıları önceden alınır
+        planting_request_ids = list(PlantingRequest.order_items.through.objects.filter(
+            orderitem__order_id=self.pk
+        ).values_list('plantingrequest_id', flat=True))
+        result = super().delete(*args, **kwargs)
+        PlantingRequest.recalculate_totals(planting_request_ids)
+        
+        from .services import OrderService
+        OrderService.invalidate_season_statistics(season_id)
+        invalidate_cached_counts('orders')
+        return result
+    
+    def _current_delivery_date(self):
+        return self._meta.get_field('requested_delivery_date').to_python(
+            self.requested_delivery_date
+        )
+    
+    def delivery_date_changed(self):
+        """Veritabanından yüklendikten sonra teslimat tarihi değişti mi?"""
+        if not hasattr(self, '_loaded_delivery_date'):
+            return False
+        return self._current_delivery_date() != self._loaded_delivery_date
+    
+    def order_date_changed(self):
+        """Veritabanından yüklendikten sonra sipariş tarihi değişti mi?"""
+        if not hasattr(self, '_loaded_order_date'):
+            return False
+        return self.order_date != self._loaded_order_date
     
     def generate_order_number(self):
         """Sipariş numarası oluşturur: ORD-2024-001"""
-        year = timezone.now().year
-        last_order = Order.objects.filter(
-            order_number__startswith=f'ORD-{year}-'
-        ).order_by('order_number').last()
-        
-        if last_order:
-            last_number = int(last_order.order_number.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-        
-        return f'ORD-{year}-{new_number:03d}'
+        from .services import DocumentNumberService
+        return DocumentNumberService.next_number('ORD', Order, 'order_number')
     
     def get_status_display(self):
         """Durumun görüntüleme adını döndürür"""
@@ -174,34 +345,95 @@ class Order(models.Model):
     
     def calculate_total_amount(self):
         """Toplam tutarı hesapla"""
-        total = sum(item.total_price for item in self.items.all())
-        if self.total_amount != total:
-            self.total_amount = total
-            Order.objects.filter(pk=self.pk).update(total_amount=total)
+        Order.recalculate_totals([self.pk])
+        # Güncel değer bir sonraki erişimde veritabanından okunur
+        self.__dict__.pop('total_amount', None)
+    
+    @staticmethod
+    def recalculate_totals(order_ids):
+        """Verilen siparişlerin toplam tutarını tek bir UPDATE ile kalemlerden hesaplar"""
+        order_ids = [order_id for order_id in set(order_ids) if order_id is not None]
+        if not order_ids:
+            return 0
+        
+        items_total = OrderItem.objects.filter(
+            order_id=models.OuterRef('pk')
+        ).order_by().values('order_id').annotate(
+            total=models.Sum('total_price')
+        ).values('total')
+        
+        return Order.objects.filter(pk__in=order_ids).update(
+            total_amount=Coalesce(
+                models.Subquery(items_total, output_field=models.DecimalField(max_digits=15, decimal_places=2)),
+                models.Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=15, decimal_places=2)
+            )
+        )
     
     def calculate_planned_delivery_date(self):
         """Planlanan teslimat tarihini hesapla (en uzun üretim süresi)"""
-        if not self.items.exists():
-            return None
+        self.planned_delivery_date = Order.recalculate_planned_delivery_dates([self.pk]).get(self.pk)
+        return self.planned_delivery_date
+    
+    @staticmethod
+    def recalculate_planned_delivery_dates(order_ids):
+        """Verilen siparişlerin planlanan teslimat tarihini kalemlerden hesaplayıp yazar
         
-        max_delivery_date = None
-        for item in self.items.all():
-            if item.season_product:
-                from seasons.services import SeasonProductService
-                item_delivery_date = SeasonProductService.calculate_delivery_date(
-                    item.season_product,
-                    self.order_date.date(),
-                    item.stem_type
-                )
-                if not max_delivery_date or item_delivery_date > max_delivery_date:
-                    max_delivery_date = item_delivery_date
+        Tarih, sipariş tarihine göre en geç teslim edilebilecek kalemin teslimat
+        tarihidir. Süreler sezon fiyat tablosundan okunur, yalnızca değişen
+        siparişler toplu güncellenir. {sipariş_id: tarih} sözlüğü döner.
+        """
+        from seasons.services import SeasonPriceMatrixService
         
-        return max_delivery_date
-    
-    @property
-    def planned_delivery_date(self):
-        """Planlanan teslimat tarihi"""
-        return self.calculate_planned_delivery_date()
+        order_ids = sorted({order_id for order_id in order_ids if order_id is not None})
+        planned_dates = {}
+        # Sezon tabloları bir kez alınır, kalem satırlarında yeniden kullanılır
+        matrices = {}
+        
+        def get_matrix(season_id):
+            matrix = matrices.get(season_id)
+            if matrix is None:
+                matrix = matrices[season_id] = SeasonPriceMatrixService.get_matrix(season_id)
+            return matrix
+        
+        for start in range(0, len(order_ids), Order.PLANNED_DATE_BATCH_SIZE):
+            chunk = order_ids[start:start + Order.PLANNED_DATE_BATCH_SIZE]
+            orders = {
+                order_id: (season_id, order_date.date(), current_date)
+                for order_id, season_id, order_date, current_date in Order.objects.filter(
+                    pk__in=chunk
+                ).values_list('id', 'season_id', 'order_date', 'planned_delivery_date')
+            }
+            items = OrderItem.objects.filter(order_id__in=chunk).order_by().values_list(
+                'order_id', 'season_product_id', 'season_product__season_id', 'stem_type'
+            ).distinct()
+            
+            for season_id, _, _ in orders.values():
+                get_matrix(season_id)
+            
+            chunk_dates = dict.fromkeys(orders)
+            for order_id, season_product_id, product_season_id, stem_type in items:
+                if season_product_id is None:
+                    continue
+                season_id, order_date, _ = orders[order_id]
+                matrix = matrices[season_id]
+                if season_product_id not in matrix:
+                    matrix = get_matrix(product_season_id)
+                
+                delivery_date = matrix.delivery_date(season_product_id, stem_type, order_date)
+                if delivery_date and (chunk_dates[order_id] is None or delivery_date > chunk_dates[order_id]):
+                    chunk_dates[order_id] = delivery_date
+            
+            changed_orders = [
+                Order(pk=order_id, planned_delivery_date=planned_date)
+                for order_id, planned_date in chunk_dates.items()
+                if planned_date != orders[order_id][2]
+            ]
+            if changed_orders:
+                Order.objects.bulk_update(changed_orders, ['planned_delivery_date'])
+            planned_dates.update(chunk_dates)
+        
+        return planned_dates
     
     @property
     def is_overdue(self):
@@ -261,8 +493,18 @@ class Order(models.Model):
         indexes = [
             models.Index(fields=['customer', 'season'], name='order_customer_season_idx'),
             models.Index(fields=['status'], name='order_status_idx'),
+            # Sezon listesi (-created_at, -id) ve durum filtresi sıralamasız okunur
+            models.Index(fields=['season', 'created_at'], name='order_season_created_idx'),
+            models.Index(fields=['season', 'status', 'created_at'], name='order_season_status_idx'),
             models.Index(fields=['order_date'], name='order_date_idx'),
             models.Index(fields=['requested_delivery_date'], name='order_requested_delivery_idx'),
+            models.Index(fields=['planned_delivery_date'], name='order_planned_delivery_idx'),
+            # Planlanan tarihi istenen tarihi geçen siparişler için kısmi indeks
+            models.Index(
+                fields=['season', 'planned_delivery_date'],
+                condition=models.Q(planned_delivery_date__gt=models.F('requested_delivery_date')),
+                name='order_planned_late_idx'
+            ),
         ]
 
 
@@ -400,7 +642,60 @@ class OrderItem(models.Model):
         default=OrderItemStatus.WAITING,
         verbose_name="Durum"
     )
+    
+    # Üretim Aşaması Tarihleri (teslimat tarihinden geriye doğru hesaplanır)
+    rootstock_planting_date = models.DateField(
+        verbose_name="Anaç Ekim Tarihi",
+        blank=True,
+        null=True,
+        help_text="Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır"
+    )
+    
+    scion_planting_date = models.DateField(
+        verbose_name="Kalem Ekim Tarihi",
+        blank=True,
+        null=True,
+        help_text="Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır"
+    )
+    
+    grafting_date = models.DateField(
+        verbose_name="Aşılama Tarihi",
+        blank=True,
+        null=True,
+        help_text="Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır"
+    )
+    
+    head_formation_date = models.DateField(
+        verbose_name="Kafa Kesimi Tarihi",
+        blank=True,
+        null=True,
+        help_text="Teslimat tarihi ve ürün sürelerinden otomatik hesaplanır"
+    )
+    
+    PRODUCTION_DATE_FIELDS = [
+        'rootstock_planting_date',
+        'scion_planting_date',
+        'grafting_date',
+        'head_formation_date',
+    ]
+    
+    # Üretim tarihlerinin hesaplandığı alanlar (sipariş teslimat tarihini taşır)
+    PRODUCTION_DATE_SOURCE_FIELDS = ['season_product', 'season_product_id', 'stem_type', 'order', 'order_id']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Planlanan teslimatı etkileyen değişiklikleri save() sırasında tespit etmek için sakla
+        instance._loaded_delivery_key = instance._delivery_key()
+        instance._loaded_amounts = instance._amounts()
+        return instance
+    
+    def _delivery_key(self):
+        return (self.__dict__.get('season_product_id'), self.__dict__.get('stem_type'))
+    
+    def _amounts(self):
+        return (self.__dict__.get('quantity'), self.__dict__.get('viol_count'))
+    
     def save(self, *args, **kwargs):
         # Toplam fiyatı hesapla
         self.total_price = self.unit_price * self.quantity
@@ -410,154 +705,113 @@ class OrderItem(models.Model):
             self.variety = self.season_product.variety
             self.rootstock = self.season_product.rootstock
         
+        # Sadece durum gibi alanlar güncelleniyorsa tarih ve toplam hesabı atlanır
+        update_fields = kwargs.get('update_fields')
+        
+        # Ürün veya gövde tipi değişirse siparişin planlanan teslimat tarihi değişebilir
+        delivery_key_changed = (
+            update_fields is None or {'season_product', 'stem_type'} & set(update_fields)
+        ) and self._delivery_key() != getattr(self, '_loaded_delivery_key', None)
+        
+        # Miktar değişirse bağlı ekim taleplerinin toplamları güncellenir
+        amounts_changed = (
+            not self._state.adding
+            and (update_fields is None or {'quantity', 'viol_count'} & set(update_fields))
+            and self._amounts() != getattr(self, '_loaded_amounts', None)
+        )
+        
+        # Üretim aşaması tarihlerini güncelle; kaynak alanlardan biri kaydediliyorsa
+        # yeniden hesaplanan tarihler de kaydedilecek alanlara eklenir
+        if update_fields is None or set(update_fields) & {
+            *self.PRODUCTION_DATE_FIELDS, *self.PRODUCTION_DATE_SOURCE_FIELDS
+        }:
+            self.refresh_production_dates()
+            if update_fields is not None:
+                update_fields = kwargs['update_fields'] = list(
+                    dict.fromkeys([*update_fields, *self.PRODUCTION_DATE_FIELDS])
+                )
+        
         super().save(*args, **kwargs)
         
         # Ana siparişin toplam tutarını güncelle
-        self.order.calculate_total_amount()
+        if update_fields is None or 'total_price' in update_fields:
+            schedule_total_recalculation(self.order)
+        
+        if delivery_key_changed:
+            schedule_planned_date_recalculation(self.order)
+        self._loaded_delivery_key = self._delivery_key()
+        
+        if amounts_changed:
+            PlantingRequest.recalculate_totals_for_items([self.pk])
+        self._loaded_amounts = self._amounts()
+        
+        # Miktar ve viol sayısı sezon istatistiklerine yansır
+        if update_fields is None or {'quantity', 'viol_count', 'total_price'} & set(update_fields):
+            from .services import OrderService
+            OrderService.invalidate_season_statistics(self.order.season_id)
+        
+        # Sipariş listesi kalem tarihlerine göre de filtrelenir
+        invalidate_cached_counts('orders')
     
     def delete(self, *args, **kwargs):
         order = self.order
-        super().delete(*args, **kwargs)
-        # Silindikten sonra ana siparişin toplam tutarını güncelle
-        order.calculate_total_amount()
+        # Bağlantılar silmeyle birlikte gittiği için talepler önceden alınır
+        planting_request_ids = list(self.planting_requests.values_list('id', flat=True))
+        result = super().delete(*args, **kwargs)
+        # Silindikten sonra ana siparişin toplam tutarını ve planlanan teslimatını güncelle
+        schedule_total_recalculation(order)
+        schedule_planned_date_recalculation(order)
+        PlantingRequest.recalculate_totals(planting_request_ids)
+        
+        from .services import OrderService
+        OrderService.invalidate_season_statistics(order.season_id)
+        invalidate_cached_counts('orders')
+        return result
+    
+    def get_price_matrix(self):
+        """Sezon ürününün fiyat tablosu (normalde siparişin sezonu)"""
+        from seasons.services import SeasonPriceMatrixService
+        matrix = SeasonPriceMatrixService.get_matrix(self.order.season_id)
+        if self.season_product_id not in matrix:
+            matrix = SeasonPriceMatrixService.get_matrix(self.season_product.season_id)
+        return matrix
     
     @property
     def planned_delivery_date(self):
         """Bu kalem için planlanan teslimat tarihi"""
-        if self.season_product:
-            from seasons.services import SeasonProductService
-            return SeasonProductService.calculate_delivery_date(
-                self.season_product,
-                self.order.order_date.date(),
-                self.stem_type
+        if self.season_product_id:
+            return self.get_price_matrix().delivery_date(
+                self.season_product_id, self.stem_type, self.order.order_date.date()
             )
         return None
     
     @property
     def unit_price_for_month(self):
         """Teslimat ayına göre birim fiyat (seasons modelindeki 18 aylık fiyattan)"""
-        if not self.season_product or not self.planned_delivery_date:
+        if not self.season_product_id:
             return Decimal('0.00')
         
-        # Sipariş tarihi ile teslimat tarihi arasındaki ay farkı
-        order_month = self.order.order_date.month
-        delivery_month = self.planned_delivery_date.month
-        
-        # Yıl farkını da hesaba kat
-        year_diff = self.planned_delivery_date.year - self.order.order_date.year
-        month_diff = (year_diff * 12) + (delivery_month - order_month) + 1
-        
-        # 1-18 ay arasında sınırla
-        month_diff = max(1, min(18, month_diff))
-        
-        # SeasonProduct'tan ilgili ayın fiyatını al
-        if self.stem_type == self.StemType.SINGLE:
-            price_field = f'price_single_stem_{month_diff}'
-        else:
-            price_field = f'price_double_stem_{month_diff}'
-        
-        return getattr(self.season_product, price_field, Decimal('0.00'))
-    
-    @property
-    def rootstock_planting_date(self):
-        """Anaç ekim tarihi - teslimat tarihinden geriye doğru hesaplanan"""
-        if not self.season_product:
-            return None
-        
-        # Teslimat tarihi
-        delivery_date = self.order.requested_delivery_date
-        if not delivery_date:
-            return None
-        
-        from datetime import timedelta
-        
-        # Toplam süre hesaplama
-        total_days = (
-            self.season_product.waiting_on_room_duration +
-            self.season_product.head_formation_duration +
-            self.season_product.scion_planting_duration
+        # Teslimat tarihi ve ay fiyatı sezon fiyat tablosundan sorgusuz okunur
+        return self.get_price_matrix().unit_price(
+            self.season_product_id, self.stem_type, self.order.order_date.date()
         )
-        
-        # Gövde tipine göre aşılama süresi
-        if self.stem_type == self.StemType.SINGLE:
-            total_days += self.season_product.single_stem_grafting_duration
-        else:
-            total_days += self.season_product.double_stem_grafting_duration
-        
-        return delivery_date - timedelta(days=total_days)
     
-    @property
-    def scion_planting_date(self):
-        """Kalem ekim tarihi"""
-        if not self.season_product:
-            return None
-        
-        delivery_date = self.order.requested_delivery_date
-        if not delivery_date:
-            return None
+    def calculate_production_dates(self):
+        """Üretim aşaması tarihlerini teslimat tarihinden geriye doğru hesaplar"""
+        if not self.season_product_id or not self.order.requested_delivery_date:
+            return dict.fromkeys(self.PRODUCTION_DATE_FIELDS)
         
-        from datetime import timedelta
-        
-        total_days = (
-            self.season_product.waiting_on_room_duration +
-            self.season_product.head_formation_duration +
-            self.season_product.scion_planting_duration
+        from seasons.services import SeasonProductService
+        return SeasonProductService.calculate_production_dates(
+            self.season_product,
+            self.order.requested_delivery_date,
+            self.stem_type
         )
-        
-        # Gövde tipine göre aşılama süresi
-        if self.stem_type == self.StemType.SINGLE:
-            total_days += self.season_product.single_stem_grafting_duration
-        else:
-            total_days += self.season_product.double_stem_grafting_duration
-        
-        # Anaç ekim süresini çıkar
-        total_days -= self.season_product.rootstock_planting_duration
-        
-        return delivery_date - timedelta(days=total_days)
     
-    @property
-    def grafting_date(self):
-        """Aşılama tarihi"""
-        if not self.season_product:
-            return None
-        
-        delivery_date = self.order.requested_delivery_date
-        if not delivery_date:
-            return None
-        
-        from datetime import timedelta
-        
-        total_days = (
-            self.season_product.waiting_on_room_duration +
-            self.season_product.head_formation_duration
-        )
-        
-        # Gövde tipine göre aşılama süresi
-        if self.stem_type == self.StemType.SINGLE:
-            total_days += self.season_product.single_stem_grafting_duration
-        else:
-            total_days += self.season_product.double_stem_grafting_duration
-        
-        return delivery_date - timedelta(days=total_days)
-    
-    @property
-    def head_formation_date(self):
-        """Kafa kesimi/oluşturma tarihi"""
-        if not self.season_product:
-            return None
-        
-        delivery_date = self.order.requested_delivery_date
-        if not delivery_date:
-            return None
-        
-        from datetime import timedelta
-        
-        total_days = (
-            self.season_product.waiting_on_room_duration +
-            self.season_product.head_formation_duration
-        )
-        
-        return delivery_date - timedelta(days=total_days)
+    def refresh_production_dates(self):
+        """Üretim aşaması tarihlerini yeniden hesaplayıp alanlara yazar"""
+        for field, value in self.calculate_production_dates().items():
+            setattr(self, field, value)
     
     def __str__(self):
         return f"{self.order.order_number} - {self.variety.get_full_name()} ({self.quantity} adet)"
@@ -570,8 +824,14 @@ class OrderItem(models.Model):
         
         indexes = [
             models.Index(fields=['order'], name='orderitem_order_idx'),
+            # Sezon kalemleri sipariş üzerinden durumla süzülür
+            models.Index(fields=['order', 'status'], name='orderitem_order_status_idx'),
             models.Index(fields=['season_product'], name='orderitem_seasonproduct_idx'),
             models.Index(fields=['variety'], name='orderitem_variety_idx'),
+            models.Index(fields=['rootstock_planting_date'], name='orderitem_rootstock_date_idx'),
+            models.Index(fields=['scion_planting_date'], name='orderitem_scion_date_idx'),
+            models.Index(fields=['grafting_date'], name='orderitem_grafting_date_idx'),
+            models.Index(fields=['head_formation_date'], name='orderitem_head_date_idx'),
         ]
 
 
@@ -762,6 +1022,18 @@ class PlantingRequest(models.Model):
         help_text="Bu talepteki toplam viol sayısı"
     )
     
+    order_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Sipariş Sayısı",
+        help_text="Bu talepteki farklı sipariş sayısı"
+    )
+    
+    customer_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Müşteri Sayısı",
+        help_text="Bu talepteki farklı müşteri sayısı"
+    )
+    
     planting_quantity = models.PositiveIntegerField(
         default=0,
         verbose_name="Ekim Adedi",
@@ -821,42 +1093,97 @@ class PlantingRequest(models.Model):
         blank=True
     )
     
+    # Bağlı kalemlerden hesaplanan sayaçlar
+    TOTAL_FIELDS = ['total_quantity', 'total_viol_count', 'order_count', 'customer_count']
+    
     def save(self, *args, **kwargs):
         # Talep numarası otomatik oluştur
         if not self.request_number:
             self.request_number = self.generate_request_number()
         
+        # Alansız talepler tek biçimde (NULL) tutulur, benzersizlik kısıtı ikisini aynı sayar
+        self.planting_area = (self.planting_area or '').strip() or None
+        
         super().save(*args, **kwargs)
         
         # Toplam miktarları hesapla
         self.calculate_totals()
+        
+        # Ekim alanı filtre listesi yenilensin
+        from .services import PlantingRequestService
+        PlantingRequestService.invalidate_planting_areas(self.season_id)
+        invalidate_cached_counts('planting_requests')
+    
+    def delete(self, *args, **kwargs):
+        season_id = self.season_id
+        result = super().delete(*args, **kwargs)
+        
+        from .services import PlantingRequestService
+        PlantingRequestService.invalidate_planting_areas(season_id)
+        invalidate_cached_counts('planting_requests')
+        return result
     
     def generate_request_number(self):
         """Talep numarası oluşturur: PLT-2024-001"""
-        year = timezone.now().year
-        last_request = PlantingRequest.objects.filter(
-            request_number__startswith=f'PLT-{year}-'
-        ).order_by('request_number').last()
-        
-        if last_request:
-            last_number = int(last_request.request_number.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-        
-        return f'PLT-{year}-{new_number:03d}'
+        from .services import DocumentNumberService
+        return DocumentNumberService.next_number('PLT', PlantingRequest, 'request_number')
     
     def calculate_totals(self):
         """Toplam miktarları hesapla"""
         if self.pk:  # Nesne kaydedildiyse
-            total_qty = sum(item.quantity for item in self.order_items.all())
-            total_viol = sum(item.viol_count for item in self.order_items.all())
-            
-            if self.total_quantity != total_qty or self.total_viol_count != total_viol:
-                PlantingRequest.objects.filter(pk=self.pk).update(
-                    total_quantity=total_qty,
-                    total_viol_count=total_viol
-                )
+            PlantingRequest.recalculate_totals([self.pk])
+            # Güncel değerler bir sonraki erişimde veritabanından okunur
+            for field in PlantingRequest.TOTAL_FIELDS:
+                self.__dict__.pop(field, None)
+    
+    @staticmethod
+    def recalculate_totals(request_ids):
+        """Verilen taleplerin miktar, viol, sipariş ve müşteri sayılarını tek bir UPDATE ile hesaplar"""
+        request_ids = [request_id for request_id in set(request_ids) if request_id is not None]
+        if not request_ids:
+            return 0
+        
+        links = PlantingRequest.order_items.through.objects.filter(
+            plantingrequest_id=models.OuterRef('pk')
+        ).order_by().values('plantingrequest_id')
+        
+        def linked_sum(field_name):
+            return Coalesce(
+                models.Subquery(
+                    links.annotate(total=models.Sum(f'orderitem__{field_name}')).values('total'),
+                    output_field=models.PositiveIntegerField()
+                ),
+                models.Value(0),
+                output_field=models.PositiveIntegerField()
+            )
+        
+        def linked_count(field_name):
+            return Coalesce(
+                models.Subquery(
+                    links.annotate(
+                        total=models.Count(f'orderitem__{field_name}', distinct=True)
+                    ).values('total'),
+                    output_field=models.PositiveIntegerField()
+                ),
+                models.Value(0),
+                output_field=models.PositiveIntegerField()
+            )
+        
+        return PlantingRequest.objects.filter(pk__in=request_ids).update(
+            total_quantity=linked_sum('quantity'),
+            total_viol_count=linked_sum('viol_count'),
+            order_count=linked_count('order_id'),
+            customer_count=linked_count('order__customer_id')
+        )
+    
+    @staticmethod
+    def recalculate_totals_for_items(item_ids):
+        """Verilen kalemlerin bağlı olduğu taleplerin toplamlarını yeniden hesaplar"""
+        return PlantingRequest.recalculate_totals(
+            PlantingRequest.order_items.through.objects.filter(
+                orderitem_id__in=item_ids
+            ).values_list('plantingrequest_id', flat=True)
+        )
     
     def get_orders(self):
         """Bu talebe dahil olan siparişleri döndürür"""
@@ -874,8 +1201,14 @@ class PlantingRequest(models.Model):
     def product_display(self):
         """Ürün görüntü adı"""
         if self.pk:
-            # OrderItem'lardan çeşitleri al
-            varieties = self.order_items.values_list('variety__name', flat=True).distinct()
+            # OrderItem'lardan çeşitleri al (önceden yüklendiyse sorgusuz)
+            prefetched_items = getattr(self, '_prefetched_objects_cache', {}).get('order_items')
+            if prefetched_items is not None:
+                varieties = list(dict.fromkeys(
+                    item.variety.name for item in prefetched_items if item.variety_id
+                ))
+            else:
+                varieties = self.order_items.values_list('variety__name', flat=True).distinct()
             if varieties:
                 varieties_str = ', '.join(filter(None, varieties))
                 if self.rootstock:
@@ -908,16 +1241,6 @@ class PlantingRequest(models.Model):
             return timezone.now().date() > self.requested_planting_date
         return False
     
-    @property
-    def order_count(self):
-        """Kaç farklı sipariş var?"""
-        return self.get_orders().count()
-    
-    @property
-    def customer_count(self):
-        """Kaç farklı müşteri var?"""
-        return self.get_customers().count()
-    
     def can_send_to_planting(self):
         """Ekime gönderilebilir mi?"""
         return self.status == self.RequestStatus.PENDING
@@ -981,11 +1304,23 @@ class PlantingRequest(models.Model):
             models.Index(fields=['status'], name='planting_status_idx'),
             models.Index(fields=['requested_planting_date'], name='planting_date_idx'),
             models.Index(fields=['planting_area'], name='planting_area_idx'),
+            models.Index(fields=['season', 'created_at'], name='planting_season_created_idx'),
+            models.Index(fields=['season', 'status', 'created_at'], name='planting_season_status_idx'),
+            # Geciken talepler: açık durumlar ve istenen ekim tarihi aralığı
+            models.Index(
+                fields=['season', 'status', 'requested_planting_date'],
+                name='planting_season_overdue_idx'
+            ),
         ]
         
         constraints = [
+            # Aynı anaç ve gün farklı ekim alanlarına ayrı taleplerle planlanabilir
             models.UniqueConstraint(
-                fields=['rootstock', 'planting_type', 'requested_planting_date', 'season'],
+                models.F('rootstock'),
+                models.F('planting_type'),
+                models.F('requested_planting_date'),
+                models.F('season'),
+                Coalesce('planting_area', models.Value('')),
                 name='unique_planting_request'
             )
         ]
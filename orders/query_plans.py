@@ -0,0 +1,222 @@
+"""Sık kullanılan görünümlerin sorgu planları (explain_hot_queries komutu)
+
+Her kayıt bir görünümün arkasındaki servis çağrısını veya queryset'i yer
+tutucu kimliklerle çalıştırır. Bu sırada çalışan SELECT sorguları yakalanıp
+SQLite ``EXPLAIN QUERY PLAN`` çıktısı alınır; tam tablo taramaları ve geçici
+B-tree (sıralama/gruplama) adımları işaretlenir. Çıktı ``query_plans.txt``
+olarak depoda tutulur, plan değişiklikleri kod incelemesinde görünür.
+"""
+import difflib
+from datetime import date
+
+from django.db import connections, transaction
+from django.db.models import QuerySet
+
+from core.pagination import DEFAULT_KEYSET_ORDERING
+
+
+# Plan çıktısı parametre değerlerine bağlı değildir, sabit değerler yeterli
+SEASON_ID = 1
+ORDER_ID = 1
+CUSTOMER_ID = 1
+TODAY = date(2026, 1, 15)
+WEEK_END = date(2026, 1, 21)
+
+FULL_SCAN = 'FULL SCAN'
+TEMP_BTREE = 'TEMP B-TREE'
+
+
+def _order_list():
+    from .services import OrderService
+    return OrderService.get_orders_by_season(SEASON_ID).order_by(*DEFAULT_KEYSET_ORDERING)[:25]
+
+
+def _order_list_status():
+    from .models import Order
+    from .services import OrderService
+    return OrderService.get_orders_by_season(SEASON_ID).filter(
+        status=Order.OrderStatus.CONFIRMED
+    ).order_by(*DEFAULT_KEYSET_ORDERING)[:25]
+
+
+def _order_list_planting_range():
+    from .models import OrderItem
+    from .services import OrderService
+    planting_items = OrderItem.objects.filter(rootstock_planting_date__range=(TODAY, WEEK_END))
+    return OrderService.get_orders_by_season(SEASON_ID).filter(
+        id__in=planting_items.values('order_id')
+    ).order_by(*DEFAULT_KEYSET_ORDERING)[:25]
+
+
+def _late_orders():
+    from .services import OrderService
+    return OrderService.get_late_orders(SEASON_ID)
+
+
+def _season_statistics():
+    from .services import OrderService
+    return OrderService.calculate_season_order_statistics([SEASON_ID], TODAY)
+
+
+def _season_calendar():
+    from .services import ProductionCalendarService
+    return ProductionCalendarService.load_season_arrays(SEASON_ID)
+
+
+def _season_items_status():
+    from .models import OrderItem
+    return OrderItem.objects.filter(
+        order__season_id=SEASON_ID, status=OrderItem.OrderItemStatus.WAITING
+    ).select_related('order', 'variety', 'rootstock')
+
+
+def _pending_rootstock_items():
+    from .services import PlantingScheduleService
+    return PlantingScheduleService.load_pending_groups(SEASON_ID)
+
+
+def _pending_scion_items():
+    from .models import PlantingRequest
+    from .services import PlantingScheduleService
+    return PlantingScheduleService.load_pending_groups(SEASON_ID, PlantingRequest.PlantingType.SCION)
+
+
+def _order_items():
+    from .services import OrderItemService
+    return OrderItemService.get_items_by_order(ORDER_ID)
+
+
+def _customer_orders():
+    from .services import OrderService
+    return OrderService.get_customer_orders_in_season(CUSTOMER_ID, SEASON_ID)
+
+
+def _planting_list():
+    from .models import PlantingRequest
+    return PlantingRequest.objects.filter(season_id=SEASON_ID).order_by(*DEFAULT_KEYSET_ORDERING)[:20]
+
+
+def _planting_list_status():
+    from .models import PlantingRequest
+    return PlantingRequest.objects.filter(
+        season_id=SEASON_ID, status=PlantingRequest.RequestStatus.SENT
+    ).order_by(*DEFAULT_KEYSET_ORDERING)[:20]
+
+
+def _planting_list_overdue():
+    from .models import PlantingRequest
+    from .services import PlantingRequestService
+    return PlantingRequest.objects.filter(
+        season_id=SEASON_ID,
+        requested_planting_date__lt=TODAY,
+        status__in=PlantingRequestService.OPEN_STATUSES
+    ).order_by(*DEFAULT_KEYSET_ORDERING)[:20]
+
+
+def _planting_statistics():
+    from .services import PlantingRequestService
+    return PlantingRequestService.get_seasons_statistics([SEASON_ID])
+
+
+def _planting_schedule_load():
+    from .services import PlantingScheduleService
+    return PlantingScheduleService.get_existing_load(SEASON_ID, ['A Serası'], TODAY, WEEK_END)
+
+
+def _customer_typeahead():
+    from customers.services import CustomerService
+    return CustomerService.typeahead('Ahm')
+
+
+# (ad, açıklama, çağrı) - çağrı queryset dönerse komut onu da çalıştırır
+HOT_QUERIES = [
+    ('order_list', 'Sezon siparişleri (orders:order_list)', _order_list),
+    ('order_list_status', 'Duruma göre sezon siparişleri', _order_list_status),
+    ('order_list_planting_range', 'Anaç ekim tarihi aralığındaki siparişler', _order_list_planting_range),
+    ('late_orders', 'Planlanan tarihi istenen tarihi geçen siparişler', _late_orders),
+    ('season_statistics', 'Sezon sipariş istatistikleri', _season_statistics),
+    ('season_calendar', 'Sezon üretim takvimi', _season_calendar),
+    ('season_items_status', 'Duruma göre sezon kalemleri', _season_items_status),
+    ('pending_rootstock_items', 'Anaç ekimine gönderilecek kalemler', _pending_rootstock_items),
+    ('pending_scion_items', 'Kalem ekimine gönderilecek kalemler', _pending_scion_items),
+    ('order_items', 'Sipariş kalemleri (sipariş detayı)', _order_items),
+    ('customer_orders', 'Müşterinin sezon siparişleri', _customer_orders),
+    ('planting_list', 'Ekim talepleri (orders:planting_list)', _planting_list),
+    ('planting_list_status', 'Duruma göre ekim talepleri', _planting_list_status),
+    ('planting_list_overdue', 'Geciken ekim talepleri', _planting_list_overdue),
+    ('planting_statistics', 'Sezon ekim istatistikleri', _planting_statistics),
+    ('planting_schedule_load', 'Ekim alanlarının günlük yükü', _planting_schedule_load),
+    ('customer_typeahead', 'Müşteri önek araması', _customer_typeahead),
+]
+
+
+def capture_queries(func, using='default'):
+    """Çağrı sırasında çalışan SELECT sorgularını (sql, parametreler) olarak toplar
+    
+    Çağrı geri alınan bir işlem içinde çalışır; veritabanında iz bırakmaz.
+    """
+    connection = connections[using]
+    queries = []
+    
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            queries.append((sql, params))
+        return execute(sql, params, many, context)
+    
+    with transaction.atomic(using=using):
+        with connection.execute_wrapper(wrapper):
+            result = func()
+            if isinstance(result, QuerySet):
+                list(result)
+        transaction.set_rollback(True, using=using)
+    return queries
+
+
+def explain(sql, params, using='default'):
+    """Sorgunun plan satırlarını ağaç girintisi ve işaretlerle döner"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+    
+    depths = {0: -1}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth = depths.get(parent_id, -1) + 1
+        depths[node_id] = depth
+        
+        flags = []
+        if detail.startswith('SCAN ') and 'USING' not in detail and 'CONSTANT ROW' not in detail:
+            flags.append(FULL_SCAN)
+        if 'TEMP B-TREE' in detail:
+            flags.append(TEMP_BTREE)
+        lines.append(('  ' * depth + detail, flags))
+    return lines
+
+
+def build_report(using='default', names=None):
+    """Tüm sıcak sorguların plan raporunu ve işaret sayılarını döner"""
+    output = []
+    flag_counts = {FULL_SCAN: 0, TEMP_BTREE: 0}
+    
+    for name, description, func in HOT_QUERIES:
+        if names and name not in names:
+            continue
+        
+        output.append(f'== {name}: {description}')
+        for index, (sql, params) in enumerate(capture_queries(func, using), 1):
+            output.append(f'-- sorgu {index}')
+            for line, flags in explain(sql, params, using):
+                for flag in flags:
+                    flag_counts[flag] += 1
+                output.append(f'{line}  <-- {", ".join(flags)}' if flags else line)
+        output.append('')
+    
+    return '\n'.join(output), flag_counts
+
+
+def diff_report(expected, actual):
+    """Anlık görüntü ile güncel rapor arasındaki farklar"""
+    return '\n'.join(difflib.unified_diff(
+        expected.splitlines(), actual.splitlines(),
+        fromfile='query_plans.txt', tofile='güncel', lineterm=''
+    ))
@@ -1,16 +1,145 @@
 from typing import List, Dict, Optional, Tuple
-from django.db import transaction
-from django.db.models import QuerySet, Sum, Count, Q
+from array import array
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import QuerySet, Sum, Count, Q, F, OuterRef, Subquery, Value, IntegerField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from decimal import Decimal
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
-from .models import Order, OrderItem, OrderStatusHistory
+from .models import (
+    Order, OrderItem, OrderStatusHistory, PlantingRequest, DocumentSequence,
+    defer_total_recalculation
+)
 from customers.models import Customer
+from core.models import CacheVersion
+from core.pagination import invalidate_cached_counts
 from seasons.models import Season, SeasonProduct
 from products.models import Variety, Rootstock
 
 
+class DocumentNumberService:
+    """Önek ve yıl bazında çakışmasız belge numarası üretimi
+    
+    Numaralar DocumentSequence tablosunda atomik UPDATE ile ayrılır. Her
+    süreç bir seferde DOCUMENT_SEQUENCE_BLOCK_SIZE kadar numara ayırır ve
+    bunları bellekten dağıtır; süreç kapanırsa kullanılmayan numaralar boşluk
+    olarak kalır. Numaralar benzersizdir ancak ardışık olmaları garanti edilmez.
+    """
+    
+    _blocks: Dict[Tuple[str, int], List[int]] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def next_number(prefix: str, model=None, field: Optional[str] = None, year: Optional[int] = None) -> str:
+        """Sıradaki belge numarasını döner: ORD-2024-001"""
+        year = year or timezone.now().year
+        value = DocumentNumberService.next_value(prefix, year, model, field)
+        return f'{prefix}-{year}-{value:03d}'
+    
+    @staticmethod
+    def next_numbers(
+        prefix: str,
+        count: int,
+        model=None,
+        field: Optional[str] = None,
+        year: Optional[int] = None
+    ) -> List[str]:
+        """Toplu kayıtlar için tek seferde ardışık numara bloğu ayırır"""
+        if count <= 0:
+            return []
+        year = year or timezone.now().year
+        first, last = DocumentNumberService.reserve_block(prefix, year, count, model, field)
+        return [f'{prefix}-{year}-{value:03d}' for value in range(first, last + 1)]
+    
+    @staticmethod
+    def next_value(prefix: str, year: int, model=None, field: Optional[str] = None) -> int:
+        """Sıradaki sayaç değerini döner (önce süreç içi bloktan)"""
+        key = (prefix, year)
+        with DocumentNumberService._lock:
+            block = DocumentNumberService._blocks.get(key)
+            if block and block[0] <= block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+        
+        block_size = max(1, getattr(settings, 'DOCUMENT_SEQUENCE_BLOCK_SIZE', 20))
+        first, last = DocumentNumberService.reserve_block(prefix, year, block_size, model, field)
+        
+        if last > first:
+            def store_block():
+                with DocumentNumberService._lock:
+                    DocumentNumberService._blocks[key] = [first + 1, last]
+            
+            # Dış işlem geri alınırsa ayrılan blok da geri alınır; bu yüzden
+            # kalan numaralar ancak commit sonrası kullanıma açılır
+            transaction.on_commit(store_block)
+        
+        return first
+    
+    @staticmethod
+    def reserve_block(
+        prefix: str,
+        year: int,
+        block_size: int = 1,
+        model=None,
+        field: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Sayaçtan atomik olarak blok ayırır, (ilk, son) değerlerini döner"""
+        sequences = DocumentSequence.objects.filter(prefix=prefix, year=year)
+        
+        with transaction.atomic():
+            updated = sequences.update(
+                last_value=F('last_value') + block_size,
+                updated_at=timezone.now()
+            )
+            
+            if not updated:
+                # İlk kullanımda sayaç mevcut belgelerden başlatılır
+                start = DocumentNumberService.get_existing_max(prefix, year, model, field)
+                try:
+                    with transaction.atomic():
+                        DocumentSequence.objects.create(
+                            prefix=prefix, year=year, last_value=start + block_size
+                        )
+                except IntegrityError:
+                    # Başka bir süreç aynı anda oluşturdu
+                    sequences.update(
+                        last_value=F('last_value') + block_size,
+                        updated_at=timezone.now()
+                    )
+            
+            last = sequences.values_list('last_value', flat=True).get()
+        
+        return last - block_size + 1, last
+    
+    @staticmethod
+    def get_existing_max(prefix: str, year: int, model=None, field: Optional[str] = None) -> int:
+        """Sayaç yokken mevcut kayıtlardaki en büyük numarayı bulur"""
+        if model is None or field is None:
+            return 0
+        
+        numbers = model.objects.filter(
+            **{f'{field}__startswith': f'{prefix}-{year}-'}
+        ).values_list(field, flat=True)
+        
+        max_value = 0
+        for number in numbers.iterator():
+            suffix = number.rsplit('-', 1)[-1]
+            if suffix.isdigit():
+                max_value = max(max_value, int(suffix))
+        return max_value
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Süreç içi ayrılmış blokları bırakır (kalan numaralar boşluk olur)"""
+        with DocumentNumberService._lock:
+            DocumentNumberService._blocks.clear()
+
+
 class OrderService:
     """Sipariş yönetimi için servis sınıfı"""
     
@@ -60,7 +189,7 @@ class OrderService:
         old_status = order.status
         
         order.status = new_status
-        order.save()
+        order.save(update_fields=['status', 'updated_at'])
         
         # Durum geçmişi oluştur
         OrderStatusHistoryService.create_status_change(
@@ -73,47 +202,248 @@ class OrderService:
         
         return order
     
+    # Toplu geçişlerde hedef duruma göre izin verilen kaynak durumlar
+    BULK_TRANSITION_SOURCES = {
+        Order.OrderStatus.CONFIRMED: [Order.OrderStatus.DRAFT],
+        Order.OrderStatus.WAITING: [Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED],
+        Order.OrderStatus.CANCELLED: [
+            Order.OrderStatus.DRAFT,
+            Order.OrderStatus.CONFIRMED,
+            Order.OrderStatus.WAITING,
+            Order.OrderStatus.AWAITING_SHIPMENT,
+            Order.OrderStatus.SHIPPED,
+        ],
+    }
+    
+    @staticmethod
+    def bulk_transition(
+        order_ids: List,
+        to_status: str,
+        user=None,
+        notes: Optional[str] = None,
+        from_statuses: Optional[List[str]] = None,
+        season_id: Optional[int] = None
+    ) -> Dict:
+        """Siparişlerin durumunu tek UPDATE ile toplu olarak değiştirir
+        
+        Kaynak durum kontrolü SQL tarafında yapılır ve durum geçmişi toplu
+        eklenir. Dönen sözlükte başarılı sipariş id'leri ile başarısız
+        id'lerin sebepleri bulunur. BULK_TRANSITION_SOURCES'ta olmayan hedef
+        durumlar için from_statuses açıkça verilmelidir.
+        """
+        if to_status not in Order.OrderStatus.values:
+            raise ValueError(f'Geçersiz sipariş durumu: {to_status}')
+        if from_statuses is None:
+            from_statuses = OrderService.BULK_TRANSITION_SOURCES.get(to_status)
+            if from_statuses is None:
+                raise ValueError(f'{to_status} durumuna toplu geçiş için kaynak durumlar belirtilmelidir')
+        else:
+            invalid_statuses = set(from_statuses) - set(Order.OrderStatus.values)
+            if invalid_statuses:
+                raise ValueError(f'Geçersiz kaynak durum: {", ".join(sorted(invalid_statuses))}')
+        
+        result = {'updated': [], 'failed': {}}
+        
+        requested_ids = []
+        for order_id in order_ids:
+            try:
+                requested_ids.append(int(order_id))
+            except (TypeError, ValueError):
+                result['failed'][order_id] = 'Geçersiz sipariş numarası'
+        
+        if not requested_ids:
+            return result
+        
+        orders = Order.objects.filter(id__in=requested_ids)
+        if season_id is not None:
+            orders = orders.filter(season_id=season_id)
+        
+        with transaction.atomic():
+            current_rows = list(orders.select_for_update().values_list('id', 'status', 'season_id'))
+            current_statuses = {order_id: status for order_id, status, _ in current_rows}
+            
+            eligible = {
+                order_id: status
+                for order_id, status in current_statuses.items()
+                if status != to_status and status in from_statuses
+            }
+            
+            if eligible:
+                Order.objects.filter(
+                    id__in=eligible.keys(),
+                    status__in=set(eligible.values())
+                ).update(status=to_status, updated_at=timezone.now())
+                
+                changed_by = user if getattr(user, 'pk', None) else None
+                OrderStatusHistory.objects.bulk_create([
+                    OrderStatusHistory(
+                        order_id=order_id,
+                        from_status=from_status,
+                        to_status=to_status,
+                        changed_by=changed_by,
+                        notes=notes
+                    )
+                    for order_id, from_status in eligible.items()
+                ])
+                
+                OrderService.invalidate_season_statistics(*{
+                    season_id for order_id, _, season_id in current_rows if order_id in eligible
+                })
+                invalidate_cached_counts('orders')
+        
+        for order_id in requested_ids:
+            if order_id in eligible:
+                result['updated'].append(order_id)
+            elif order_id not in current_statuses:
+                result['failed'][order_id] = 'Sipariş bulunamadı'
+            else:
+                result['failed'][order_id] = 'Sipariş bu duruma geçirilemez'
+        
+        return result
+    
+    # Sezon istatistikleri önbellek anahtarı; gecikme hesabı güne bağlı olduğu için tarih içerir.
+    # Damga veritabanında tutulur (CacheVersion), geçersiz kılma tüm süreçlere ulaşır
+    STATISTICS_CACHE_KEY = 'orders:season_stats:{season_id}:{version}:{day}'
+    STATISTICS_VERSION_KEY = 'orders:season_stats:{season_id}'
+    
+    @staticmethod
+    def _statistics_version_key(season_id: int) -> str:
+        return OrderService.STATISTICS_VERSION_KEY.format(season_id=season_id)
+    
     @staticmethod
     def get_season_order_statistics(season_id: int) -> Dict:
         """Sezon sipariş istatistikleri"""
-        orders = Order.objects.filter(season_id=season_id)
-        
-        stats = {
-            'total_orders': orders.count(),
-            'total_amount': orders.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-            'total_quantity': 0,
-            'total_viol_count': 0,
-            'status_breakdown': {},
-            'overdue_orders': 0,
-            'pending_orders': 0
+        return OrderService.get_seasons_order_statistics([season_id])[season_id]
+    
+    @staticmethod
+    def get_seasons_order_statistics(season_ids: List[int]) -> Dict[int, Dict]:
+        """Birden fazla sezonun sipariş istatistiklerini döner: {season_id: stats}
+        
+        Önbellekte olmayan sezonlar sipariş ve kalem tabloları üzerinde birer
+        gruplu sorgu ile hesaplanır ve önbelleğe yazılır.
+        """
+        season_ids = list(dict.fromkeys(season_ids))
+        today = timezone.now().date()
+        versions = CacheVersion.objects.current_many([
+            OrderService._statistics_version_key(season_id) for season_id in season_ids
+        ])
+        keys = {
+            season_id: OrderService.STATISTICS_CACHE_KEY.format(
+                season_id=season_id,
+                version=versions[OrderService._statistics_version_key(season_id)],
+                day=today.isoformat()
+            )
+            for season_id in season_ids
         }
         
-        # Durum bazında sayımlar
-        for status_choice in Order.OrderStatus.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            count = orders.filter(status=status_code).count()
-            stats['status_breakdown'][status_label] = count
+        cached = cache.get_many(list(keys.values()))
+        stats_by_season = {
+            season_id: cached[key] for season_id, key in keys.items() if key in cached
+        }
         
-        # Toplam miktar ve viol sayısı
-        order_items = OrderItem.objects.filter(order__season_id=season_id)
-        stats['total_quantity'] = order_items.aggregate(Sum('quantity'))['quantity__sum'] or 0
-        stats['total_viol_count'] = order_items.aggregate(Sum('viol_count'))['viol_count__sum'] or 0
+        missing_ids = [season_id for season_id in season_ids if season_id not in stats_by_season]
+        if missing_ids:
+            computed = OrderService.calculate_season_order_statistics(missing_ids, today)
+            cache.set_many(
+                {keys[season_id]: stats for season_id, stats in computed.items()},
+                getattr(settings, 'ORDER_STATISTICS_CACHE_TIMEOUT', 300)
+            )
+            stats_by_season.update(computed)
         
-        # Geciken siparişler
-        today = timezone.now().date()
-        stats['overdue_orders'] = orders.filter(
-            requested_delivery_date__lt=today,
-            status__in=[Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED, 
-                       Order.OrderStatus.WAITING]
-        ).count()
+        return stats_by_season
+    
+    @staticmethod
+    def calculate_season_order_statistics(season_ids: List[int], today: Optional[date] = None) -> Dict[int, Dict]:
+        """Sezon istatistiklerini önbelleğe bakmadan koşullu toplamlarla hesaplar"""
+        today = today or timezone.now().date()
+        open_statuses = [Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED, Order.OrderStatus.WAITING]
+        pending_statuses = [Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED]
+        
+        status_aggregates = {
+            f'status_{status_code}': Count('id', filter=Q(status=status_code))
+            for status_code in Order.OrderStatus.values
+        }
+        order_rows = Order.objects.filter(season_id__in=season_ids).order_by().values('season_id').annotate(
+            total_orders=Count('id'),
+            total_amount=Sum('total_amount'),
+            overdue_orders=Count('id', filter=Q(
+                requested_delivery_date__lt=today,
+                status__in=open_statuses
+            )),
+            pending_orders=Count('id', filter=Q(status__in=pending_statuses)),
+            **status_aggregates
+        )
+        
+        item_rows = OrderItem.objects.filter(order__season_id__in=season_ids).order_by().values(
+            'order__season_id'
+        ).annotate(
+            total_quantity=Sum('quantity'),
+            total_viol_count=Sum('viol_count')
+        )
+        item_totals = {row['order__season_id']: row for row in item_rows}
+        
+        stats_by_season = {}
+        for season_id in season_ids:
+            stats_by_season[season_id] = {
+                'total_orders': 0,
+                'total_amount': Decimal('0.00'),
+                'total_quantity': 0,
+                'total_viol_count': 0,
+                'status_breakdown': {label: 0 for label in Order.OrderStatus.labels},
+                'overdue_orders': 0,
+                'pending_orders': 0
+            }
         
-        # Bekleyen siparişler
-        stats['pending_orders'] = orders.filter(
-            status__in=[Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED]
-        ).count()
+        for row in order_rows:
+            stats = stats_by_season[row['season_id']]
+            stats['total_orders'] = row['total_orders']
+            stats['total_amount'] = row['total_amount'] or Decimal('0.00')
+            stats['overdue_orders'] = row['overdue_orders']
+            stats['pending_orders'] = row['pending_orders']
+            for status_code, status_label in Order.OrderStatus.choices:
+                stats['status_breakdown'][status_label] = row[f'status_{status_code}']
         
-        return stats
+        for season_id, row in item_totals.items():
+            stats = stats_by_season[season_id]
+            stats['total_quantity'] = row['total_quantity'] or 0
+            stats['total_viol_count'] = row['total_viol_count'] or 0
+        
+        return stats_by_season
+    
+    @staticmethod
+    def invalidate_season_statistics(*season_ids: int) -> None:
+        """Sipariş veya kalem değişince sezon istatistikleri damgasını yeniler"""
+        CacheVersion.objects.bump(*[
+            OrderService._statistics_version_key(season_id)
+            for season_id in set(season_ids) if season_id is not None
+        ])
+    
+    @staticmethod
+    def items_subquery(aggregate, output_field):
+        """Siparişin kalemleri üzerinde toplama yapan ilişkili alt sorgu"""
+        values = OrderItem.objects.filter(order_id=OuterRef('pk')).order_by().values(
+            'order_id'
+        ).annotate(value=aggregate).values('value')
+        return Subquery(values, output_field=output_field)
+    
+    @staticmethod
+    def annotate_item_totals(queryset: QuerySet[Order]) -> QuerySet[Order]:
+        """Kalem sayısı, fide ve viol toplamlarını satır başına sorgu olmadan ekler"""
+        def items_sum(aggregate):
+            return Coalesce(OrderService.items_subquery(aggregate, IntegerField()), Value(0))
+        
+        return queryset.annotate(
+            items_count=items_sum(Count('id')),
+            items_quantity=items_sum(Sum('quantity')),
+            items_viol_count=items_sum(Sum('viol_count'))
+        )
+    
+    @staticmethod
+    def get_orders_for_export(season_id: int) -> QuerySet[Order]:
+        """Export için siparişler; kalem toplamları sorguda hesaplanır"""
+        return OrderService.annotate_item_totals(
+            Order.objects.filter(season_id=season_id).select_related('customer', 'season')
+        ).order_by('order_number')
     
     @staticmethod
     def get_customer_orders_in_season(customer_id: int, season_id: int) -> QuerySet[Order]:
@@ -124,24 +454,32 @@ class OrderService:
         ).order_by('-created_at')
     
     @staticmethod
-    def calculate_planned_delivery_dates(order_id: int) -> None:
-        """Sipariş için planlanan teslimat tarihlerini hesapla"""
-        order = Order.objects.get(id=order_id)
-        
-        # En uzun teslimat süresini bul
-        max_delivery_date = None
-        for item in order.items.all():
-            item_delivery_date = item.planned_delivery_date
-            if not max_delivery_date or (item_delivery_date and item_delivery_date > max_delivery_date):
-                max_delivery_date = item_delivery_date
+    def calculate_planned_delivery_dates(order_id: int) -> Optional[date]:
+        """Sipariş için planlanan teslimat tarihini kalemlerden yeniden hesaplar"""
+        return Order.recalculate_planned_delivery_dates([order_id]).get(order_id)
+    
+    @staticmethod
+    def get_late_orders(season_id: int) -> QuerySet[Order]:
+        """Planlanan teslimat tarihi müşterinin istediği tarihi geçen siparişler
         
-        # Ana siparişin planlanan teslimat tarihini güncelle (eğer alan varsa)
-        # Not: Bu alan models.py'da planned_delivery_date silinmiş, gerekirse ekleyebiliriz
+        Koşul kısmi indeks (order_planned_late_idx) ile birebir aynıdır.
+        """
+        return Order.objects.filter(
+            season_id=season_id,
+            planned_delivery_date__gt=F('requested_delivery_date')
+        ).order_by('planned_delivery_date')
 
 
 class OrderItemService:
     """Sipariş kalemi yönetimi için servis sınıfı"""
     
+    @staticmethod
+    def get_items_for_export(season_id: int) -> QuerySet[OrderItem]:
+        """Export için sezonun sipariş kalemleri"""
+        return OrderItem.objects.filter(order__season_id=season_id).select_related(
+            'order', 'variety__species', 'rootstock'
+        ).order_by('order__order_number', 'id')
+    
     @staticmethod
     def create_order_item(
         order_id: int,
@@ -182,40 +520,19 @@ class OrderItemService:
     def calculate_unit_price(
         season_product: SeasonProduct, 
         stem_type: str, 
-        order_id: int
+        order_id: int,
+        order_date: Optional[date] = None
     ) -> Decimal:
-        """Teslimat ayına göre birim fiyat hesaplar"""
+        """Teslimat ayına göre birim fiyat hesaplar
+        
+        Fiyat sezon fiyat tablosundan okunur; sipariş tarihi verilirse
+        veritabanına hiç gidilmez.
+        """
+        from seasons.services import SeasonPriceMatrixService
         try:
-            order = Order.objects.get(id=order_id)
-            
-            # Teslimat tarihini hesapla
-            from seasons.services import SeasonProductService
-            delivery_date = SeasonProductService.calculate_delivery_date(
-                season_product,
-                order.order_date.date(),
-                stem_type
-            )
-            
-            if not delivery_date:
-                return Decimal('0.00')
-            
-            # Ay farkını hesapla
-            order_month = order.order_date.month
-            delivery_month = delivery_date.month
-            year_diff = delivery_date.year - order.order_date.year
-            month_diff = (year_diff * 12) + (delivery_month - order_month) + 1
-            
-            # 1-18 ay arasında sınırla
-            month_diff = max(1, min(18, month_diff))
-            
-            # Gövde tipine göre fiyat al
-            if stem_type == 'single':
-                price_field = f'price_single_stem_{month_diff}'
-            else:
-                price_field = f'price_double_stem_{month_diff}'
-            
-            return getattr(season_product, price_field, Decimal('0.00'))
-            
+            if order_date is None:
+                order_date = Order.objects.values_list('order_date', flat=True).get(id=order_id).date()
+            return SeasonPriceMatrixService.get_unit_price(season_product, stem_type, order_date)
         except Exception:
             return Decimal('0.00')
     
@@ -227,7 +544,8 @@ class OrderItemService:
         """Toplu sipariş kalemi oluşturur"""
         order_items = []
         
-        with transaction.atomic():
+        # Sipariş toplamı her kalemde değil, işlem sonunda bir kez hesaplanır
+        with transaction.atomic(), defer_total_recalculation():
             for item_data in items_data:
                 order_item = OrderItemService.create_order_item(
                     order_id=order_id,
@@ -237,6 +555,192 @@ class OrderItemService:
         
         return order_items
     
+    @staticmethod
+    def parse_order_line(line: Dict) -> Tuple[Dict, Dict]:
+        """Toplu kalem satırını tiplerine çevirir ve doğrular: (veri, hatalar)"""
+        from .utils import validate_order_item_data
+        
+        errors = {}
+        if not isinstance(line, dict):
+            return {}, {'line': 'Geçersiz satır.'}
+        
+        def as_int(field, required=True):
+            value = line.get(field)
+            if value in (None, ''):
+                if required:
+                    errors[field] = 'Bu alan zorunludur.'
+                return None
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                errors[field] = 'Geçersiz sayı.'
+                return None
+        
+        data = {
+            'variety_id': as_int('variety_id'),
+            'rootstock_id': as_int('rootstock_id', required=False),
+            'stem_type': line.get('stem_type') or OrderItem.StemType.SINGLE,
+            'viol_type': str(line.get('viol_type') or OrderItem.ViolType.V128),
+            'quantity': as_int('quantity') or 0,
+            'viol_count': as_int('viol_count') or 0,
+            'unit_price': None,
+            'notes': line.get('notes') or '',
+        }
+        
+        if data['stem_type'] not in OrderItem.StemType.values:
+            errors['stem_type'] = 'Geçersiz gövde tipi.'
+        if data['viol_type'] not in OrderItem.ViolType.values:
+            errors['viol_type'] = 'Geçersiz viol tipi.'
+        
+        unit_price = line.get('unit_price')
+        if unit_price not in (None, ''):
+            try:
+                data['unit_price'] = Decimal(str(unit_price))
+            except ArithmeticError:
+                errors['unit_price'] = 'Geçersiz fiyat formatı.'
+        
+        # Sezon ürünü çeşit/anaçtan sonra çözüldüğü için o kontrol burada atlanır
+        item_errors = validate_order_item_data(data)
+        item_errors.pop('season_product', None)
+        for field, error in item_errors.items():
+            errors.setdefault(field, error)
+        return data, errors
+    
+    @staticmethod
+    def create_order_lines(order: Order, lines: List[Dict]) -> Dict:
+        """Siparişin tüm kalemlerini tek işlemde oluşturur
+        
+        Sezon ürünleri tek sorguda çözülür, eksik çeşit-anaç kombinasyonları
+        sıfır fiyatla toplu oluşturulur. Birim fiyatlar sezon fiyat
+        tablosundan, üretim tarihleri ürün süre farklarından hesaplanır ve
+        kalemler bulk_create ile eklenir; sipariş toplamı bir kez güncellenir.
+        Herhangi bir satırda hata varsa hiçbir kayıt yazılmaz ve hatalar satır
+        sırasıyla döner.
+        """
+        from seasons.services import SeasonPriceMatrixService, SeasonProductService
+        
+        result = {
+            'success': False,
+            'items': [],
+            'created_season_products': 0,
+            'errors': {}
+        }
+        
+        parsed = []
+        for index, line in enumerate(lines):
+            data, errors = OrderItemService.parse_order_line(line)
+            if errors:
+                result['errors'][index] = errors
+            parsed.append(data)
+        
+        if not parsed:
+            result['errors']['lines'] = 'En az bir kalem girilmelidir.'
+        if result['errors']:
+            return result
+        
+        combinations = {(data['variety_id'], data['rootstock_id']) for data in parsed}
+        duration_fields = ProductionCalendarService.DURATION_FIELDS
+        
+        def load_season_products():
+            products = SeasonProduct.objects.filter(
+                season_id=order.season_id,
+                variety_id__in={variety_id for variety_id, _ in combinations}
+            ).only('id', 'season_id', 'variety_id', 'rootstock_id', *duration_fields)
+            return {(product.variety_id, product.rootstock_id): product for product in products}
+        
+        with transaction.atomic():
+            season_products = load_season_products()
+            missing = combinations - season_products.keys()
+            if missing:
+                # Eksik kombinasyonlar için çeşit ve anaçların varlığını kontrol et
+                variety_ids = set(Variety.objects.filter(
+                    id__in={variety_id for variety_id, _ in missing}
+                ).values_list('id', flat=True))
+                rootstock_ids = set(Rootstock.objects.filter(
+                    id__in={rootstock_id for _, rootstock_id in missing if rootstock_id}
+                ).values_list('id', flat=True))
+                
+                for index, data in enumerate(parsed):
+                    if (data['variety_id'], data['rootstock_id']) not in missing:
+                        continue
+                    if data['variety_id'] not in variety_ids:
+                        result['errors'].setdefault(index, {})['variety_id'] = 'Çeşit bulunamadı.'
+                    if data['rootstock_id'] and data['rootstock_id'] not in rootstock_ids:
+                        result['errors'].setdefault(index, {})['rootstock_id'] = 'Anaç bulunamadı.'
+                if result['errors']:
+                    return result
+                
+                # Fiyatlar 0, süreler model varsayılanları; daha sonra güncellenebilir
+                new_products = [
+                    SeasonProduct(season_id=order.season_id, variety_id=variety_id, rootstock_id=rootstock_id)
+                    for variety_id, rootstock_id in missing
+                ]
+                try:
+                    with transaction.atomic():
+                        SeasonProduct.objects.bulk_create(new_products)
+                    created_count = len(new_products)
+                except IntegrityError:
+                    # Başka bir işlem aynı kombinasyonu araya eklemiş; sadece
+                    # gerçekten eklenen satırlar sayılsın diye tek tek denenir
+                    created_count = 0
+                    for product in new_products:
+                        # Geri alınan toplu eklemenin atamış olabileceği id temizlenir
+                        product.pk = None
+                        try:
+                            with transaction.atomic():
+                                SeasonProduct.objects.bulk_create([product])
+                            created_count += 1
+                        except IntegrityError:
+                            pass
+                SeasonPriceMatrixService.invalidate(order.season_id)
+                season_products = load_season_products()
+                result['created_season_products'] = created_count
+            
+            price_matrix = SeasonPriceMatrixService.get_matrix(order.season_id)
+            order_date = order.order_date.date()
+            delivery_date = order.requested_delivery_date
+            offsets_cache = {}
+            
+            items = []
+            for data in parsed:
+                season_product = season_products[(data['variety_id'], data['rootstock_id'])]
+                unit_price = data['unit_price']
+                if unit_price is None:
+                    unit_price = price_matrix.unit_price(season_product.id, data['stem_type'], order_date)
+                
+                item = OrderItem(
+                    order=order,
+                    season_product_id=season_product.id,
+                    variety_id=season_product.variety_id,
+                    rootstock_id=season_product.rootstock_id,
+                    stem_type=data['stem_type'],
+                    viol_type=data['viol_type'],
+                    quantity=data['quantity'],
+                    viol_count=data['viol_count'],
+                    unit_price=unit_price,
+                    total_price=unit_price * data['quantity'],
+                    notes=data['notes']
+                )
+                
+                if delivery_date:
+                    key = (season_product.id, data['stem_type'])
+                    if key not in offsets_cache:
+                        offsets_cache[key] = SeasonProductService.calculate_stage_offsets(
+                            season_product, data['stem_type']
+                        )
+                    for field, days in offsets_cache[key].items():
+                        setattr(item, field, delivery_date - timedelta(days=days))
+                items.append(item)
+            
+            result['items'] = OrderItem.objects.bulk_create(items)
+            Order.recalculate_totals([order.pk])
+            order.planned_delivery_date = Order.recalculate_planned_delivery_dates([order.pk]).get(order.pk)
+        
+        OrderService.invalidate_season_statistics(order.season_id)
+        invalidate_cached_counts('orders')
+        result['success'] = True
+        return result
+    
     @staticmethod
     def get_items_by_order(order_id: int) -> QuerySet[OrderItem]:
         """Sipariş kalemlerini döner"""
@@ -268,6 +772,63 @@ class OrderItemService:
         order_item.save()
         return order_item
 
+    @staticmethod
+    def refresh_production_dates(
+        queryset: QuerySet[OrderItem],
+        batch_size: int = 500
+    ) -> int:
+        """Kalemlerin üretim aşaması tarihlerini toplu olarak yeniden hesaplar"""
+        from seasons.services import SeasonProductService
+        
+        items = queryset.select_related('order', 'season_product').only(
+            'id', 'stem_type', 'order__requested_delivery_date',
+            'season_product__rootstock_planting_duration',
+            'season_product__scion_planting_duration',
+            'season_product__single_stem_grafting_duration',
+            'season_product__double_stem_grafting_duration',
+            'season_product__head_formation_duration',
+            'season_product__waiting_on_room_duration',
+            *OrderItem.PRODUCTION_DATE_FIELDS
+        ).order_by()
+        
+        # Aynı ürün ve gövde tipi için süreler tek sefer hesaplanır
+        offsets_cache = {}
+        changed_items = []
+        updated_count = 0
+        
+        for item in items.iterator(chunk_size=batch_size):
+            delivery_date = item.order.requested_delivery_date
+            key = (item.season_product_id, item.stem_type)
+            if key not in offsets_cache:
+                offsets_cache[key] = SeasonProductService.calculate_stage_offsets(
+                    item.season_product, item.stem_type
+                )
+            
+            changed = False
+            for field, days in offsets_cache[key].items():
+                value = delivery_date - timedelta(days=days) if delivery_date else None
+                if getattr(item, field) != value:
+                    setattr(item, field, value)
+                    changed = True
+            
+            if changed:
+                changed_items.append(item)
+            
+            if len(changed_items) >= batch_size:
+                OrderItem.objects.bulk_update(changed_items, OrderItem.PRODUCTION_DATE_FIELDS)
+                updated_count += len(changed_items)
+                changed_items = []
+        
+        if changed_items:
+            OrderItem.objects.bulk_update(changed_items, OrderItem.PRODUCTION_DATE_FIELDS)
+            updated_count += len(changed_items)
+        
+        if updated_count:
+            # Sipariş listesi ekim tarihine göre filtrelenebildiği için sayımlar yenilenir
+            invalidate_cached_counts('orders')
+        
+        return updated_count
+
 
 class OrderStatusHistoryService:
     """Sipariş durum geçmişi yönetimi"""
@@ -308,6 +869,35 @@ class SeasonOrderService:
             is_active=True
         ).select_related('variety', 'rootstock').order_by('variety__species__name', 'variety__name')
     
+    @staticmethod
+    def search_season_products(
+        season_id: int,
+        query: str = '',
+        page: int = 1,
+        page_size: int = 20
+    ) -> Tuple[List[SeasonProduct], bool]:
+        """Sezon ürünlerinde sayfalı arama (çeşit, tür veya anaç adı öneki)
+        
+        Toplam sayı hesaplanmaz; sayfadan bir fazla kayıt okunarak devamı
+        olup olmadığı belirlenir. (ürünler, devamı_var) döner.
+        """
+        season_products = SeasonOrderService.get_available_season_products(season_id).select_related(
+            'variety__species'
+        )
+        query = ' '.join(query.split())
+        if query:
+            season_products = season_products.filter(
+                Q(variety__name__istartswith=query)
+                | Q(variety__species__name__istartswith=query)
+                | Q(rootstock__name__istartswith=query)
+            )
+        
+        offset = (max(page, 1) - 1) * page_size
+        results = list(season_products.order_by(
+            'variety__species__name', 'variety__name', 'id'
+        )[offset:offset + page_size + 1])
+        return results[:page_size], len(results) > page_size
+    
     @staticmethod
     def get_season_production_summary(season_id: int) -> Dict:
         """Sezon üretim özeti"""
@@ -351,3 +941,880 @@ class SeasonOrderService:
             summary['viol_type_breakdown'][viol_type['viol_type']] = viol_type['total_count']
         
         return summary
+
+
+class PlantingRequestService:
+    """Ekim talepleri yönetimi"""
+    
+    # Gecikme sayımına dahil olan, henüz ekilmemiş durumlar
+    OPEN_STATUSES = [
+        PlantingRequest.RequestStatus.PENDING,
+        PlantingRequest.RequestStatus.SENT,
+        PlantingRequest.RequestStatus.CONFIRMED,
+    ]
+    
+    # Damga veritabanında tutulur (CacheVersion), geçersiz kılma tüm süreçlere ulaşır
+    PLANTING_AREAS_CACHE_KEY = 'orders:planting_areas:{season_id}:{version}'
+    PLANTING_AREAS_VERSION_KEY = 'orders:planting_areas:{season_id}'
+    
+    @staticmethod
+    def repair_totals(season_id: Optional[int] = None, batch_size: int = 500) -> int:
+        """Talep sayaçlarını gruplu toplamlarla baştan hesaplar, değişenleri yazar
+        
+        Miktar, viol, sipariş ve müşteri sayıları bağlantı tablosu üzerinde tek
+        GROUP BY sorgusuyla hesaplanır. Güncellenen talep sayısını döner.
+        """
+        requests = PlantingRequest.objects.all()
+        links = PlantingRequest.order_items.through.objects.all()
+        if season_id:
+            requests = requests.filter(season_id=season_id)
+            links = links.filter(plantingrequest__season_id=season_id)
+        
+        totals = {
+            row['plantingrequest_id']: (
+                row['total_quantity'] or 0,
+                row['total_viol_count'] or 0,
+                row['order_count'],
+                row['customer_count'],
+            )
+            for row in links.order_by().values('plantingrequest_id').annotate(
+                total_quantity=Sum('orderitem__quantity'),
+                total_viol_count=Sum('orderitem__viol_count'),
+                order_count=Count('orderitem__order_id', distinct=True),
+                customer_count=Count('orderitem__order__customer_id', distinct=True)
+            )
+        }
+        
+        changed_requests = []
+        for request_id, *current in requests.values_list('id', *PlantingRequest.TOTAL_FIELDS):
+            expected = totals.get(request_id, (0, 0, 0, 0))
+            if tuple(current) != expected:
+                changed_requests.append(PlantingRequest(
+                    pk=request_id, **dict(zip(PlantingRequest.TOTAL_FIELDS, expected))
+                ))
+        
+        PlantingRequest.objects.bulk_update(
+            changed_requests, PlantingRequest.TOTAL_FIELDS, batch_size=batch_size
+        )
+        if changed_requests:
+            invalidate_cached_counts('planting_requests')
+        return len(changed_requests)
+    
+    @staticmethod
+    def _statistics_aggregates(today: date) -> Dict:
+        """Durum ve gecikme sayıları için koşullu toplamlar"""
+        return {
+            'total_requests': Count('id'),
+            'pending_requests': Count('id', filter=Q(status=PlantingRequest.RequestStatus.PENDING)),
+            'sent_requests': Count('id', filter=Q(status=PlantingRequest.RequestStatus.SENT)),
+            'confirmed_requests': Count('id', filter=Q(status=PlantingRequest.RequestStatus.CONFIRMED)),
+            'planted_requests': Count('id', filter=Q(status=PlantingRequest.RequestStatus.PLANTED)),
+            'overdue_requests': Count('id', filter=Q(
+                requested_planting_date__lt=today,
+                status__in=PlantingRequestService.OPEN_STATUSES
+            )),
+        }
+    
+    @staticmethod
+    def get_statistics(queryset: QuerySet[PlantingRequest]) -> Dict:
+        """Filtrelenmiş talep listesinin istatistiklerini tek sorguda döner"""
+        aggregates = PlantingRequestService._statistics_aggregates(timezone.now().date())
+        return queryset.order_by().aggregate(**aggregates)
+    
+    @staticmethod
+    def get_seasons_statistics(season_ids: List[int]) -> Dict[int, Dict]:
+        """Sezonların ekim istatistiklerini tek GROUP BY sorgusu ile döner"""
+        aggregates = PlantingRequestService._statistics_aggregates(timezone.now().date())
+        stats_by_season = {
+            season_id: dict.fromkeys(aggregates, 0) for season_id in season_ids
+        }
+        
+        rows = PlantingRequest.objects.filter(season_id__in=season_ids).order_by().values(
+            'season_id'
+        ).annotate(**aggregates)
+        for row in rows:
+            stats_by_season[row.pop('season_id')] = row
+        
+        return stats_by_season
+    
+    @staticmethod
+    def get_planting_areas(season_id: int) -> List[str]:
+        """Sezondaki ekim alanları (filtre listesi için önbellekli)"""
+        version = CacheVersion.objects.current(
+            PlantingRequestService.PLANTING_AREAS_VERSION_KEY.format(season_id=season_id)
+        )
+        cache_key = PlantingRequestService.PLANTING_AREAS_CACHE_KEY.format(season_id=season_id, version=version)
+        planting_areas = cache.get(cache_key)
+        if planting_areas is None:
+            planting_areas = list(
+                PlantingRequest.objects.filter(
+                    season_id=season_id, planting_area__isnull=False
+                ).exclude(planting_area='').order_by('planting_area').values_list(
+                    'planting_area', flat=True
+                ).distinct()
+            )
+            cache.set(cache_key, planting_areas, getattr(settings, 'PLANTING_AREAS_CACHE_TIMEOUT', 3600))
+        return planting_areas
+    
+    @staticmethod
+    def invalidate_planting_areas(season_id: int) -> None:
+        """Ekim alanı önbelleğinin damgasını yeniler"""
+        CacheVersion.objects.bump(PlantingRequestService.PLANTING_AREAS_VERSION_KEY.format(season_id=season_id))
+    
+    @staticmethod
+    def send_items_to_planting(
+        season: Season,
+        item_ids: List,
+        planting_type: str,
+        planting_quantities: Dict[str, str],
+        user=None,
+        planting_dates: Optional[Dict[int, date]] = None,
+        planting_areas: Optional[Dict[int, str]] = None
+    ) -> Dict:
+        """Sipariş kalemlerini anaç/kalem ekime gönderir
+        
+        Kalemler tek sorguda yüklenip anaç bazında gruplanır. Her grup için
+        ekim talebi oluşturulur veya mevcut talebe eklenir; kalem durumları
+        grup başına tek UPDATE ile güncellenir ve talep bağlantıları toplu
+        eklenir. planting_quantities anaç adı (anaçsızlar için 'NoRootstock')
+        ile girilen ekim adedini eşler.
+        
+        planting_dates/planting_areas kalem bazında önerilen ekim günü ve
+        alanıdır (PlantingScheduleService çıktısı). Önerisi olan kalemler
+        anaç, gün ve alana göre ayrı taleplere gruplanır; anacın ekim adedi
+        bu taleplere sipariş miktarı oranında dağıtılır. Hesaplanan ekim
+        tarihinden sonraki öneriler teslimatı geciktireceği için reddedilir.
+        """
+        planting_dates = planting_dates or {}
+        planting_areas = planting_areas or {}
+        is_rootstock_planting = planting_type == PlantingRequest.PlantingType.ROOTSTOCK
+        if is_rootstock_planting:
+            planting_type = PlantingRequest.PlantingType.ROOTSTOCK
+            valid_status = OrderItem.OrderItemStatus.WAITING
+            sent_status = OrderItem.OrderItemStatus.ROOTSTOCK_PLANTING_SENT
+            date_field = 'rootstock_planting_date'
+        else:
+            planting_type = PlantingRequest.PlantingType.SCION
+            valid_status = OrderItem.OrderItemStatus.ROOTSTOCK_PLANTING_PLANTED
+            sent_status = OrderItem.OrderItemStatus.SCION_PLANTING_SENT
+            date_field = 'scion_planting_date'
+        
+        result = {
+            'success_count': 0,
+            'error_count': 0,
+            'created_requests': [],
+            'updated_requests': []
+        }
+        
+        requested_ids = set()
+        for item_id in item_ids:
+            try:
+                requested_ids.add(int(item_id))
+            except (TypeError, ValueError):
+                result['error_count'] += 1
+        
+        items = OrderItem.objects.filter(
+            id__in=requested_ids,
+            order__season=season,
+            status=valid_status
+        ).select_related('rootstock').only(
+            'id', 'variety_id', 'quantity', 'rootstock__name', date_field
+        ).order_by('id')
+        if is_rootstock_planting:
+            # Anaç ekim için sadece anaçlı ürünler
+            items = items.filter(rootstock__isnull=False)
+        
+        # Kalemleri anaç bazında, öneri varsa anaç + gün + alan bazında grupla
+        grouped_items = {}
+        for item in items:
+            group_key = item.rootstock.name if item.rootstock else 'NoRootstock'
+            planned_date = planting_dates.get(item.id)
+            item_date = getattr(item, date_field)
+            if planned_date and (not item_date or planned_date > item_date):
+                continue
+            
+            planned_area = planting_areas.get(item.id) if planned_date else None
+            group = grouped_items.setdefault((group_key, planned_date, planned_area), {
+                'quantity_key': group_key,
+                'rootstock': item.rootstock,
+                'planting_date': planned_date or item_date,
+                'planting_area': planned_area,
+                'item_ids': [],
+                'variety_ids': set(),
+                'quantity': 0
+            })
+            group['item_ids'].append(item.id)
+            group['quantity'] += item.quantity
+            if item.variety_id:
+                group['variety_ids'].add(item.variety_id)
+        
+        result['error_count'] += len(requested_ids) - sum(
+            len(group['item_ids']) for group in grouped_items.values()
+        )
+        
+        # Anaç ekim adedini aynı anacın gün/alan gruplarına orantılı dağıt
+        key_groups = {}
+        for group in grouped_items.values():
+            key_groups.setdefault(group['quantity_key'], []).append(group)
+        for group_key, groups in key_groups.items():
+            try:
+                remaining_quantity = int(planting_quantities.get(group_key))
+            except (ValueError, TypeError):
+                remaining_quantity = 0
+            
+            remaining_order_quantity = sum(group['quantity'] for group in groups)
+            for group in groups:
+                if remaining_order_quantity > 0:
+                    share = remaining_quantity * group['quantity'] // remaining_order_quantity
+                else:
+                    share = remaining_quantity
+                group['planting_quantity'] = share
+                remaining_quantity -= share
+                remaining_order_quantity -= group['quantity']
+        
+        through_model = PlantingRequest.order_items.through
+        touched_request_ids = []
+        
+        with transaction.atomic():
+            for group in grouped_items.values():
+                planting_quantity = group['planting_quantity']
+                
+                if planting_quantity <= 0 or not group['planting_date']:
+                    # Ekim adedi girilmedi veya ekim tarihi hesaplanamadı
+                    result['error_count'] += len(group['item_ids'])
+                    continue
+                
+                # PlantingRequest oluştur veya mevcut olana ekle (anaç, gün ve alan bazında;
+                # alansız gönderimler aynı günün alansız talebinde toplanır)
+                planting_request, created = PlantingRequest.objects.get_or_create(
+                    rootstock=group['rootstock'],
+                    planting_type=planting_type,
+                    requested_planting_date=group['planting_date'],
+                    season=season,
+                    planting_area=group['planting_area'] or None,
+                    defaults={
+                        'status': PlantingRequest.RequestStatus.SENT,
+                        'sent_to_planting_date': timezone.now(),
+                        'created_by': user,
+                        'planting_quantity': planting_quantity,
+                        'notes': f'Sistem tarafından otomatik oluşturuldu - {len(group["variety_ids"])} çeşit ({planting_type.label})'
+                    }
+                )
+                
+                if created:
+                    result['created_requests'].append(planting_request)
+                else:
+                    # Eşzamanlı gönderimlerde adet kaybolmasın diye veritabanında artırılır
+                    PlantingRequest.objects.filter(pk=planting_request.pk).update(
+                        planting_quantity=F('planting_quantity') + planting_quantity,
+                        updated_at=timezone.now()
+                    )
+                    result['updated_requests'].append(planting_request)
+                
+                OrderItem.objects.filter(id__in=group['item_ids']).update(
+                    status=sent_status,
+                    updated_at=timezone.now()
+                )
+                through_model.objects.bulk_create(
+                    [
+                        through_model(plantingrequest_id=planting_request.pk, orderitem_id=item_id)
+                        for item_id in group['item_ids']
+                    ],
+                    ignore_conflicts=True
+                )
+                
+                touched_request_ids.append(planting_request.pk)
+                result['success_count'] += len(group['item_ids'])
+            
+            PlantingRequest.recalculate_totals(touched_request_ids)
+        
+        return result
+
+
+class ProductionCalendarService:
+    """Sezon üretim takvimi
+    
+    Teslimat tarihi, ürün ve gövde tipi aynı olan kalemlerin aşama tarihleri
+    de aynıdır. Bu yüzden sezon kalemleri veritabanında bu üçlüye göre
+    gruplanıp sıkı sütunlar (array) olarak yüklenir, aşama tarihleri ürün
+    bazlı gün farkı tablosundan tek geçişte hesaplanır ve günlük iş yükü
+    (fide/viol) tablosu çıkarılır.
+    """
+    
+    # Takvim aşamaları: (kod, başlık)
+    STAGES = [
+        ('rootstock_planting', 'Anaç Ekimi'),
+        ('scion_planting', 'Kalem Ekimi'),
+        ('grafting', 'Aşılama'),
+        ('head_formation', 'Kafa Kesimi'),
+        ('waiting_room', 'Bekleme Odasına Alma'),
+    ]
+    
+    DURATION_FIELDS = [
+        'rootstock_planting_duration',
+        'scion_planting_duration',
+        'single_stem_grafting_duration',
+        'double_stem_grafting_duration',
+        'head_formation_duration',
+        'waiting_on_room_duration',
+    ]
+    
+    @staticmethod
+    def load_season_arrays(season_id: int) -> Dict[str, array]:
+        """Sezon kalemlerini üretim planına göre gruplanmış sütunlar olarak yükler
+        
+        İptal edilen siparişler ve ürünü/teslimat tarihi olmayan kalemler hariçtir.
+        """
+        columns = {
+            'delivery_ordinals': array('l'),
+            'double_stem': array('b'),
+            'season_product_ids': array('q'),
+            'item_counts': array('q'),
+            'quantities': array('q'),
+            'viol_counts': array('q'),
+        }
+        
+        rows = OrderItem.objects.filter(
+            order__season_id=season_id,
+            season_product__isnull=False,
+            order__requested_delivery_date__isnull=False
+        ).exclude(
+            order__status=Order.OrderStatus.CANCELLED
+        ).order_by().values_list(
+            'order__requested_delivery_date', 'stem_type', 'season_product_id'
+        ).annotate(
+            item_count=Count('id'),
+            total_quantity=Sum('quantity'),
+            total_viol_count=Sum('viol_count')
+        )
+        
+        for delivery_date, stem_type, season_product_id, item_count, quantity, viol_count in rows:
+            columns['delivery_ordinals'].append(delivery_date.toordinal())
+            columns['double_stem'].append(stem_type == OrderItem.StemType.DOUBLE)
+            columns['season_product_ids'].append(season_product_id)
+            columns['item_counts'].append(item_count)
+            columns['quantities'].append(quantity)
+            columns['viol_counts'].append(viol_count)
+        
+        return columns
+    
+    @staticmethod
+    def get_stage_offsets(season_product_ids) -> Dict[Tuple[int, bool], Tuple[int, ...]]:
+        """(ürün, çift gövde) bazında aşamaların teslimattan kaç gün önce olduğu"""
+        from seasons.services import SeasonProductService
+        
+        offsets = {}
+        season_products = SeasonProduct.objects.filter(
+            id__in=set(season_product_ids)
+        ).only('id', *ProductionCalendarService.DURATION_FIELDS)
+        
+        for season_product in season_products:
+            for stem_type in OrderItem.StemType.values:
+                stage_offsets = SeasonProductService.calculate_stage_offsets(season_product, stem_type)
+                offsets[(season_product.id, stem_type == OrderItem.StemType.DOUBLE)] = (
+                    stage_offsets['rootstock_planting_date'],
+                    stage_offsets['scion_planting_date'],
+                    stage_offsets['grafting_date'],
+                    stage_offsets['head_formation_date'],
+                    season_product.waiting_on_room_duration,
+                )
+        return offsets
+    
+    @staticmethod
+    def calculate_stage_ordinals(columns: Dict[str, array]) -> List[array]:
+        """Her aşama için satırların tarih sıra numaralarını (date.toordinal) döner"""
+        offsets = ProductionCalendarService.get_stage_offsets(columns['season_product_ids'])
+        stage_ordinals = [array('l') for _ in ProductionCalendarService.STAGES]
+        
+        for delivery_ordinal, season_product_id, double_stem in zip(
+            columns['delivery_ordinals'], columns['season_product_ids'], columns['double_stem']
+        ):
+            for ordinals, offset in zip(stage_ordinals, offsets[(season_product_id, bool(double_stem))]):
+                ordinals.append(delivery_ordinal - offset)
+        
+        return stage_ordinals
+    
+    @staticmethod
+    def build_season_calendar(season_id: int) -> Dict:
+        """Sezonun günlük aşama iş yükü tablosunu hesaplar"""
+        columns = ProductionCalendarService.load_season_arrays(season_id)
+        stage_ordinals = ProductionCalendarService.calculate_stage_ordinals(columns)
+        stage_codes = [code for code, _ in ProductionCalendarService.STAGES]
+        
+        # {gün: [[fide, viol] her aşama için]}
+        workload = {}
+        for stage_index, ordinals in enumerate(stage_ordinals):
+            for ordinal, quantity, viol_count in zip(ordinals, columns['quantities'], columns['viol_counts']):
+                day = workload.get(ordinal)
+                if day is None:
+                    day = workload[ordinal] = [[0, 0] for _ in stage_codes]
+                day[stage_index][0] += quantity
+                day[stage_index][1] += viol_count
+        
+        totals = {code: {'plants': 0, 'viols': 0} for code in stage_codes}
+        days = []
+        for ordinal in sorted(workload):
+            stages = []
+            for code, (plants, viols) in zip(stage_codes, workload[ordinal]):
+                stages.append({'code': code, 'plants': plants, 'viols': viols})
+                totals[code]['plants'] += plants
+                totals[code]['viols'] += viols
+            days.append({'date': date.fromordinal(ordinal), 'stages': stages})
+        
+        return {
+            'stages': [{'code': code, 'label': label} for code, label in ProductionCalendarService.STAGES],
+            'days': days,
+            'totals': totals,
+            'item_count': sum(columns['item_counts']),
+            'start_date': days[0]['date'] if days else None,
+            'end_date': days[-1]['date'] if days else None,
+        }
+
+
+class PlantingScheduleService:
+    """Sera alanı kapasitesine göre ekim planlaması
+    
+    Ekime gönderilmeyi bekleyen kalemler, alan bazında günlük viol kapasitesi
+    aşılmadan ve hesaplanan ekim tarihinden (teslimat tarihinden geriye
+    hesaplanan son ekim günü) sonraya kaymadan günlere yerleştirilir.
+    Kalemler son ekim gününe göre geriden ileriye işlenir; her kalem
+    mümkün olan en geç güne, o gün doluysa daha erkene kaydırılır.
+    
+    Son ekim günü ve viol sayısı aynı olan kalemler birbirinin yerine
+    geçebildiği için veritabanında sayılarak gruplanır ve grup olarak
+    yerleştirilir. Dolu günler her alan için birleşim-bul (union-find)
+    yapısıyla atlanır, kapasite açıkları kümülatif toplamlarla (prefix sum)
+    raporlanır.
+    """
+    
+    # Mevcut ekim talepleri arasında kapasite tüketmeyen durumlar
+    IGNORED_REQUEST_STATUSES = (PlantingRequest.RequestStatus.CANCELLED,)
+    
+    @staticmethod
+    def get_default_capacity() -> Dict[str, int]:
+        """Ayarlardaki alan bazlı günlük viol kapasitesi: {'A Serası': 500}"""
+        return dict(getattr(settings, 'PLANTING_AREA_CAPACITY', {}))
+    
+    @staticmethod
+    def get_pending_items(
+        season_id: int,
+        planting_type: str = PlantingRequest.PlantingType.ROOTSTOCK,
+        item_ids: Optional[List[int]] = None
+    ) -> Tuple[QuerySet[OrderItem], str]:
+        """Ekime gönderilebilecek kalemler ve son ekim günü alanı"""
+        if planting_type == PlantingRequest.PlantingType.ROOTSTOCK:
+            items = OrderItem.objects.filter(
+                status=OrderItem.OrderItemStatus.WAITING, rootstock__isnull=False
+            )
+            date_field = 'rootstock_planting_date'
+        else:
+            items = OrderItem.objects.filter(status=OrderItem.OrderItemStatus.ROOTSTOCK_PLANTING_PLANTED)
+            date_field = 'scion_planting_date'
+        
+        items = items.filter(order__season_id=season_id)
+        if item_ids is not None:
+            items = items.filter(id__in=item_ids)
+        return items, date_field
+    
+    @staticmethod
+    def load_pending_groups(
+        season_id: int,
+        planting_type: str = PlantingRequest.PlantingType.ROOTSTOCK,
+        item_ids: Optional[List[int]] = None
+    ) -> Tuple[List[Tuple[Optional[date], int, int]], List[int]]:
+        """Kalemleri (son ekim günü, viol, adet) grupları ve aynı sıradaki id listesi olarak yükler
+        
+        Gruplar son ekim günü ve viol sayısına göre azalan sıradadır; id
+        listesi de aynı sırada olduğundan grup adetleri kadar ardışık id
+        o gruba aittir.
+        """
+        items, date_field = PlantingScheduleService.get_pending_items(season_id, planting_type, item_ids)
+        ordering = (F(date_field).desc(nulls_last=True), F('viol_count').desc())
+        
+        with transaction.atomic():
+            groups = list(
+                items.order_by().values_list(date_field, 'viol_count').annotate(
+                    item_count=Count('id')
+                ).order_by(*ordering)
+            )
+            ids = list(items.order_by(*ordering, 'id').values_list('id', flat=True))
+        return groups, ids
+    
+    @staticmethod
+    def get_existing_load(season_id: int, areas: List[str], start_date: date, end_date: date) -> Dict[str, Dict[date, int]]:
+        """Alanlara daha önce planlanmış ekim taleplerinin günlük viol yükü"""
+        rows = PlantingRequest.objects.filter(
+            season_id=season_id,
+            planting_area__in=areas,
+            requested_planting_date__range=(start_date, end_date)
+        ).exclude(
+            status__in=PlantingScheduleService.IGNORED_REQUEST_STATUSES
+        ).order_by().values_list('planting_area', 'requested_planting_date').annotate(
+            viols=Sum('total_viol_count')
+        )
+        
+        load = {}
+        for area, planting_date, viols in rows:
+            load.setdefault(area, {})[planting_date] = viols or 0
+        return load
+    
+    @staticmethod
+    def schedule(
+        season_id: int,
+        capacities: Optional[Dict[str, Dict[date, int]]] = None,
+        default_capacity: Optional[Dict[str, int]] = None,
+        planting_type: str = PlantingRequest.PlantingType.ROOTSTOCK,
+        item_ids: Optional[List[int]] = None,
+        start_date: Optional[date] = None
+    ) -> Dict:
+        """Kalemler için kapasiteye uygun ekim günü ve alanı önerir
+        
+        capacities belirli günler için alan kapasitesini, default_capacity
+        ise listede olmayan günler için alanın günlük kapasitesini verir
+        (verilmezse PLANTING_AREA_CAPACITY ayarı kullanılır). Dönen
+        assignments bulk_send_to_rootstock_planting görünümüne
+        ``to_form_fields`` ile doğrudan gönderilebilir.
+        """
+        capacities = capacities or {}
+        if default_capacity is None:
+            default_capacity = PlantingScheduleService.get_default_capacity()
+        start_date = start_date or timezone.now().date()
+        areas = sorted(set(capacities) | set(default_capacity))
+        
+        result = {
+            'assignments': {},
+            'unscheduled': {},
+            'load': {area: {} for area in areas},
+            'shortages': [],
+            'start_date': start_date,
+            'end_date': None,
+        }
+        
+        groups, ids = PlantingScheduleService.load_pending_groups(season_id, planting_type, item_ids)
+        start_ordinal = start_date.toordinal()
+        
+        # (son ekim günü indeksi, viol, adet, ilk id konumu)
+        pending = []
+        position = 0
+        for latest_date, viol_count, item_count in groups:
+            if latest_date is None:
+                reason = 'Ekim tarihi hesaplanamadı'
+            elif latest_date < start_date:
+                reason = 'Ekim tarihi geçmiş'
+            elif not areas:
+                reason = 'Ekim alanı kapasitesi tanımlı değil'
+            else:
+                reason = None
+                pending.append((latest_date.toordinal() - start_ordinal, viol_count or 0, item_count, position))
+            
+            if reason:
+                for item_id in ids[position:position + item_count]:
+                    result['unscheduled'][item_id] = reason
+            position += item_count
+        
+        if not pending:
+            return result
+        
+        day_count = pending[0][0] + 1
+        end_date = date.fromordinal(start_ordinal + day_count - 1)
+        result['end_date'] = end_date
+        
+        existing_load = PlantingScheduleService.get_existing_load(season_id, areas, start_date, end_date)
+        
+        # Alan başına kalan kapasite ve kapasitesi kalan en geç günü gösteren işaretçiler.
+        # parent[i + 1] == i + 1 ise i. gün boştur; 0 hiç boş gün kalmadı demektir.
+        remaining = {}
+        parents = {}
+        for area in areas:
+            days = array('q', [max(default_capacity.get(area, 0), 0)]) * day_count
+            for capacity_date, capacity in capacities.get(area, {}).items():
+                index = capacity_date.toordinal() - start_ordinal
+                if 0 <= index < day_count:
+                    days[index] = max(capacity, 0)
+            for load_date, viols in existing_load.get(area, {}).items():
+                index = load_date.toordinal() - start_ordinal
+                days[index] = max(days[index] - viols, 0)
+            
+            parent = array('l', range(day_count + 1))
+            for index in range(1, day_count + 1):
+                if days[index - 1] <= 0:
+                    parent[index] = index - 1
+            remaining[area] = days
+            parents[area] = parent
+        
+        def find(parent, index):
+            # index. günden geriye kapasitesi kalan en geç günü döner, yoksa -1
+            root = index + 1
+            while parent[root] != root:
+                parent[root] = parent[parent[root]]
+                root = parent[root]
+            return root - 1
+        
+        # Kapasite açığı: son ekim günü d'ye kadar olan talep, d'ye kadarki toplam kapasiteyi aşıyor mu
+        demand_by_day = array('q', [0]) * day_count
+        for latest_index, viol_count, item_count, _ in pending:
+            demand_by_day[latest_index] += viol_count * item_count
+        total_capacity = total_demand = 0
+        for index in range(day_count):
+            total_capacity += sum(remaining[area][index] for area in areas)
+            if demand_by_day[index]:
+                total_demand += demand_by_day[index]
+                if total_demand > total_capacity:
+                    result['shortages'].append({
+                        'date': date.fromordinal(start_ordinal + index),
+                        'demand': total_demand,
+                        'capacity': total_capacity,
+                        'deficit': total_demand - total_capacity,
+                    })
+        
+        assignments = result['assignments']
+        for latest_index, viol_count, item_count, position in pending:
+            while item_count:
+                best_area = None
+                best_index = -1
+                for area in areas:
+                    days = remaining[area]
+                    parent = parents[area]
+                    index = find(parent, latest_index)
+                    # Kısmen dolu ama kalemin sığmadığı günleri geriye doğru atla
+                    while index >= 0 and days[index] < viol_count:
+                        index = find(parent, index - 1)
+                    if index > best_index or (
+                        index == best_index and index >= 0 and days[index] > remaining[best_area][index]
+                    ):
+                        best_area = area
+                        best_index = index
+                
+                if best_index < 0:
+                    for item_id in ids[position:position + item_count]:
+                        result['unscheduled'][item_id] = 'Son ekim gününe kadar yeterli kapasite yok'
+                    break
+                
+                days = remaining[best_area]
+                placed = min(item_count, days[best_index] // viol_count) if viol_count else item_count
+                days[best_index] -= placed * viol_count
+                if days[best_index] <= 0:
+                    parents[best_area][best_index + 1] = best_index
+                
+                assignment = {
+                    'planting_date': date.fromordinal(start_ordinal + best_index),
+                    'planting_area': best_area,
+                    'shift_days': latest_index - best_index,
+                }
+                for item_id in ids[position:position + placed]:
+                    assignments[item_id] = assignment
+                area_load = result['load'][best_area]
+                area_load[assignment['planting_date']] = (
+                    area_load.get(assignment['planting_date'], 0) + placed * viol_count
+                )
+                position += placed
+                item_count -= placed
+        
+        return result
+    
+    @staticmethod
+    def to_form_fields(assignments: Dict[int, Dict]) -> Dict[str, str]:
+        """Önerileri bulk_send_to_rootstock_planting form alanlarına çevirir"""
+        fields = {}
+        for item_id, assignment in assignments.items():
+            fields[f'planting_date_{item_id}'] = assignment['planting_date'].isoformat()
+            fields[f'planting_area_{item_id}'] = assignment['planting_area']
+        return fields
+
+
+class OrderCloneService:
+    """Siparişleri başka bir sezona kopyalama
+    
+    Kaynak siparişlerin kalemleri hedef sezondaki aynı çeşit-anaç
+    kombinasyonuna eşlenir, hedef sezonun fiyat tablosundan yeniden
+    fiyatlanır ve teslimat tarihleri bir yıl ileri alınır. Siparişler,
+    kalemler ve durum geçmişi parça parça bulk_create ile yazılır.
+    Hedef sezonda karşılığı olmayan ürünler raporlanır ve atlanır.
+    """
+    
+    CHUNK_SIZE = 500
+    
+    @staticmethod
+    def get_source_orders(
+        source_season_id: int,
+        order_ids: Optional[List[int]] = None,
+        customer_tiers: Optional[List[str]] = None
+    ) -> QuerySet[Order]:
+        """Kopyalanacak siparişler; iptal edilenler hariç"""
+        orders = Order.objects.filter(season_id=source_season_id).exclude(
+            status=Order.OrderStatus.CANCELLED
+        )
+        if order_ids is not None:
+            orders = orders.filter(id__in=order_ids)
+        if customer_tiers:
+            # Müşteri sınıfı (A-G) renk kategorisinden belirlenir
+            tier_customers = Customer.objects.none()
+            for tier in customer_tiers:
+                tier_customers |= Customer.objects.by_color_category(tier)
+            orders = orders.filter(customer__in=tier_customers.values('id'))
+        return orders
+    
+    @staticmethod
+    def shift_year(value: Optional[date], years: int = 1) -> Optional[date]:
+        """Tarihi yıl kadar kaydırır; 29 Şubat 28 Şubat olur"""
+        if value is None:
+            return None
+        try:
+            return value.replace(year=value.year + years)
+        except ValueError:
+            return value.replace(year=value.year + years, day=28)
+    
+    @staticmethod
+    def map_season_products(source_season_id: int, target_season_id: int) -> Dict[int, SeasonProduct]:
+        """Kaynak sezon ürün id'sini hedef sezondaki karşılığına eşler (çeşit + anaç)"""
+        targets = {
+            (product.variety_id, product.rootstock_id): product
+            for product in SeasonProduct.objects.filter(season_id=target_season_id).only(
+                'id', 'season_id', 'variety_id', 'rootstock_id', *ProductionCalendarService.DURATION_FIELDS
+            )
+        }
+        mapping = {}
+        for source_id, variety_id, rootstock_id in SeasonProduct.objects.filter(
+            season_id=source_season_id
+        ).values_list('id', 'variety_id', 'rootstock_id'):
+            target = targets.get((variety_id, rootstock_id))
+            if target is not None:
+                mapping[source_id] = target
+        return mapping
+    
+    @staticmethod
+    def clone_orders(
+        source_season_id: int,
+        target_season: Season,
+        order_ids: Optional[List[int]] = None,
+        customer_tiers: Optional[List[str]] = None,
+        user=None,
+        years: int = 1
+    ) -> Dict:
+        """Siparişleri hedef sezona kopyalar ve özet rapor döner
+        
+        Eşlenebilen kalemi olmayan siparişler kopyalanmaz. Rapordaki
+        unmapped_products kaynak sezon ürün id'si bazında atlanan kalem
+        sayısını ve ürün adını verir.
+        """
+        from seasons.services import SeasonPriceMatrixService, SeasonProductService
+        
+        result = {
+            'created_orders': [],
+            'created_items': 0,
+            'skipped_orders': [],
+            'unmapped_products': {},
+        }
+        
+        product_map = OrderCloneService.map_season_products(source_season_id, target_season.id)
+        price_matrix = SeasonPriceMatrixService.get_matrix(target_season.id)
+        offsets_cache = {}
+        now = timezone.now()
+        order_date = now.date()
+        chunk_size = OrderCloneService.CHUNK_SIZE
+        
+        source_ids = list(
+            OrderCloneService.get_source_orders(source_season_id, order_ids, customer_tiers)
+            .order_by('id').values_list('id', flat=True)
+        )
+        
+        with transaction.atomic():
+            for start in range(0, len(source_ids), chunk_size):
+                chunk_ids = source_ids[start:start + chunk_size]
+                orders = list(Order.objects.filter(id__in=chunk_ids).order_by('id').only(
+                    'id', 'order_number', 'customer_id', 'requested_delivery_date',
+                    'notes', 'special_packaging', 'urgent'
+                ))
+                
+                lines = {}
+                for item in OrderItem.objects.filter(order_id__in=chunk_ids).order_by('order_id', 'id').values(
+                    'order_id', 'season_product_id', 'variety__name', 'rootstock__name',
+                    'stem_type', 'viol_type', 'quantity', 'viol_count', 'notes'
+                ):
+                    target = product_map.get(item['season_product_id'])
+                    if target is None:
+                        unmapped = result['unmapped_products'].setdefault(item['season_product_id'], {
+                            'variety': item['variety__name'],
+                            'rootstock': item['rootstock__name'],
+                            'item_count': 0,
+                        })
+                        unmapped['item_count'] += 1
+                        continue
+                    lines.setdefault(item['order_id'], []).append((target, item))
+                
+                orders_to_clone = []
+                for order in orders:
+                    if order.id in lines:
+                        orders_to_clone.append(order)
+                    else:
+                        result['skipped_orders'].append(order.order_number)
+                if not orders_to_clone:
+                    continue
+                
+                numbers = DocumentNumberService.next_numbers('ORD', len(orders_to_clone), Order, 'order_number')
+                new_orders = Order.objects.bulk_create([
+                    Order(
+                        order_number=number,
+                        customer_id=order.customer_id,
+                        season=target_season,
+                        order_date=now,
+                        requested_delivery_date=OrderCloneService.shift_year(order.requested_delivery_date, years),
+                        status=Order.OrderStatus.DRAFT,
+                        notes=order.notes,
+                        internal_notes=f'{order.order_number} siparişinden kopyalandı',
+                        special_packaging=order.special_packaging,
+                        urgent=order.urgent,
+                        created_by=user
+                    )
+                    for number, order in zip(numbers, orders_to_clone)
+                ])
+                new_ids = dict(Order.objects.filter(order_number__in=numbers).values_list('order_number', 'id'))
+                
+                OrderStatusHistory.objects.bulk_create([
+                    OrderStatusHistory(
+                        order_id=new_ids[new_order.order_number],
+                        to_status=Order.OrderStatus.DRAFT,
+                        changed_by=user,
+                        notes=f'{source.order_number} siparişinden kopyalandı'
+                    )
+                    for new_order, source in zip(new_orders, orders_to_clone)
+                ])
+                
+                new_items = []
+                for new_order, source in zip(new_orders, orders_to_clone):
+                    delivery_date = new_order.requested_delivery_date
+                    for target, item in lines[source.id]:
+                        unit_price = price_matrix.unit_price(target.id, item['stem_type'], order_date)
+                        new_item = OrderItem(
+                            order_id=new_ids[new_order.order_number],
+                            season_product_id=target.id,
+                            variety_id=target.variety_id,
+                            rootstock_id=target.rootstock_id,
+                            stem_type=item['stem_type'],
+                            viol_type=item['viol_type'],
+                            quantity=item['quantity'],
+                            viol_count=item['viol_count'],
+                            unit_price=unit_price,
+                            total_price=unit_price * item['quantity'],
+                            notes=item['notes']
+                        )
+                        if delivery_date:
+                            key = (target.id, item['stem_type'])
+                            if key not in offsets_cache:
+                                offsets_cache[key] = SeasonProductService.calculate_stage_offsets(
+                                    target, item['stem_type']
+                                )
+                            for field, days in offsets_cache[key].items():
+                                setattr(new_item, field, delivery_date - timedelta(days=days))
+                        new_items.append(new_item)
+                
+                OrderItem.objects.bulk_create(new_items, batch_size=chunk_size)
+                Order.recalculate_totals(new_ids.values())
+                Order.recalculate_planned_delivery_dates(new_ids.values())
+                result['created_orders'].extend(new_ids.values())
+                result['created_items'] += len(new_items)
+        
+        if result['created_orders']:
+            OrderService.invalidate_season_statistics(target_season.id)
+            invalidate_cached_counts('orders')
+        return result
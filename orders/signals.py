@@ -0,0 +1,27 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from .models import PlantingRequest
+
+
+@receiver(m2m_changed, sender=PlantingRequest.order_items.through)
+def update_planting_request_totals(sender, instance, action, reverse, pk_set, **kwargs):
+    """Talep-kalem bağlantıları değişince ilgili taleplerin sayaçlarını günceller"""
+    if action in ('post_add', 'post_remove') and not pk_set:
+        return
+    
+    if not reverse:
+        # talep.order_items.add/remove/clear
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.calculate_totals()
+        return
+    
+    # kalem.planting_requests.add/remove/clear
+    if action == 'pre_clear':
+        instance._cleared_planting_request_ids = list(
+            instance.planting_requests.values_list('id', flat=True)
+        )
+    elif action in ('post_add', 'post_remove'):
+        PlantingRequest.recalculate_totals(pk_set)
+    elif action == 'post_clear':
+        PlantingRequest.recalculate_totals(instance.__dict__.pop('_cleared_planting_request_ids', []))
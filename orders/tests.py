@@ -1,3 +1,722 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from customers.models import Customer
+from products.models import Rootstock, SeedBrand, Species, Variety
+from seasons.models import Season, SeasonProduct
+from seasons.services import SeasonPriceMatrixService
+
+from .models import (
+    DocumentSequence, Order, OrderItem, OrderStatusHistory, PlantingRequest, defer_total_recalculation
+)
+from .services import (
+    DocumentNumberService, OrderCloneService, OrderItemService, OrderService, PlantingRequestService,
+    PlantingScheduleService
+)
+
+
+class PlantingAreaSendTests(TestCase):
+    """Kapasite planlamasıyla alanlara bölünen kalemlerin ekime gönderilmesi"""
+    
+    PLANTING_DATE = date(2026, 3, 10)
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='planlama', role='admin', phone_number='5300000000', pin_code='1234')
+        species = Species.objects.create(name='Domates')
+        seed_brand = SeedBrand.objects.create(name='Marka', price_per_packet=10, seeds_per_packet=100)
+        variety = Variety.objects.create(name='Çeşit', species=species, seed_brand=seed_brand)
+        cls.rootstock = Rootstock.objects.create(name='Anaç', species=species)
+        cls.season = Season.objects.create(name='2026', start_date=date(2026, 1, 1))
+        season_product = SeasonProduct.objects.create(season=cls.season, variety=variety, rootstock=cls.rootstock)
+        customer = Customer.objects.create(
+            first_name='Ali', last_name='Veli', phone_number='5300000001', city='İzmir',
+            district='Bornova', neighborhood='Merkez', address='-', created_by=cls.user
+        )
+        order = Order.objects.create(
+            customer=customer, season=cls.season, created_by=cls.user,
+            requested_delivery_date=cls.PLANTING_DATE + timedelta(days=60)
+        )
+        # Tarihler sezon ürünü sürelerinden bağımsız olsun diye kayıtlar toplu eklenir
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order, season_product=season_product, variety=variety, rootstock=cls.rootstock,
+                quantity=100, viol_count=5, status=OrderItem.OrderItemStatus.WAITING,
+                rootstock_planting_date=cls.PLANTING_DATE
+            )
+            for _ in range(4)
+        ])
+        cls.item_ids = list(OrderItem.objects.order_by('id').values_list('id', flat=True))
+    
+    def send(self, item_ids, areas, quantity):
+        return PlantingRequestService.send_items_to_planting(
+            self.season, item_ids, PlantingRequest.PlantingType.ROOTSTOCK,
+            {self.rootstock.name: str(quantity)}, self.user,
+            planting_dates=dict.fromkeys(item_ids, self.PLANTING_DATE),
+            planting_areas=areas
+        )
+    
+    def test_schedule_split_across_areas_creates_request_per_area(self):
+        plan = PlantingScheduleService.schedule(
+            self.season.id, default_capacity={'A': 10, 'B': 10},
+            start_date=self.PLANTING_DATE - timedelta(days=5)
+        )
+        assignments = plan['assignments']
+        self.assertEqual(sorted(a['planting_area'] for a in assignments.values()), ['A', 'A', 'B', 'B'])
+        self.assertEqual({a['planting_date'] for a in assignments.values()}, {self.PLANTING_DATE})
+        
+        result = self.send(
+            list(assignments),
+            {item_id: a['planting_area'] for item_id, a in assignments.items()},
+            400
+        )
+        
+        self.assertEqual(result['success_count'], 4)
+        self.assertEqual(result['error_count'], 0)
+        requests = {
+            planting_request.planting_area: planting_request
+            for planting_request in PlantingRequest.objects.filter(season=self.season)
+        }
+        self.assertEqual(set(requests), {'A', 'B'})
+        for planting_request in requests.values():
+            self.assertEqual(planting_request.requested_planting_date, self.PLANTING_DATE)
+            self.assertEqual(planting_request.planting_quantity, 200)
+            self.assertEqual(planting_request.total_viol_count, 10)
+        
+        load = PlantingScheduleService.get_existing_load(
+            self.season.id, ['A', 'B'], self.PLANTING_DATE, self.PLANTING_DATE
+        )
+        self.assertEqual(load, {'A': {self.PLANTING_DATE: 10}, 'B': {self.PLANTING_DATE: 10}})
+    
+    def test_send_with_area_next_to_existing_request(self):
+        existing = PlantingRequest.objects.create(
+            rootstock=self.rootstock, planting_type=PlantingRequest.PlantingType.ROOTSTOCK,
+            requested_planting_date=self.PLANTING_DATE, season=self.season,
+            status=PlantingRequest.RequestStatus.SENT, planting_area='', planting_quantity=50
+        )
+        self.assertIsNone(existing.planting_area)
+        
+        first_id, second_id = self.item_ids[:2]
+        result = self.send([first_id], {first_id: 'A'}, 100)
+        self.assertEqual(result['success_count'], 1)
+        self.assertEqual(len(result['created_requests']), 1)
+        area_request = result['created_requests'][0]
+        self.assertEqual(area_request.planting_area, 'A')
+        
+        # Aynı alana yeniden gönderim mevcut talebe eklenir
+        result = self.send([second_id], {second_id: 'A'}, 100)
+        self.assertEqual(result['success_count'], 1)
+        self.assertEqual(result['updated_requests'], [area_request])
+        
+        area_request.refresh_from_db()
+        existing.refresh_from_db()
+        self.assertEqual(area_request.planting_quantity, 200)
+        self.assertEqual(set(area_request.order_items.values_list('id', flat=True)), {first_id, second_id})
+        self.assertEqual(existing.planting_quantity, 50)
+        self.assertFalse(existing.order_items.exists())
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Admin değişiklik listeleri satır sayısından bağımsız sabit sorguyla açılır"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username='yonetici', password='-', role='admin', phone_number='5300000100', pin_code='4321'
+        )
+        species = Species.objects.create(name='Biber')
+        seed_brand = SeedBrand.objects.create(name='Marka', price_per_packet=10, seeds_per_packet=100)
+        cls.varieties = [
+            Variety.objects.create(name=f'Çeşit {index}', species=species, seed_brand=seed_brand)
+            for index in range(2)
+        ]
+        cls.rootstock = Rootstock.objects.create(name='Anaç', species=species)
+        cls.seasons = [
+            Season.objects.create(name=str(year), start_date=date(year, 1, 1)) for year in (2025, 2026)
+        ]
+        cls.season_products = [
+            SeasonProduct.objects.create(season=season, variety=variety, rootstock=rootstock)
+            for season in cls.seasons
+            for variety, rootstock in zip(cls.varieties, [cls.rootstock, None])
+        ]
+        cls.customers = [
+            Customer.objects.create(
+                first_name=f'Müşteri{index}', last_name='Test', phone_number=f'53000002{index:02d}',
+                city='Antalya', district='Kumluca', neighborhood='Merkez', address='-', created_by=cls.user
+            )
+            for index in range(3)
+        ]
+    
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+    
+    def create_rows(self, count):
+        """Her siparişe iki kalem ve bir ekim talebi ekler (farklı sezon/müşteri/anaç)"""
+        start = Order.objects.count()
+        for index in range(start, start + count):
+            season = self.seasons[index % 2]
+            order = Order.objects.create(
+                customer=self.customers[index % 3], season=season, created_by=self.user,
+                requested_delivery_date=date(2026, 6, 1)
+            )
+            items = [
+                OrderItem.objects.create(
+                    order=order, season_product=season_product, quantity=10, viol_count=1, unit_price=1
+                )
+                for season_product in self.season_products if season_product.season_id == season.id
+            ]
+            planting_request = PlantingRequest.objects.create(
+                rootstock=self.rootstock, planting_type=PlantingRequest.PlantingType.ROOTSTOCK,
+                requested_planting_date=date(2026, 3, 1) + timedelta(days=index), season=season,
+                variety=items[0].variety, planting_area=f'Alan {index % 2}'
+            )
+            planting_request.order_items.add(*items)
+    
+    def assert_changelist_queries(self, url, expected):
+        for total in (3, 20):
+            self.create_rows(total - Order.objects.count())
+            cache.clear()
+            with self.subTest(rows=total), self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+    
+    def test_order_changelist(self):
+        self.assert_changelist_queries(reverse('admin:orders_order_changelist'), 6)
+    
+    def test_order_item_changelist(self):
+        self.assert_changelist_queries(reverse('admin:orders_orderitem_changelist'), 7)
+    
+    def test_planting_request_changelist(self):
+        self.assert_changelist_queries(reverse('admin:orders_plantingrequest_changelist'), 9)
+
+
+class OrderTestDataMixin:
+    """Sipariş testleri için ortak katalog, müşteri ve sipariş kayıtları"""
+    
+    DELIVERY_DATE = date(2026, 6, 1)
+    
+    @classmethod
+    def create_catalog(cls):
+        cls.user = User.objects.create(username='siparis', role='admin', phone_number='5300000300', pin_code='1111')
+        species = Species.objects.create(name='Karpuz')
+        seed_brand = SeedBrand.objects.create(name='Marka', price_per_packet=10, seeds_per_packet=100)
+        cls.variety = Variety.objects.create(name='Çeşit', species=species, seed_brand=seed_brand)
+        cls.rootstock = Rootstock.objects.create(name='Anaç', species=species)
+        cls.season = Season.objects.create(name='2026', start_date=date(2026, 1, 1))
+        cls.season_product = SeasonProduct.objects.create(
+            season=cls.season, variety=cls.variety, rootstock=cls.rootstock
+        )
+        cls.customer = Customer.objects.create(
+            first_name='Ayşe', last_name='Yılmaz', phone_number='5300000301', city='Antalya',
+            district='Serik', neighborhood='Merkez', address='-', created_by=cls.user
+        )
+    
+    def setUp(self):
+        super().setUp()
+        # Süreç içi fiyat tabloları ve önbellek testler arasında taşınmasın
+        cache.clear()
+        SeasonPriceMatrixService._matrices.clear()
+    
+    def create_order(self, **kwargs):
+        kwargs.setdefault('customer', self.customer)
+        kwargs.setdefault('season', self.season)
+        kwargs.setdefault('requested_delivery_date', self.DELIVERY_DATE)
+        return Order.objects.create(created_by=self.user, **kwargs)
+    
+    def create_item(self, order, quantity=10, unit_price=2, **kwargs):
+        kwargs.setdefault('season_product', self.season_product)
+        return OrderItem.objects.create(
+            order=order, quantity=quantity, viol_count=1, unit_price=unit_price, **kwargs
+        )
+    
+    def stored_total(self, order):
+        return Order.objects.values_list('total_amount', flat=True).get(pk=order.pk)
+
+
+class OrderTotalTests(OrderTestDataMixin, TestCase):
+    """Sipariş toplamının kalemlerden tek UPDATE ile hesaplanması"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_catalog()
+    
+    def test_item_changes_update_total(self):
+        order = self.create_order()
+        item = self.create_item(order, quantity=10, unit_price=2)
+        self.assertEqual(self.stored_total(order), Decimal('20.00'))
+        
+        item.quantity = 25
+        item.save()
+        self.assertEqual(self.stored_total(order), Decimal('50.00'))
+        
+        item.delete()
+        self.assertEqual(self.stored_total(order), Decimal('0.00'))
+    
+    def test_order_save_does_not_overwrite_total(self):
+        order = self.create_order()
+        stale = Order.objects.get(pk=order.pk)
+        self.create_item(order, quantity=10, unit_price=3)
+        
+        stale.notes = 'Not'
+        stale.save()
+        self.assertEqual(self.stored_total(order), Decimal('30.00'))
+    
+    def test_deferred_recalculation_runs_once_per_order(self):
+        first, second = self.create_order(), self.create_order()
+        with CaptureQueriesContext(connection) as queries:
+            with defer_total_recalculation():
+                for order in (first, second, first):
+                    self.create_item(order, quantity=10, unit_price=1)
+                # Blok içinde toplamlar henüz yazılmaz
+                self.assertEqual(self.stored_total(first), Decimal('0.00'))
+        
+        total_updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "orders_order" SET "total_amount"')
+        ]
+        self.assertEqual(len(total_updates), 1)
+        self.assertEqual(self.stored_total(first), Decimal('20.00'))
+        self.assertEqual(self.stored_total(second), Decimal('10.00'))
+        self.assertEqual(first.total_amount, Decimal('20.00'))
+    
+    def test_recalculate_totals_for_many_orders(self):
+        with_items, empty = self.create_order(), self.create_order()
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=with_items, season_product=self.season_product, variety=self.variety,
+                rootstock=self.rootstock, quantity=5, viol_count=1, unit_price=2, total_price=10
+            )
+            for _ in range(3)
+        ])
+        Order.objects.filter(pk=empty.pk).update(total_amount=99)
+        
+        self.assertEqual(Order.recalculate_totals([with_items.pk, empty.pk, None]), 2)
+        self.assertEqual(self.stored_total(with_items), Decimal('30.00'))
+        self.assertEqual(self.stored_total(empty), Decimal('0.00'))
+
+
+@override_settings(DOCUMENT_SEQUENCE_BLOCK_SIZE=5)
+class DocumentNumberTests(OrderTestDataMixin, TestCase):
+    """Sayaç tablosundan blok halinde belge numarası ayrılması"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_catalog()
+    
+    def setUp(self):
+        # Süreç içi bloklar testler arasında taşınmasın
+        DocumentNumberService._blocks.clear()
+        self.addCleanup(DocumentNumberService._blocks.clear)
+    
+    def next_numbers(self, count, prefix='TST'):
+        numbers = []
+        for _ in range(count):
+            with self.captureOnCommitCallbacks(execute=True):
+                numbers.append(DocumentNumberService.next_number(prefix, year=2026))
+        return numbers
+    
+    def test_numbers_are_served_from_reserved_blocks(self):
+        with CaptureQueriesContext(connection) as queries:
+            numbers = self.next_numbers(7)
+        
+        self.assertEqual(numbers, [f'TST-2026-{value:03d}' for value in range(1, 8)])
+        sequence = DocumentSequence.objects.get(prefix='TST', year=2026)
+        self.assertEqual(sequence.last_value, 10)
+        # Yalnızca iki blok ayrılır; bloktaki numaralar sorgusuz dağıtılır
+        sequence_updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "orders_documentsequence"')
+        ]
+        self.assertEqual(len(sequence_updates), 2)
+    
+    def test_rolled_back_block_is_not_reused(self):
+        self.assertEqual(self.next_numbers(1), ['TST-2026-001'])
+        DocumentNumberService._blocks.clear()
+        
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                DocumentNumberService.next_number('TST', year=2026)
+                raise RuntimeError
+        
+        # Geri alınan blok (006-010) ne sayaçta ne de süreç içinde kalır
+        self.assertEqual(self.next_numbers(2), ['TST-2026-006', 'TST-2026-007'])
+    
+    def test_counter_starts_after_existing_numbers(self):
+        self.create_order(order_number='ORD-2026-041')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            number = DocumentNumberService.next_number('ORD', Order, 'order_number', year=2026)
+        
+        self.assertEqual(number, 'ORD-2026-042')
+        self.assertEqual(DocumentSequence.objects.get(prefix='ORD', year=2026).last_value, 46)
+    
+    def test_next_numbers_reserves_consecutive_block(self):
+        self.assertEqual(
+            DocumentNumberService.next_numbers('PLT', 3, year=2026),
+            ['PLT-2026-001', 'PLT-2026-002', 'PLT-2026-003']
+        )
+        self.assertEqual(DocumentNumberService.next_numbers('PLT', 0, year=2026), [])
+        self.assertEqual(self.next_numbers(1, prefix='PLT'), ['PLT-2026-004'])
+
+
+class BulkTransitionTests(OrderTestDataMixin, TestCase):
+    """Siparişlerin tek UPDATE ile toplu durum değişikliği"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_catalog()
+    
+    def test_eligible_orders_move_and_get_history(self):
+        draft = self.create_order()
+        confirmed = self.create_order(status=Order.OrderStatus.CONFIRMED)
+        shipped = self.create_order(status=Order.OrderStatus.SHIPPED)
+        
+        result = OrderService.bulk_transition(
+            [draft.pk, str(confirmed.pk), shipped.pk], Order.OrderStatus.WAITING, self.user, notes='Toplu'
+        )
+        
+        self.assertEqual(result['updated'], [draft.pk, confirmed.pk])
+        self.assertEqual(result['failed'], {shipped.pk: 'Sipariş bu duruma geçirilemez'})
+        self.assertEqual(
+            dict(Order.objects.values_list('pk', 'status')),
+            {
+                draft.pk: Order.OrderStatus.WAITING,
+                confirmed.pk: Order.OrderStatus.WAITING,
+                shipped.pk: Order.OrderStatus.SHIPPED,
+            }
+        )
+        self.assertEqual(
+            set(OrderStatusHistory.objects.values_list('order_id', 'from_status', 'to_status', 'changed_by', 'notes')),
+            {
+                (draft.pk, Order.OrderStatus.DRAFT, Order.OrderStatus.WAITING, self.user.pk, 'Toplu'),
+                (confirmed.pk, Order.OrderStatus.CONFIRMED, Order.OrderStatus.WAITING, self.user.pk, 'Toplu'),
+            }
+        )
+    
+    def test_rejected_ids_are_reported(self):
+        order = self.create_order(status=Order.OrderStatus.CONFIRMED)
+        other_season = Season.objects.create(name='2027', start_date=date(2027, 1, 1))
+        other = self.create_order(season=other_season)
+        
+        result = OrderService.bulk_transition(
+            [order.pk, other.pk, 999999, 'abc'], Order.OrderStatus.CONFIRMED, season_id=self.season.pk
+        )
+        
+        self.assertEqual(result['updated'], [])
+        self.assertEqual(result['failed'], {
+            order.pk: 'Sipariş bu duruma geçirilemez',
+            other.pk: 'Sipariş bulunamadı',
+            999999: 'Sipariş bulunamadı',
+            'abc': 'Geçersiz sipariş numarası',
+        })
+        self.assertFalse(OrderStatusHistory.objects.exists())
+        self.assertEqual(Order.objects.get(pk=other.pk).status, Order.OrderStatus.DRAFT)
+    
+    def test_explicit_source_statuses(self):
+        shipped = self.create_order(status=Order.OrderStatus.SHIPPED)
+        draft = self.create_order()
+        
+        result = OrderService.bulk_transition(
+            [shipped.pk, draft.pk], Order.OrderStatus.DELIVERED, from_statuses=[Order.OrderStatus.SHIPPED]
+        )
+        
+        self.assertEqual(result['updated'], [shipped.pk])
+        self.assertEqual(list(result['failed']), [draft.pk])
+        self.assertEqual(Order.objects.get(pk=shipped.pk).status, Order.OrderStatus.DELIVERED)
+    
+    def test_invalid_statuses_raise(self):
+        order = self.create_order()
+        with self.assertRaises(ValueError):
+            OrderService.bulk_transition([order.pk], 'unknown')
+        # Kaynak durumları tanımlı olmayan hedef için açıkça verilmelidir
+        with self.assertRaises(ValueError):
+            OrderService.bulk_transition([order.pk], Order.OrderStatus.DELIVERED)
+        with self.assertRaises(ValueError):
+            OrderService.bulk_transition([order.pk], Order.OrderStatus.CONFIRMED, from_statuses=['unknown'])
+        self.assertEqual(Order.objects.get(pk=order.pk).status, Order.OrderStatus.DRAFT)
+
+
+class CreateOrderLinesTests(OrderTestDataMixin, TestCase):
+    """Sipariş kalemlerinin tek işlemde toplu oluşturulması"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_catalog()
+        SeasonProduct.objects.filter(pk=cls.season_product.pk).update(**{
+            f'price_single_stem_{month}': Decimal('3.00') for month in range(1, 19)
+        })
+        cls.other_variety = Variety.objects.create(
+            name='Diğer Çeşit', species=cls.variety.species, seed_brand=cls.variety.seed_brand
+        )
+    
+    def line(self, variety, rootstock=None, **kwargs):
+        return {
+            'variety_id': getattr(variety, 'pk', variety),
+            'rootstock_id': getattr(rootstock, 'pk', rootstock),
+            'quantity': 10,
+            'viol_count': 1,
+            **kwargs
+        }
+    
+    def test_creates_items_and_missing_season_products(self):
+        order = self.create_order()
+        result = OrderItemService.create_order_lines(order, [
+            self.line(self.variety, self.rootstock),
+            self.line(self.variety, self.rootstock, unit_price='1.5', stem_type='double'),
+            self.line(self.variety),
+            self.line(self.other_variety, self.rootstock),
+        ])
+        
+        self.assertTrue(result['success'], result['errors'])
+        self.assertEqual(result['created_season_products'], 2)
+        self.assertEqual(len(result['items']), 4)
+        self.assertEqual(
+            set(SeasonProduct.objects.filter(season=self.season).values_list('variety', 'rootstock')),
+            {
+                (self.variety.pk, self.rootstock.pk),
+                (self.variety.pk, None),
+                (self.other_variety.pk, self.rootstock.pk),
+            }
+        )
+        
+        items = list(OrderItem.objects.filter(order=order).order_by('id'))
+        # Fiyat verilmeyen satırlar sezon fiyat tablosundan, yeni ürünler sıfır fiyatla
+        self.assertEqual([item.unit_price for item in items], [Decimal('3.00'), Decimal('1.50'), 0, 0])
+        self.assertEqual(self.stored_total(order), Decimal('45.00'))
+        for item in items:
+            expected = item.calculate_production_dates()
+            self.assertEqual({field: getattr(item, field) for field in expected}, expected)
+    
+    def test_existing_rootstockless_product_is_reused(self):
+        order = self.create_order()
+        first = OrderItemService.create_order_lines(order, [self.line(self.other_variety)])
+        second = OrderItemService.create_order_lines(order, [self.line(self.other_variety)])
+        
+        self.assertEqual((first['created_season_products'], second['created_season_products']), (1, 0))
+        self.assertEqual(
+            SeasonProduct.objects.filter(season=self.season, variety=self.other_variety).count(), 1
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SeasonProduct.objects.create(season=self.season, variety=self.other_variety)
+    
+    def test_invalid_lines_write_nothing(self):
+        order = self.create_order()
+        result = OrderItemService.create_order_lines(order, [
+            self.line(self.variety, self.rootstock),
+            self.line(None, stem_type='triple'),
+            'satır',
+        ])
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(set(result['errors']), {1, 2})
+        self.assertEqual(result['errors'][1]['variety_id'], 'Bu alan zorunludur.')
+        self.assertEqual(result['errors'][1]['stem_type'], 'Geçersiz gövde tipi.')
+        self.assertFalse(order.items.exists())
+    
+    def test_unknown_variety_and_rootstock(self):
+        order = self.create_order()
+        result = OrderItemService.create_order_lines(order, [
+            self.line(self.variety, self.rootstock),
+            self.line(999999),
+            self.line(self.variety, 999999),
+        ])
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['errors'], {
+            1: {'variety_id': 'Çeşit bulunamadı.'},
+            2: {'rootstock_id': 'Anaç bulunamadı.'},
+        })
+        self.assertFalse(order.items.exists())
+        self.assertEqual(SeasonProduct.objects.filter(season=self.season).count(), 1)
+    
+    def test_empty_lines(self):
+        result = OrderItemService.create_order_lines(self.create_order(), [])
+        self.assertEqual(result['errors'], {'lines': 'En az bir kalem girilmelidir.'})
+
+
+class OrderCloneTests(OrderTestDataMixin, TestCase):
+    """Siparişlerin yeni sezona toplu kopyalanması"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_catalog()
+        cls.unmapped_product = SeasonProduct.objects.create(
+            season=cls.season,
+            variety=Variety.objects.create(
+                name='Eski Çeşit', species=cls.variety.species, seed_brand=cls.variety.seed_brand
+            )
+        )
+        cls.target_season = Season.objects.create(name='2027', start_date=date(2027, 1, 1))
+        cls.target_product = SeasonProduct.objects.create(
+            season=cls.target_season, variety=cls.variety, rootstock=cls.rootstock,
+            **{f'price_{stem}_stem_{month}': Decimal('4.00') for stem in ('single', 'double') for month in range(1, 19)}
+        )
+    
+    def clone(self, **kwargs):
+        return OrderCloneService.clone_orders(self.season.pk, self.target_season, user=self.user, **kwargs)
+    
+    def test_clone_maps_items_and_reports_unmapped_products(self):
+        source = self.create_order(notes='Not', urgent=True)
+        self.create_item(source, quantity=10)
+        self.create_item(source, quantity=5, stem_type=OrderItem.StemType.DOUBLE)
+        self.create_item(source, quantity=3, season_product=self.unmapped_product)
+        unmapped_only = self.create_order()
+        self.create_item(unmapped_only, season_product=self.unmapped_product)
+        cancelled = self.create_order(status=Order.OrderStatus.CANCELLED)
+        self.create_item(cancelled)
+        
+        result = self.clone()
+        
+        self.assertEqual(len(result['created_orders']), 1)
+        self.assertEqual(result['created_items'], 2)
+        self.assertEqual(result['skipped_orders'], [unmapped_only.order_number])
+        self.assertEqual(result['unmapped_products'], {
+            self.unmapped_product.pk: {'variety': 'Eski Çeşit', 'rootstock': None, 'item_count': 2}
+        })
+        
+        clone = Order.objects.get(pk=result['created_orders'][0])
+        self.assertEqual(clone.season, self.target_season)
+        self.assertEqual(clone.customer, self.customer)
+        self.assertEqual(clone.status, Order.OrderStatus.DRAFT)
+        self.assertEqual(clone.requested_delivery_date, date(2027, 6, 1))
+        self.assertEqual((clone.notes, clone.urgent), ('Not', True))
+        self.assertEqual(clone.total_amount, Decimal('60.00'))
+        self.assertIsNotNone(clone.planned_delivery_date)
+        self.assertTrue(
+            OrderStatusHistory.objects.filter(
+                order=clone, to_status=Order.OrderStatus.DRAFT, changed_by=self.user
+            ).exists()
+        )
+        
+        items = list(clone.items.order_by('id'))
+        self.assertEqual(
+            [(item.season_product_id, item.stem_type, item.quantity, item.unit_price) for item in items],
+            [
+                (self.target_product.pk, OrderItem.StemType.SINGLE, 10, Decimal('4.00')),
+                (self.target_product.pk, OrderItem.StemType.DOUBLE, 5, Decimal('4.00')),
+            ]
+        )
+        for item in items:
+            expected = item.calculate_production_dates()
+            self.assertEqual({field: getattr(item, field) for field in expected}, expected)
+    
+    def test_clone_in_chunks_with_selected_orders(self):
+        sources = [self.create_order() for _ in range(5)]
+        for source in sources:
+            self.create_item(source)
+        
+        with mock.patch.object(OrderCloneService, 'CHUNK_SIZE', 2):
+            result = self.clone(order_ids=[source.pk for source in sources[1:]])
+        
+        self.assertEqual(len(result['created_orders']), 4)
+        self.assertEqual(result['created_items'], 4)
+        clones = Order.objects.filter(season=self.target_season)
+        self.assertEqual(clones.count(), 4)
+        self.assertEqual(len(set(clones.values_list('order_number', flat=True))), 4)
+        self.assertEqual(
+            sorted(clones.values_list('internal_notes', flat=True)),
+            sorted(f'{source.order_number} siparişinden kopyalandı' for source in sources[1:])
+        )
+    
+    def test_shift_year_handles_leap_day(self):
+        self.assertEqual(OrderCloneService.shift_year(date(2028, 2, 29)), date(2029, 2, 28))
+        self.assertEqual(OrderCloneService.shift_year(date(2026, 6, 1), years=2), date(2028, 6, 1))
+        self.assertIsNone(OrderCloneService.shift_year(None))
+
+
+class PlantingRequestCounterTests(OrderTestDataMixin, TestCase):
+    """Ekim talebi sayaçlarının kalem bağlantılarıyla güncel tutulması"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_catalog()
+        cls.other_customer = Customer.objects.create(
+            first_name='Mehmet', last_name='Kaya', phone_number='5300000302', city='Antalya',
+            district='Serik', neighborhood='Merkez', address='-', created_by=cls.user
+        )
+    
+    def setUp(self):
+        super().setUp()
+        first_order = self.create_order()
+        second_order = self.create_order(customer=self.other_customer)
+        self.items = [
+            self.create_item(first_order, quantity=100),
+            self.create_item(first_order, quantity=50),
+            self.create_item(second_order, quantity=30),
+        ]
+        self.requests = [
+            PlantingRequest.objects.create(
+                rootstock=self.rootstock, planting_type=PlantingRequest.PlantingType.ROOTSTOCK,
+                requested_planting_date=date(2026, 3, day), season=self.season
+            )
+            for day in (1, 2)
+        ]
+    
+    def counters(self, planting_request):
+        """(miktar, viol, sipariş, müşteri) değerleri veritabanından"""
+        return PlantingRequest.objects.values_list(*PlantingRequest.TOTAL_FIELDS).get(pk=planting_request.pk)
+    
+    def test_request_side_add_remove_clear(self):
+        planting_request = self.requests[0]
+        
+        planting_request.order_items.add(*self.items)
+        self.assertEqual(self.counters(planting_request), (180, 3, 2, 2))
+        self.assertEqual(planting_request.order_count, 2)
+        
+        planting_request.order_items.remove(self.items[2])
+        self.assertEqual(self.counters(planting_request), (150, 2, 1, 1))
+        
+        planting_request.order_items.clear()
+        self.assertEqual(self.counters(planting_request), (0, 0, 0, 0))
+    
+    def test_item_side_add_remove_clear(self):
+        item = self.items[0]
+        first, second = self.requests
+        
+        item.planting_requests.add(first, second)
+        self.assertEqual(self.counters(first), (100, 1, 1, 1))
+        self.assertEqual(self.counters(second), (100, 1, 1, 1))
+        
+        item.planting_requests.remove(first)
+        self.assertEqual(self.counters(first), (0, 0, 0, 0))
+        
+        item.planting_requests.clear()
+        self.assertEqual(self.counters(second), (0, 0, 0, 0))
+    
+    def test_item_and_order_changes_update_linked_requests(self):
+        planting_request = self.requests[0]
+        planting_request.order_items.add(*self.items)
+        
+        item = OrderItem.objects.get(pk=self.items[0].pk)
+        item.quantity = 10
+        item.save()
+        self.assertEqual(self.counters(planting_request), (90, 3, 2, 2))
+        
+        order = Order.objects.get(pk=self.items[2].order_id)
+        order.customer = self.customer
+        order.save()
+        self.assertEqual(self.counters(planting_request), (90, 3, 2, 1))
+        
+        OrderItem.objects.get(pk=self.items[2].pk).delete()
+        self.assertEqual(self.counters(planting_request), (60, 2, 1, 1))
+    
+    def test_repair_totals_fixes_drifted_counters(self):
+        first, second = self.requests
+        first.order_items.add(*self.items[:2])
+        PlantingRequest.objects.filter(pk__in=[first.pk, second.pk]).update(
+            total_quantity=1, order_count=9, customer_count=9
+        )
+        
+        self.assertEqual(PlantingRequestService.repair_totals(self.season.pk), 2)
+        self.assertEqual(self.counters(first), (150, 2, 1, 1))
+        self.assertEqual(self.counters(second), (0, 0, 0, 0))
+        self.assertEqual(PlantingRequestService.repair_totals(), 0)
@@ -14,7 +14,10 @@ urlpatterns = [
     path('season/<int:season_id>/', views.order_list, name='order_list'),
     path('season/<int:season_id>/create/', views.order_create, name='order_create'),
     path('season/<int:season_id>/statistics/', views.season_statistics, name='season_statistics'),
+    path('season/<int:season_id>/calendar/', views.season_calendar, name='season_calendar'),
     path('season/<int:season_id>/export/', views.season_export, name='season_export'),
+    path('season/<int:season_id>/export/items/', views.season_items_export, name='season_items_export'),
+    path('season/<int:season_id>/clone/', views.season_orders_clone, name='season_orders_clone'),
     path('season/<int:season_id>/bulk-send-to-planting/', views.bulk_send_to_planting, name='bulk_send_to_planting'),
     path('season/<int:season_id>/bulk-send-to-rootstock-planting/', views.bulk_send_to_rootstock_planting, name='bulk_send_to_rootstock_planting'),
     path('season/<int:season_id>/planting/', views.planting_list, name='planting_list'),
@@ -31,6 +34,7 @@ urlpatterns = [
     # Sipariş kalemi yönetimi
     path('season/<int:season_id>/order/<int:order_id>/items/', views.order_items_manage, name='order_items_manage'),
     path('season/<int:season_id>/order/<int:order_id>/item/add/', views.order_item_add, name='order_item_add'),
+    path('season/<int:season_id>/order/<int:order_id>/items/batch/', views.api_order_items_batch, name='order_items_batch'),
     path('season/<int:season_id>/order/<int:order_id>/item/<int:item_id>/edit/', views.order_item_edit, name='order_item_edit'),
     path('season/<int:season_id>/order/<int:order_id>/item/<int:item_id>/delete/', views.order_item_delete, name='order_item_delete'),
     
@@ -39,6 +43,8 @@ urlpatterns = [
     
     # AJAX API endpoints
     path('api/season-products/<int:season_id>/', views.api_season_products, name='api_season_products'),
+    path('api/season-calendar/<int:season_id>/', views.api_season_calendar, name='api_season_calendar'),
+    path('api/planting-schedule/<int:season_id>/', views.api_planting_schedule, name='api_planting_schedule'),
     path('api/season-product-by-variety/<int:season_id>/', views.api_season_product_by_variety, name='api_season_product_by_variety'),
     path('api/varieties-by-species/<int:species_id>/', views.api_varieties_by_species, name='api_varieties_by_species'),
     path('api/product-price/<int:season_product_id>/', views.api_product_price, name='api_product_price'),
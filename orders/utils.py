@@ -1,13 +1,13 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from datetime import date, datetime, timedelta
 import csv
-from io import StringIO
 
 from .models import Order, OrderItem
 from seasons.models import Season
+from core.streaming import Echo
 
 
 def validate_order_data(order_data: Dict) -> Dict:
@@ -156,60 +156,78 @@ def format_currency(amount: Decimal) -> str:
     return f'{amount:,.2f} TL'.replace(',', 'X').replace('.', ',').replace('X', '.')
 
 
+# Akışlı export'larda veritabanından tek seferde okunacak satır sayısı
+EXPORT_CHUNK_SIZE = 500
+
+ORDER_CSV_HEADER = [
+    'Sipariş No', 'Müşteri', 'Sezon', 'Durum', 'Sipariş Tarihi',
+    'İstenen Teslimat', 'Toplam Tutar', 'Toplam Miktar', 'Viol Sayısı'
+]
+
+ORDER_ITEM_CSV_HEADER = [
+    'Sipariş No', 'Çeşit', 'Anaç', 'Gövde Tipi', 'Viol Tipi',
+    'Miktar', 'Viol Sayısı', 'Birim Fiyat', 'Toplam Fiyat'
+]
+
+
+def get_order_csv_row(order: Order) -> List:
+    """Sipariş CSV satırı (varsa sorgu anotasyonlarını kullanır)"""
+    total_quantity = getattr(order, 'items_quantity', None)
+    total_viol_count = getattr(order, 'items_viol_count', None)
+    return [
+        order.order_number,
+        order.customer.get_full_name(),
+        order.season.name,
+        order.get_status_display(),
+        order.order_date.strftime('%d.%m.%Y'),
+        order.requested_delivery_date.strftime('%d.%m.%Y') if order.requested_delivery_date else '',
+        format_currency(order.total_amount),
+        order.total_quantity if total_quantity is None else total_quantity,
+        order.total_viol_count if total_viol_count is None else total_viol_count
+    ]
+
+
+def get_order_item_csv_row(item: OrderItem) -> List:
+    """Sipariş kalemi CSV satırı"""
+    return [
+        item.order.order_number,
+        item.variety.get_full_name() if item.variety else '',
+        item.rootstock.name if item.rootstock else 'Anaçsız',
+        item.get_stem_type_display(),
+        item.viol_type,
+        item.quantity,
+        item.viol_count,
+        format_currency(item.unit_price),
+        format_currency(item.total_price)
+    ]
+
+
+def iter_csv_rows(header: List, rows: Iterable[List]) -> Iterator[str]:
+    """Başlık ve satırları tek tek CSV metni olarak üretir (StreamingHttpResponse için)"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_orders_csv(orders: Iterable[Order]) -> Iterator[str]:
+    """Siparişleri satır satır CSV olarak üretir"""
+    return iter_csv_rows(ORDER_CSV_HEADER, (get_order_csv_row(order) for order in orders))
+
+
+def iter_order_items_csv(order_items: Iterable[OrderItem]) -> Iterator[str]:
+    """Sipariş kalemlerini satır satır CSV olarak üretir"""
+    return iter_csv_rows(ORDER_ITEM_CSV_HEADER, (get_order_item_csv_row(item) for item in order_items))
+
+
 def export_orders_to_csv(orders: List[Order]) -> str:
     """Siparişleri CSV formatında export eder"""
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow([
-        'Sipariş No', 'Müşteri', 'Sezon', 'Durum', 'Sipariş Tarihi',
-        'İstenen Teslimat', 'Toplam Tutar', 'Toplam Miktar', 'Viol Sayısı'
-    ])
-    
-    # Data rows
-    for order in orders:
-        writer.writerow([
-            order.order_number,
-            order.customer.company_name,
-            order.season.name,
-            order.get_status_display(),
-            order.order_date.strftime('%d.%m.%Y'),
-            order.requested_delivery_date.strftime('%d.%m.%Y') if order.requested_delivery_date else '',
-            format_currency(order.total_amount),
-            order.total_quantity,
-            order.total_viol_count
-        ])
-    
-    return output.getvalue()
+    return ''.join(iter_orders_csv(orders))
 
 
 def export_order_items_to_csv(order_items: List[OrderItem]) -> str:
     """Sipariş kalemlerini CSV formatında export eder"""
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow([
-        'Sipariş No', 'Çeşit', 'Anaç', 'Gövde Tipi', 'Viol Tipi',
-        'Miktar', 'Viol Sayısı', 'Birim Fiyat', 'Toplam Fiyat'
-    ])
-    
-    # Data rows
-    for item in order_items:
-        writer.writerow([
-            item.order.order_number,
-            item.variety.get_full_name(),
-            item.rootstock.name if item.rootstock else 'Anaçsız',
-            item.get_stem_type_display(),
-            item.viol_type,
-            item.quantity,
-            item.viol_count,
-            format_currency(item.unit_price),
-            format_currency(item.total_price)
-        ])
-    
-    return output.getvalue()
+    return ''.join(iter_order_items_csv(order_items))
 
 
 def get_season_order_fields_mapping() -> Dict[str, str]:
@@ -1,10 +1,9 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils.dateparse import parse_date
 from django.contrib.auth.decorators import login_required
 import json
@@ -13,11 +12,16 @@ from django.utils import timezone
 from django.db import models
 
 from .models import Order, OrderItem, OrderStatusHistory, PlantingRequest, PlantingRequestHistory
-from .services import OrderService, OrderItemService, SeasonOrderService, OrderStatusHistoryService
+from .services import (
+    OrderService, OrderItemService, SeasonOrderService, OrderStatusHistoryService,
+    PlantingRequestService, ProductionCalendarService, PlantingScheduleService,
+    OrderCloneService
+)
 from .utils import (
     validate_order_data, validate_order_item_data, get_order_status_color,
     get_order_status_icon, calculate_delivery_urgency, get_urgency_color,
     format_currency, export_orders_to_csv, export_order_items_to_csv,
+    iter_orders_csv, iter_order_items_csv, EXPORT_CHUNK_SIZE,
     get_season_order_fields_mapping, get_order_item_fields_mapping,
     get_next_production_stage, can_advance_to_next_stage,
     calculate_planting_date_urgency, get_planting_date_bg_color
@@ -25,6 +29,7 @@ from .utils import (
 from seasons.models import Season, SeasonProduct
 from customers.models import Customer
 from products.models import Variety, Rootstock, Species
+from core.pagination import paginate_queryset, DEFAULT_KEYSET_ORDERING
 
 
 @login_required
@@ -32,9 +37,11 @@ def season_selection(request):
     """Sezon seçimi sayfası - Sipariş sistemine giriş"""
     seasons = Season.objects.all().order_by('-start_date')
     
-    # Her sezon için temel istatistikleri al
+    # Tüm sezonların temel istatistiklerini tek seferde al
+    seasons = list(seasons)
+    stats_by_season = OrderService.get_seasons_order_statistics([season.id for season in seasons])
     for season in seasons:
-        season.order_stats = OrderService.get_season_order_statistics(season.id)
+        season.order_stats = stats_by_season[season.id]
     
     context = {
         'seasons': seasons,
@@ -48,20 +55,11 @@ def planting_season_selection(request):
     """Ekim takip için sezon seçimi sayfası"""
     seasons = Season.objects.all().order_by('-start_date')
     
-    # Her sezon için ekim istatistikleri al
+    # Tüm sezonların ekim istatistiklerini tek sorguda al
+    seasons = list(seasons)
+    stats_by_season = PlantingRequestService.get_seasons_statistics([season.id for season in seasons])
     for season in seasons:
-        planting_stats = PlantingRequest.objects.filter(season=season).aggregate(
-            total_requests=models.Count('id'),
-            pending_requests=models.Count('id', filter=models.Q(status='pending')),
-            sent_requests=models.Count('id', filter=models.Q(status='sent')), 
-            confirmed_requests=models.Count('id', filter=models.Q(status='confirmed')),
-            planted_requests=models.Count('id', filter=models.Q(status='planted')),
-            overdue_requests=models.Count('id', filter=models.Q(
-                requested_planting_date__lt=timezone.now().date(),
-                status__in=['pending', 'sent', 'confirmed']
-            ))
-        )
-        season.planting_stats = planting_stats
+        season.planting_stats = stats_by_season[season.id]
     
     context = {
         'seasons': seasons,
@@ -93,10 +91,36 @@ def order_list(request, season_id):
     if urgent_filter:
         orders = orders.filter(urgent=True)
     
-    # Sayfalama
-    paginator = Paginator(orders, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Anaç ekim tarihi aralığına göre filtreleme (indeksli kolon üzerinden)
+    planting_range = {}
+    for param in ('planting_from', 'planting_to'):
+        try:
+            planting_range[param] = parse_date(request.GET.get(param) or '')
+        except ValueError:
+            # Biçimi doğru ama takvimde olmayan tarih (2025-02-30)
+            planting_range[param] = None
+            messages.warning(request, f'Geçersiz tarih filtresi yok sayıldı: {request.GET[param]}')
+    planting_from = planting_range['planting_from']
+    planting_to = planting_range['planting_to']
+    if planting_from or planting_to:
+        planting_items = OrderItem.objects.all()
+        if planting_from:
+            planting_items = planting_items.filter(rootstock_planting_date__gte=planting_from)
+        if planting_to:
+            planting_items = planting_items.filter(rootstock_planting_date__lte=planting_to)
+        orders = orders.filter(id__in=planting_items.values('order_id'))
+    
+    # En yakın anaç ekim tarihine göre sıralama
+    sort = request.GET.get('sort')
+    keyset_ordering = DEFAULT_KEYSET_ORDERING
+    if sort == 'planting_date':
+        orders = orders.annotate(
+            first_planting_date=models.Min('items__rootstock_planting_date')
+        ).order_by(models.F('first_planting_date').asc(nulls_last=True), '-created_at')
+        keyset_ordering = None
+    
+    # Sayfalama (varsayılan sıralamada ileri/geri gezinme keyset ile)
+    page_obj = paginate_queryset(orders, request.GET, 25, 'orders', keyset_ordering)
     
     # İstatistikler
     stats = OrderService.get_season_order_statistics(season_id)
@@ -152,6 +176,9 @@ def order_list(request, season_id):
         'status_filter': status_filter,
         'customer_filter': customer_filter,
         'urgent_filter': urgent_filter,
+        'planting_from': request.GET.get('planting_from', ''),
+        'planting_to': request.GET.get('planting_to', ''),
+        'sort': sort,
         'status_choices': Order.OrderStatus.choices,
         'total_items': total_items,
         'page_title': f'{season.name} - Sipariş Detayları'
@@ -195,13 +222,11 @@ def order_create(request, season_id):
             for field, error in errors.items():
                 messages.error(request, f'{field}: {error}')
     
-    # Form options
-    customers = Customer.objects.filter(is_active=True).order_by('first_name')
+    # Müşteri seçimi sayfalı arama ile yapılır (customers:ajax_typeahead)
     field_mapping = get_season_order_fields_mapping()
     
     context = {
         'season': season,
-        'customers': customers,
         'field_mapping': field_mapping,
         'page_title': f'{season.name} - Yeni Sipariş'
     }
@@ -541,17 +566,47 @@ def season_statistics(request, season_id):
 def season_export(request, season_id):
     """Sezon siparişlerini export et"""
     season = get_object_or_404(Season, id=season_id)
-    orders = OrderService.get_orders_by_season(season_id)
-    
-    # CSV export
-    csv_content = export_orders_to_csv(list(orders))
+    orders = OrderService.get_orders_for_export(season_id)
     
-    response = HttpResponse(csv_content, content_type='text/csv')
+    # CSV satırları sorgudan parça parça okunarak akıtılır
+    response = StreamingHttpResponse(
+        iter_orders_csv(orders.iterator(chunk_size=EXPORT_CHUNK_SIZE)),
+        content_type='text/csv'
+    )
     response['Content-Disposition'] = f'attachment; filename="{season.name}_siparisler.csv"'
     
     return response
 
 
+@login_required
+def season_items_export(request, season_id):
+    """Sezon sipariş kalemlerini export et"""
+    season = get_object_or_404(Season, id=season_id)
+    order_items = OrderItemService.get_items_for_export(season_id)
+    
+    response = StreamingHttpResponse(
+        iter_order_items_csv(order_items.iterator(chunk_size=EXPORT_CHUNK_SIZE)),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{season.name}_siparis_kalemleri.csv"'
+    
+    return response
+
+
+@login_required
+def season_calendar(request, season_id):
+    """Sezon üretim takvimi - günlük ekim, aşı, kafa kesimi iş yükü"""
+    season = get_object_or_404(Season, id=season_id)
+    calendar = ProductionCalendarService.build_season_calendar(season_id)
+    
+    context = {
+        'season': season,
+        'calendar': calendar,
+        'page_title': f'{season.name} - Üretim Takvimi'
+    }
+    return render(request, 'orders/season_calendar.html', context)
+
+
 @login_required
 def planting_list(request, season_id):
     """Ekim talep kartları listesi"""
@@ -595,27 +650,13 @@ def planting_list(request, season_id):
             )
     
     # Sayfalama
-    paginator = Paginator(planting_requests, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate_queryset(planting_requests, request.GET, 20, 'planting_requests')
     
     # İstatistikler
-    stats = {
-        'total_requests': planting_requests.count(),
-        'pending_requests': planting_requests.filter(status='pending').count(),
-        'sent_requests': planting_requests.filter(status='sent').count(),
-        'confirmed_requests': planting_requests.filter(status='confirmed').count(),
-        'planted_requests': planting_requests.filter(status='planted').count(),
-        'overdue_requests': planting_requests.filter(
-            requested_planting_date__lt=timezone.now().date(),
-            status__in=['pending', 'sent', 'confirmed']
-        ).count(),
-    }
+    stats = PlantingRequestService.get_statistics(planting_requests)
     
     # Ekim alanları
-    planting_areas = PlantingRequest.objects.filter(
-        season=season, planting_area__isnull=False
-    ).exclude(planting_area='').values_list('planting_area', flat=True).distinct()
+    planting_areas = PlantingRequestService.get_planting_areas(season.id)
     
     context = {
         'season': season,
@@ -694,6 +735,8 @@ def planting_status_update(request, season_id, request_id):
                 
                 messages.success(request, f'Ekim talebi {planting_request.get_status_display()} durumuna güncellendi.')
             
+        except IntegrityError:
+            messages.error(request, f'Aynı anaç ve gün için {area} alanında başka bir ekim talebi var.')
         except Exception as e:
             messages.error(request, f'Durum güncellenirken hata: {str(e)}')
     else:
@@ -772,10 +815,146 @@ def planting_detail(request, season_id, request_id):
 
 
 # AJAX API Views
+@login_required
+@require_http_methods(["POST"])
+def api_planting_schedule(request, season_id):
+    """Alan kapasitesine göre ekim planı önerisi API
+    
+    JSON gövde: {"capacities": {"A Serası": {"2025-03-01": 400}},
+    "default_capacity": {"A Serası": 500}, "planting_type": "rootstock",
+    "item_ids": [1, 2], "start_date": "2025-02-01"}. Dönen form_fields
+    bulk_send_to_rootstock_planting formuna olduğu gibi eklenebilir.
+    """
+    season = get_object_or_404(Season, id=season_id)
+    try:
+        payload = json.loads(request.body or '{}')
+        capacities = {
+            area: {parse_date(day): int(capacity) for day, capacity in days.items()}
+            for area, days in (payload.get('capacities') or {}).items()
+        }
+        default_capacity = payload.get('default_capacity')
+        if default_capacity is not None:
+            default_capacity = {area: int(capacity) for area, capacity in default_capacity.items()}
+        item_ids = payload.get('item_ids')
+        if item_ids is not None:
+            item_ids = [int(item_id) for item_id in item_ids]
+        start_date = parse_date(payload['start_date']) if payload.get('start_date') else None
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'success': False, 'error': f'Geçersiz planlama verisi: {e}'}, status=400)
+    
+    if any(None in days for days in capacities.values()):
+        return JsonResponse({'success': False, 'error': 'Kapasite tarihleri YYYY-AA-GG biçiminde olmalı'}, status=400)
+    
+    planting_type = (
+        PlantingRequest.PlantingType.SCION if payload.get('planting_type') == 'scion'
+        else PlantingRequest.PlantingType.ROOTSTOCK
+    )
+    plan = PlantingScheduleService.schedule(
+        season.id,
+        capacities=capacities,
+        default_capacity=default_capacity,
+        planting_type=planting_type,
+        item_ids=item_ids,
+        start_date=start_date
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'season_id': season.id,
+        'planting_type': planting_type.value,
+        'start_date': plan['start_date'].isoformat(),
+        'end_date': plan['end_date'].isoformat() if plan['end_date'] else None,
+        'assignments': {
+            item_id: {
+                'planting_date': assignment['planting_date'].isoformat(),
+                'planting_area': assignment['planting_area'],
+                'shift_days': assignment['shift_days'],
+            }
+            for item_id, assignment in plan['assignments'].items()
+        },
+        'unscheduled': plan['unscheduled'],
+        'load': {
+            area: {day.isoformat(): viols for day, viols in sorted(days.items())}
+            for area, days in plan['load'].items()
+        },
+        'shortages': [
+            {**shortage, 'date': shortage['date'].isoformat()} for shortage in plan['shortages']
+        ],
+        'form_fields': PlantingScheduleService.to_form_fields(plan['assignments']),
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_order_items_batch(request, season_id, order_id):
+    """Siparişin tüm kalemlerini tek istekte ekleme API
+    
+    JSON gövde: {"lines": [{"variety_id": 1, "rootstock_id": 2, "stem_type": "single",
+    "viol_type": "128", "quantity": 1000, "viol_count": 8, "unit_price": null, "notes": ""}]}.
+    Hatalı satır varsa hiçbir kalem eklenmez; hatalar satır sırasıyla döner.
+    """
+    season = get_object_or_404(Season, id=season_id)
+    order = get_object_or_404(Order, id=order_id, season=season)
+    
+    try:
+        lines = json.loads(request.body).get('lines')
+        if not isinstance(lines, list):
+            raise ValueError('lines bir liste olmalıdır')
+    except (ValueError, AttributeError) as e:
+        return JsonResponse({'success': False, 'error': f'Geçersiz veri: {e}'}, status=400)
+    
+    result = OrderItemService.create_order_lines(order, lines)
+    if not result['success']:
+        return JsonResponse({'success': False, 'errors': result['errors']}, status=400)
+    
+    order.refresh_from_db(fields=['total_amount'])
+    return JsonResponse({
+        'success': True,
+        'created_count': len(result['items']),
+        'item_ids': [item.pk for item in result['items']],
+        'created_season_products': result['created_season_products'],
+        'total_amount': order.total_amount,
+    }, status=201)
+
+
+@login_required
+def api_season_calendar(request, season_id):
+    """Sezon üretim takvimi API"""
+    season = get_object_or_404(Season, id=season_id)
+    calendar = ProductionCalendarService.build_season_calendar(season.id)
+    
+    return JsonResponse({
+        'success': True,
+        'season_id': season.id,
+        'item_count': calendar['item_count'],
+        'start_date': calendar['start_date'].isoformat() if calendar['start_date'] else None,
+        'end_date': calendar['end_date'].isoformat() if calendar['end_date'] else None,
+        'stages': calendar['stages'],
+        'totals': calendar['totals'],
+        'days': [
+            {
+                'date': day['date'].isoformat(),
+                'stages': {
+                    stage['code']: {'plants': stage['plants'], 'viols': stage['viols']}
+                    for stage in day['stages']
+                }
+            }
+            for day in calendar['days']
+        ]
+    })
+
+
 @login_required
 def api_season_products(request, season_id):
-    """Sezon ürünleri API"""
-    season_products = SeasonOrderService.get_available_season_products(season_id)
+    """Sezon ürünleri API (q ile önek araması, sayfalı)"""
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 1
+    
+    season_products, has_more = SeasonOrderService.search_season_products(
+        season_id, request.GET.get('q', ''), page=page
+    )
     
     data = []
     for sp in season_products:
@@ -786,7 +965,7 @@ def api_season_products(request, season_id):
             'display_name': f"{sp.variety.get_full_name()} ({sp.rootstock.name if sp.rootstock else 'Anaçsız'})"
         })
     
-    return JsonResponse({'season_products': data})
+    return JsonResponse({'season_products': data, 'page': page, 'has_more': has_more})
 
 
 @login_required
@@ -847,9 +1026,97 @@ def api_order_totals(request, order_id):
 def order_edit(request, season_id, order_id):
     return redirect('orders:order_detail', season_id=season_id, order_id=order_id)
 
+def _clone_report_messages(request, result):
+    """Kopyalama raporunu kullanıcı mesajlarına çevirir"""
+    if result['created_orders']:
+        messages.success(
+            request,
+            f"{len(result['created_orders'])} sipariş ve {result['created_items']} kalem kopyalandı."
+        )
+    if result['unmapped_products']:
+        products = ', '.join(
+            f"{product['variety']} ({product['rootstock'] or 'Anaçsız'}): {product['item_count']} kalem"
+            for product in result['unmapped_products'].values()
+        )
+        messages.warning(request, f'Hedef sezonda karşılığı olmayan ürünler atlandı: {products}')
+    if result['skipped_orders']:
+        messages.warning(
+            request,
+            f"Kopyalanacak kalemi olmayan {len(result['skipped_orders'])} sipariş atlandı: "
+            f"{', '.join(result['skipped_orders'][:20])}"
+        )
+
+
+def _clone_target_season(request, season):
+    target_season_id = request.POST.get('target_season')
+    if not target_season_id or str(season.id) == target_season_id:
+        return None
+    return Season.objects.filter(id=target_season_id).first()
+
+
 @login_required
 def order_clone(request, season_id, order_id):
-    return redirect('orders:order_detail', season_id=season_id, order_id=order_id)
+    """Siparişi başka bir sezona kopyala"""
+    season = get_object_or_404(Season, id=season_id)
+    order = get_object_or_404(Order.objects.select_related('customer'), id=order_id, season=season)
+    
+    if request.method == 'POST':
+        target_season = _clone_target_season(request, season)
+        if target_season is None:
+            messages.error(request, 'Geçerli bir hedef sezon seçin.')
+            return redirect('orders:order_clone', season_id=season_id, order_id=order_id)
+        
+        result = OrderCloneService.clone_orders(
+            season.id, target_season, order_ids=[order.id], user=request.user
+        )
+        _clone_report_messages(request, result)
+        if result['created_orders']:
+            return redirect('orders:order_detail', season_id=target_season.id, order_id=result['created_orders'][0])
+        return redirect('orders:order_detail', season_id=season_id, order_id=order_id)
+    
+    context = {
+        'season': season,
+        'order': order,
+        'target_seasons': Season.objects.exclude(id=season.id).order_by('-start_date'),
+        'page_title': f'{order.order_number} - Kopyala'
+    }
+    return render(request, 'orders/order_clone.html', context)
+
+
+@login_required
+def season_orders_clone(request, season_id):
+    """Sezon siparişlerini müşteri sınıfına göre toplu olarak başka sezona kopyala"""
+    season = get_object_or_404(Season, id=season_id)
+    
+    if request.method == 'POST':
+        target_season = _clone_target_season(request, season)
+        if target_season is None:
+            messages.error(request, 'Geçerli bir hedef sezon seçin.')
+            return redirect('orders:season_orders_clone', season_id=season_id)
+        
+        result = OrderCloneService.clone_orders(
+            season.id,
+            target_season,
+            customer_tiers=request.POST.getlist('customer_tiers') or None,
+            user=request.user
+        )
+        _clone_report_messages(request, result)
+        if not result['created_orders']:
+            messages.info(request, 'Kopyalanan sipariş yok.')
+            return redirect('orders:season_orders_clone', season_id=season_id)
+        return redirect('orders:order_list', season_id=target_season.id)
+    
+    context = {
+        'season': season,
+        'order': None,
+        'target_seasons': Season.objects.exclude(id=season.id).order_by('-start_date'),
+        # Renk seçenekleri A'dan G'ye sınıf sırasındadır
+        'customer_tiers': [
+            (tier, label) for tier, (_, label) in zip('ABCDEFG', Customer.COLOR_CHOICES)
+        ],
+        'page_title': f'{season.name} - Siparişleri Kopyala'
+    }
+    return render(request, 'orders/order_clone.html', context)
 
 @login_required
 def order_item_add(request, season_id, order_id):
@@ -998,34 +1265,17 @@ def bulk_send_to_planting(request, season_id):
         messages.error(request, 'Hiç sipariş seçilmedi.')
         return redirect('orders:order_list', season_id=season_id)
     
-    success_count = 0
-    error_count = 0
-    
     try:
-        with transaction.atomic():
-            for order_id in selected_order_ids:
-                try:
-                    order = Order.objects.get(id=order_id, season=season)
-                    
-                    # Sadece draft, confirmed durumlarındaki siparişler waiting aşamasına gönderilebilir
-                    if order.status in [Order.OrderStatus.DRAFT, Order.OrderStatus.CONFIRMED]:
-                        # Sipariş durumunu güncelle
-                        OrderService.update_order_status(
-                            order_id=order.id,
-                            new_status=Order.OrderStatus.WAITING,
-                            changed_by_id=request.user.id,
-                            notes='Toplu işlemle bekleyen duruma alındı'
-                        )
-                        success_count += 1
-                    else:
-                        error_count += 1
-                        
-                except Order.DoesNotExist:
-                    error_count += 1
-                    continue
-                except Exception as e:
-                    error_count += 1
-                    continue
+        # Sadece draft, confirmed durumlarındaki siparişler waiting aşamasına gönderilebilir
+        result = OrderService.bulk_transition(
+            selected_order_ids,
+            Order.OrderStatus.WAITING,
+            user=request.user,
+            notes='Toplu işlemle bekleyen duruma alındı',
+            season_id=season.id
+        )
+        success_count = len(result['updated'])
+        error_count = len(result['failed'])
         
         # Başarı mesajı
         if success_count > 0:
@@ -1052,117 +1302,55 @@ def bulk_send_to_rootstock_planting(request, season_id):
         messages.error(request, 'Hiç sipariş kalemi seçilmedi.')
         return redirect('orders:order_list', season_id=season_id)
     
-    success_count = 0
-    error_count = 0
-    created_requests = []
-    
     # Ekim türüne göre farklı ayarlar
     is_rootstock_planting = planting_type == 'rootstock'
     planting_type_enum = PlantingRequest.PlantingType.ROOTSTOCK if is_rootstock_planting else PlantingRequest.PlantingType.SCION
     
+    # Ekim adetleri anaç bazında girilir: planting_quantity_<anaç adı>
+    quantity_prefix = 'planting_quantity_'
+    planting_quantities = {
+        key[len(quantity_prefix):]: value
+        for key, value in request.POST.items()
+        if key.startswith(quantity_prefix)
+    }
+    
+    # Kapasite planlamasından gelen kalem bazlı öneriler: planting_date_<id>, planting_area_<id>
+    planting_dates = {}
+    planting_areas = {}
+    invalid_dates = []
+    for key, value in request.POST.items():
+        if key.startswith('planting_date_') and key[len('planting_date_'):].isdigit():
+            try:
+                planned_date = parse_date(value)
+            except ValueError:
+                planned_date = None
+            if planned_date:
+                planting_dates[int(key[len('planting_date_'):])] = planned_date
+            elif value.strip():
+                invalid_dates.append(value)
+        elif key.startswith('planting_area_') and key[len('planting_area_'):].isdigit() and value.strip():
+            planting_areas[int(key[len('planting_area_'):])] = value.strip()
+    
+    if invalid_dates:
+        messages.error(
+            request,
+            f'Geçersiz ekim tarihi: {", ".join(invalid_dates)}. Hiçbir kalem ekime gönderilmedi.'
+        )
+        return redirect('orders:order_list', season_id=season_id)
+    
     try:
-        with transaction.atomic():
-            # Seçilen kalemleri SADECE anaç türlerine göre grupla
-            grouped_items = {}
-            
-            for item_id in selected_item_ids:
-                try:
-                    item = OrderItem.objects.select_related(
-                        'variety', 'rootstock', 'order', 'season_product'
-                    ).get(id=item_id, order__season=season)
-                    
-                    # Duruma göre geçerlilik kontrolü
-                    is_valid_item = False
-                    if is_rootstock_planting:
-                        # Anaç ekim için: waiting durumunda ve anaçlı ürünler
-                        is_valid_item = item.status == OrderItem.OrderItemStatus.WAITING and item.rootstock
-                    else:
-                        # Kalem ekim için: anaç ekilmiş durumundaki ürünler
-                        is_valid_item = item.status == OrderItem.OrderItemStatus.ROOTSTOCK_PLANTING_PLANTED
-                    
-                    if is_valid_item:
-                        # Grup anahtarı sadece anaç bazında oluştur
-                        rootstock_name = item.rootstock.name if item.rootstock else 'NoRootstock'
-                        group_key = rootstock_name
-                        
-                        if group_key not in grouped_items:
-                            grouped_items[group_key] = {
-                                'rootstock': item.rootstock,
-                                'planting_date': item.rootstock_planting_date if is_rootstock_planting else item.scion_planting_date,
-                                'items': [],
-                                'varieties': set()  # Çeşitleri takip et
-                            }
-                        
-                        grouped_items[group_key]['items'].append(item)
-                        if item.variety:
-                            grouped_items[group_key]['varieties'].add(item.variety)
-                        
-                except OrderItem.DoesNotExist:
-                    error_count += 1
-                    continue
-            
-            # Her grup için PlantingRequest oluştur
-            for group_key, group_data in grouped_items.items():
-                # Ekim adedini POST verilerinden al
-                planting_quantity_key = f"planting_quantity_{group_key}"
-                planting_quantity = request.POST.get(planting_quantity_key)
-                
-                if not planting_quantity:
-                    error_count += len(group_data['items'])
-                    continue
-                
-                try:
-                    planting_quantity = int(planting_quantity)
-                except (ValueError, TypeError):
-                    error_count += len(group_data['items'])
-                    continue
-                
-                if planting_quantity <= 0:
-                    error_count += len(group_data['items'])
-                    continue
-                
-                planting_date = group_data['planting_date']
-                
-                if planting_date:
-                    # PlantingRequest oluştur veya mevcut olana ekle (sadece anaç bazında unique)
-                    planting_request, created = PlantingRequest.objects.get_or_create(
-                        rootstock=group_data['rootstock'],
-                        planting_type=planting_type_enum,
-                        requested_planting_date=planting_date,
-                        season=season,
-                        defaults={
-                            'status': PlantingRequest.RequestStatus.SENT,
-                            'sent_to_planting_date': timezone.now(),
-                            'created_by': request.user,
-                            'planting_quantity': planting_quantity,
-                            'notes': f'Sistem tarafından otomatik oluşturuldu - {len(group_data["varieties"])} çeşit ({planting_type_enum.label})'
-                        }
-                    )
-                    
-                    # Eğer mevcut bir request varsa planting_quantity'yi güncelle
-                    if not created:
-                        planting_request.planting_quantity += planting_quantity
-                        planting_request.save()
-                    
-                    # OrderItem'ları güncelle ve PlantingRequest'e ekle
-                    for item in group_data['items']:
-                        # Duruma göre OrderItem status güncelleme
-                        if is_rootstock_planting:
-                            item.status = OrderItem.OrderItemStatus.ROOTSTOCK_PLANTING_SENT
-                        else:
-                            item.status = OrderItem.OrderItemStatus.SCION_PLANTING_SENT
-                        
-                        item.save()
-                        planting_request.order_items.add(item)
-                        success_count += 1
-                    
-                    planting_request.calculate_totals()
-                    
-                    if created:
-                        created_requests.append(planting_request)
-                else:
-                    # Ekim tarihi hesaplanamadığı için hata
-                    error_count += len(group_data['items'])
+        result = PlantingRequestService.send_items_to_planting(
+            season=season,
+            item_ids=selected_item_ids,
+            planting_type=planting_type_enum,
+            planting_quantities=planting_quantities,
+            user=request.user,
+            planting_dates=planting_dates,
+            planting_areas=planting_areas
+        )
+        success_count = result['success_count']
+        error_count = result['error_count']
+        created_requests = result['created_requests']
         
         # Başarı mesajı
         if success_count > 0:
@@ -1174,7 +1362,7 @@ def bulk_send_to_rootstock_planting(request, season_id):
         
         # Hata mesajı
         if error_count > 0:
-            error_msg = 'anaç ekime gönderilemedi (uygun durumda değil, anaçsız veya ekim tarihi hesaplanamadı)' if is_rootstock_planting else 'kalem ekime gönderilemedi (anaç ekilmemiş veya ekim tarihi hesaplanamadı)'
+            error_msg = 'anaç ekime gönderilemedi (uygun durumda değil, anaçsız, ekim tarihi hesaplanamadı veya önerilen tarih geç)' if is_rootstock_planting else 'kalem ekime gönderilemedi (anaç ekilmemiş, ekim tarihi hesaplanamadı veya önerilen tarih geç)'
             messages.warning(request, f'{error_count} sipariş kalemi {error_msg}.')
             
     except Exception as e:
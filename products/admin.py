@@ -1,3 +1,31 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Variety, Rootstock
+
+
+@admin.register(Variety)
+class VarietyAdmin(admin.ModelAdmin):
+    """Çeşit admin konfigürasyonu (otomatik tamamlama aramaları için)"""
+    
+    list_display = ['name', 'species', 'seed_brand', 'is_active']
+    list_filter = ['is_active', 'species']
+    list_select_related = ['species', 'seed_brand']
+    search_fields = ['name', 'species__name']
+    ordering = ['species__name', 'name']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('species')
+
+
+@admin.register(Rootstock)
+class RootstockAdmin(admin.ModelAdmin):
+    """Anaç admin konfigürasyonu (otomatik tamamlama aramaları için)"""
+    
+    list_display = ['name', 'species', 'is_active']
+    list_filter = ['is_active', 'species']
+    list_select_related = ['species']
+    search_fields = ['name', 'species__name']
+    ordering = ['name']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('species')
@@ -2,6 +2,8 @@ from django.db import models
 from django.core.validators import MinLengthValidator
 from django.utils import timezone
 
+from core.pagination import invalidate_cached_counts
+
 # Create your models here.
 
 class Species(models.Model):
@@ -49,6 +51,15 @@ class Species(models.Model):
     def __repr__(self):
         return f"<Species: {self.name}>"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_cached_counts('products')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_counts('products')
+        return result
+    
     @property
     def active_varieties_count(self):
         """Bu türe ait aktif çeşit sayısı"""
@@ -117,6 +128,15 @@ class SeedBrand(models.Model):
     def __repr__(self):
         return f"<SeedBrand: {self.name}>"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_cached_counts('products')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_counts('products')
+        return result
+    
     @property
     def price_per_seed(self):
         """Tohum başına fiyat"""
@@ -192,6 +212,15 @@ class Variety(models.Model):
     def __repr__(self):
         return f"<Variety: {self.species.name} - {self.name}>"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_cached_counts('products')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_counts('products')
+        return result
+    
     def get_full_name(self):
         """Tam adı döndürür"""
         return f"{self.species.name} {self.name}"
@@ -279,6 +308,15 @@ class Rootstock(models.Model):
     def __repr__(self):
         return f"<Rootstock: {self.species.name} - {self.name}>"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_cached_counts('products')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_counts('products')
+        return result
+    
     def get_full_name(self):
         """Tam adı döndürür"""
         return f"{self.species.name} {self.name}"
@@ -1,7 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.db.models import Q, Count, Avg, Sum
 from django.utils import timezone
-from django.core.paginator import Paginator
+from core.pagination import CachedCountPaginator, invalidate_cached_counts
 from .models import Species, SeedBrand, Variety, Rootstock
 
 
@@ -49,12 +49,12 @@ class SpeciesService:
         
         queryset = queryset.order_by('name')
         
-        paginator = Paginator(queryset, per_page)
+        paginator = CachedCountPaginator(queryset, per_page, 'products')
         page_obj = paginator.get_page(page)
         
         return {
             'species': page_obj,
-            'total_count': queryset.count(),
+            'total_count': paginator.count,
             'page_obj': page_obj
         }
     
@@ -129,12 +129,12 @@ class SeedBrandService:
         
         queryset = queryset.order_by('name')
         
-        paginator = Paginator(queryset, per_page)
+        paginator = CachedCountPaginator(queryset, per_page, 'products')
         page_obj = paginator.get_page(page)
         
         return {
             'seed_brands': page_obj,
-            'total_count': queryset.count(),
+            'total_count': paginator.count,
             'page_obj': page_obj
         }
     
@@ -222,12 +222,12 @@ class VarietyService:
         
         queryset = queryset.order_by('species__name', 'name')
         
-        paginator = Paginator(queryset, per_page)
+        paginator = CachedCountPaginator(queryset, per_page, 'products')
         page_obj = paginator.get_page(page)
         
         return {
             'varieties': page_obj,
-            'total_count': queryset.count(),
+            'total_count': paginator.count,
             'page_obj': page_obj
         }
     
@@ -316,12 +316,12 @@ class RootstockService:
         
         queryset = queryset.order_by('species__name', 'name')
         
-        paginator = Paginator(queryset, per_page)
+        paginator = CachedCountPaginator(queryset, per_page, 'products')
         page_obj = paginator.get_page(page)
         
         return {
             'rootstocks': page_obj,
-            'total_count': queryset.count(),
+            'total_count': paginator.count,
             'page_obj': page_obj
         }
     
@@ -382,6 +382,7 @@ class ProductService:
                 is_active=is_active,
                 updated_at=timezone.now()
             )
+            invalidate_cached_counts('products')
             return updated, None
         except Exception as e:
             return 0, f"Toplu işlem hatası: {str(e)}"
@@ -66,6 +66,7 @@ class SeasonProductInline(admin.TabularInline):
     extra = 0
     fields = ['variety', 'rootstock', 'is_active']
     readonly_fields = []
+    autocomplete_fields = ['variety', 'rootstock']
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('variety', 'rootstock')
@@ -87,6 +88,7 @@ class SeasonProductAdmin(admin.ModelAdmin):
     ]
     ordering = ['season__start_date', 'variety__species__name', 'variety__name']
     readonly_fields = ['created_at', 'updated_at', 'total_production_days_info']
+    autocomplete_fields = ['variety', 'rootstock']
     
     fieldsets = (
         ('Genel Bilgiler', {
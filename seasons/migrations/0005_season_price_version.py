@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seasons', '0004_seasonproduct_waiting_on_room_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='price_version',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
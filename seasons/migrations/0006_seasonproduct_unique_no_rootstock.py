@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('seasons', '0005_season_price_version'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='seasonproduct',
+            constraint=models.UniqueConstraint(condition=models.Q(('rootstock__isnull', True)), fields=('season', 'variety'), name='unique_season_variety_no_rootstock'),
+        ),
+    ]
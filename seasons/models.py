@@ -7,6 +7,8 @@ class Season(models.Model):
     name = models.CharField(max_length=50, unique=True)
     start_date = models.DateField()
     is_active = models.BooleanField(default=True)
+    # Sezon ürünleri değiştikçe yenilenen fiyat tablosu damgası (SeasonPriceMatrixService)
+    price_version = models.BigIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -159,11 +161,68 @@ class SeasonProduct(models.Model):
         # Unique together - aynı sezonda aynı çeşit-anaç kombinasyonu olamaz
         unique_together = [['season', 'variety', 'rootstock']]
         
+        constraints = [
+            # NULL değerler birbirinden farklı sayıldığı için anaçsız ürünler
+            # yukarıdaki kısıta takılmaz; sezon-çeşit başına tek anaçsız ürün
+            models.UniqueConstraint(
+                fields=['season', 'variety'],
+                condition=models.Q(rootstock__isnull=True),
+                name='unique_season_variety_no_rootstock'
+            )
+        ]
+        
         indexes = [
             models.Index(fields=['season', 'variety'], name='season_variety_idx'),
             models.Index(fields=['is_active'], name='seasonproduct_active_idx'),
         ]
     
+    DELIVERY_DURATION_FIELDS = [
+        'rootstock_planting_duration',
+        'scion_planting_duration',
+        'waiting_on_room_duration',
+        'head_formation_duration',
+        'single_stem_grafting_duration',
+        'double_stem_grafting_duration',
+    ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Süre değişikliğini save() sırasında tespit etmek için sakla
+        instance._loaded_durations = instance._current_durations()
+        return instance
+    
+    def _current_durations(self):
+        return tuple(self.__dict__.get(field) for field in self.DELIVERY_DURATION_FIELDS)
+    
+    def save(self, *args, **kwargs):
+        durations_changed = (
+            hasattr(self, '_loaded_durations')
+            and self._current_durations() != self._loaded_durations
+        )
+        super().save(*args, **kwargs)
+        # Fiyat ve süreler sezon fiyat tablosunda önbelleklenir
+        from .services import SeasonPriceMatrixService
+        SeasonPriceMatrixService.invalidate(self.season_id)
+        
+        # Süreler değiştiyse bu ürünü içeren kalemlerin üretim tarihleri ve
+        # siparişlerin planlanan teslimatı güncellenir
+        if durations_changed:
+            from orders.models import Order
+            from orders.services import OrderItemService
+            OrderItemService.refresh_production_dates(self.order_items.all())
+            Order.recalculate_planned_delivery_dates(
+                self.order_items.values_list('order_id', flat=True)
+            )
+        self._loaded_durations = self._current_durations()
+    
+    def delete(self, *args, **kwargs):
+        season_id = self.season_id
+        result = super().delete(*args, **kwargs)
+        from .services import SeasonPriceMatrixService
+        SeasonPriceMatrixService.invalidate(season_id)
+        return result
+    
     @property
     def total_production_duration(self):
         """Toplam üretim süresi (gün)"""
@@ -1,8 +1,16 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from array import array
+from contextlib import contextmanager
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import QuerySet
-from datetime import date, datetime
-from decimal import Decimal
+from django.db.models import QuerySet, F, Value, DecimalField
+from django.db.models.functions import Greatest, Round
+from django.utils import timezone
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
 
 from .models import Season, SeasonProduct
 from products.models import Variety, Rootstock
@@ -129,7 +137,9 @@ class SeasonProductService:
             if field in duration_fields:
                 setattr(season_product, field, value)
         
+        # Süre değişikliği kalemlerin üretim tarihlerini de günceller (SeasonProduct.save)
         season_product.save()
+        
         return season_product
     
     @staticmethod
@@ -213,3 +223,500 @@ class SeasonProductService:
         total_days += season_product.head_formation_duration
         
         return order_date + timedelta(days=total_days)
+    
+    @staticmethod
+    def calculate_stage_offsets(
+        season_product: SeasonProduct,
+        stem_type: str = 'single'
+    ) -> Dict[str, int]:
+        """Üretim aşamalarının teslimat tarihinden kaç gün önce başladığını hesaplar"""
+        if stem_type == 'single':
+            grafting_duration = season_product.single_stem_grafting_duration
+        else:
+            grafting_duration = season_product.double_stem_grafting_duration
+        
+        head_formation_days = (
+            season_product.waiting_on_room_duration +
+            season_product.head_formation_duration
+        )
+        grafting_days = head_formation_days + grafting_duration
+        rootstock_planting_days = grafting_days + season_product.scion_planting_duration
+        scion_planting_days = rootstock_planting_days - season_product.rootstock_planting_duration
+        
+        return {
+            'rootstock_planting_date': rootstock_planting_days,
+            'scion_planting_date': scion_planting_days,
+            'grafting_date': grafting_days,
+            'head_formation_date': head_formation_days,
+        }
+    
+    @staticmethod
+    def calculate_production_dates(
+        season_product: SeasonProduct,
+        delivery_date: date,
+        stem_type: str = 'single'
+    ) -> Dict[str, date]:
+        """Teslimat tarihinden geriye doğru üretim aşaması tarihlerini hesaplar"""
+        offsets = SeasonProductService.calculate_stage_offsets(season_product, stem_type)
+        return {
+            field: delivery_date - timedelta(days=days)
+            for field, days in offsets.items()
+        }
+
+
+class SeasonPriceMatrix:
+    """Bir sezonun fiyat ve teslimat süresi tablosu
+    
+    Fiyatlar kuruş cinsinden [ürün × 2 gövde × 18 ay] boyutlu tek bir
+    array'de, teslimat süreleri [ürün × 2 gövde] boyutlu array'de tutulur.
+    Ürünün satır numarası season_product_id ile bulunur; sorgu yapılmaz.
+    """
+    
+    MONTHS = 18
+    STEM_TYPES = ('single', 'double')
+    
+    def __init__(self, season_id: int, version, rows: Dict[int, int], prices: array, delivery_days: array):
+        self.season_id = season_id
+        self.version = version
+        self.rows = rows
+        self.prices = prices
+        self.delivery_days = delivery_days
+    
+    @staticmethod
+    def stem_index(stem_type: str) -> int:
+        return 0 if stem_type == 'single' else 1
+    
+    @staticmethod
+    def month_index(order_date: date, delivery_date: date) -> int:
+        """Sipariş ile teslimat arasındaki ay sırası (1-18 arasında sınırlı)"""
+        month_diff = (delivery_date.year - order_date.year) * 12 + (delivery_date.month - order_date.month) + 1
+        return max(1, min(SeasonPriceMatrix.MONTHS, month_diff))
+    
+    def __contains__(self, season_product_id) -> bool:
+        return season_product_id in self.rows
+    
+    def delivery_date(self, season_product_id: int, stem_type: str, order_date: date) -> Optional[date]:
+        """Ürünün sipariş tarihine göre teslimat tarihi"""
+        row = self.rows.get(season_product_id)
+        if row is None:
+            return None
+        return order_date + timedelta(days=self.delivery_days[row * 2 + self.stem_index(stem_type)])
+    
+    def price(self, season_product_id: int, stem_type: str, month: int) -> Decimal:
+        """Ürünün belirtilen ay sırasındaki birim fiyatı"""
+        row = self.rows.get(season_product_id)
+        if row is None:
+            return Decimal('0.00')
+        offset = (row * 2 + self.stem_index(stem_type)) * self.MONTHS + month - 1
+        return Decimal(self.prices[offset]).scaleb(-2)
+    
+    def unit_price(self, season_product_id: int, stem_type: str, order_date: date) -> Decimal:
+        """Teslimat ayına göre birim fiyat"""
+        delivery_date = self.delivery_date(season_product_id, stem_type, order_date)
+        if delivery_date is None:
+            return Decimal('0.00')
+        return self.price(season_product_id, stem_type, self.month_index(order_date, delivery_date))
+
+
+class SeasonPriceMatrixService:
+    """Sezon fiyat tablolarının süreç içi önbelleği
+    
+    Tablolar her süreçte sezon başına bir kez yüklenir. Geçerlilik
+    Season.price_version damgasıyla kontrol edilir; damga SeasonProduct
+    değişikliğiyle aynı işlemde veritabanında yenilenir. Süreçler damgayı
+    PRICE_MATRIX_VERSION_TIMEOUT saniye önbellekte tutar, bu yüzden diğer
+    süreçler yeni fiyatları en geç bu süre sonunda görür.
+    """
+    
+    VERSION_KEY = 'season_price_matrix_version:{season_id}'
+    
+    _matrices: Dict[int, SeasonPriceMatrix] = {}
+    _lock = threading.Lock()
+    # Bu iş parçacığının açık işleminde değiştirdiği sezonlar
+    _pending = threading.local()
+    # batch() bloğu içinde çözülmüş tablolar
+    _batch = threading.local()
+    
+    @staticmethod
+    def price_fields() -> List[str]:
+        """Tablodaki sırasıyla fiyat alanları: tek gövde 1-18, çift gövde 1-18"""
+        return [
+            f'price_{stem_type}_stem_{month}'
+            for stem_type in SeasonPriceMatrix.STEM_TYPES
+            for month in range(1, SeasonPriceMatrix.MONTHS + 1)
+        ]
+    
+    @staticmethod
+    def get_version(season_id: int):
+        """Sezonun fiyat tablosu damgası (veritabanından, kısa süreli önbellekli)"""
+        cache_key = SeasonPriceMatrixService.VERSION_KEY.format(season_id=season_id)
+        version = cache.get(cache_key)
+        if version is None:
+            version = Season.objects.filter(pk=season_id).values_list('price_version', flat=True).first()
+            cache.set(cache_key, version, getattr(settings, 'PRICE_MATRIX_VERSION_TIMEOUT', 5))
+        return version
+    
+    @staticmethod
+    def _pending_entries() -> Dict[int, Dict]:
+        """Açık işlemde değiştirilen sezonlar: {sezon: {'callbacks': [...], 'matrix': ...}}"""
+        entries = getattr(SeasonPriceMatrixService._pending, 'entries', None)
+        if entries is None:
+            entries = SeasonPriceMatrixService._pending.entries = {}
+        return entries
+    
+    @staticmethod
+    def _pending_entry(season_id: int) -> Optional[Dict]:
+        """Sezonun onaylanmamış değişikliği hâlâ açık işlemdeyse kaydını döner
+        
+        Geri alınan işlem veya savepoint on_commit kayıtlarını da siler; temizlik
+        fonksiyonu artık kayıtlı değilse değişiklik geri alınmıştır.
+        """
+        entries = SeasonPriceMatrixService._pending_entries()
+        entry = entries.get(season_id)
+        if entry is None:
+            return None
+        
+        connection = transaction.get_connection()
+        registered = (
+            {id(func) for _, func, _ in connection.run_on_commit}
+            if connection.in_atomic_block else set()
+        )
+        alive = [callback for callback in entry['callbacks'] if id(callback) in registered]
+        if len(alive) != len(entry['callbacks']):
+            # Geri alınan değişikliği içerebilecek tablo atılır
+            entry['callbacks'] = alive
+            entry['matrix'] = None
+        if not alive:
+            del entries[season_id]
+            return None
+        return entry
+    
+    @staticmethod
+    @contextmanager
+    def batch():
+        """Blok içinde her sezonun tablosu bir kez çözülür (toplu kalem kayıtları için)
+        
+        Blok içindeki get_matrix çağrıları damga kontrolü yapmadan aynı tabloyu
+        döner; invalidate edilen sezon bloktan da düşülür. İç içe kullanılabilir.
+        """
+        if getattr(SeasonPriceMatrixService._batch, 'matrices', None) is not None:
+            yield
+            return
+        
+        SeasonPriceMatrixService._batch.matrices = {}
+        try:
+            yield
+        finally:
+            SeasonPriceMatrixService._batch.matrices = None
+    
+    @staticmethod
+    def get_matrix(season_id: int) -> SeasonPriceMatrix:
+        """Sezonun güncel fiyat tablosunu döner, gerekirse yükler"""
+        batch = getattr(SeasonPriceMatrixService._batch, 'matrices', None)
+        if batch is not None and season_id in batch:
+            return batch[season_id]
+        
+        matrix = SeasonPriceMatrixService._resolve_matrix(season_id)
+        if batch is not None:
+            batch[season_id] = matrix
+        return matrix
+    
+    @staticmethod
+    def _resolve_matrix(season_id: int) -> SeasonPriceMatrix:
+        entry = SeasonPriceMatrixService._pending_entry(season_id)
+        if entry is not None:
+            # Onaylanmamış değişiklikler sadece bu işlem için saklanır
+            if entry['matrix'] is None:
+                entry['matrix'] = SeasonPriceMatrixService.load_matrix(season_id)
+            return entry['matrix']
+        
+        version = SeasonPriceMatrixService.get_version(season_id)
+        matrix = SeasonPriceMatrixService._matrices.get(season_id)
+        if matrix is not None and matrix.version == version:
+            return matrix
+        
+        matrix = SeasonPriceMatrixService.load_matrix(season_id, version)
+        with SeasonPriceMatrixService._lock:
+            SeasonPriceMatrixService._matrices[season_id] = matrix
+        return matrix
+    
+    @staticmethod
+    def load_matrix(season_id: int, version=None) -> SeasonPriceMatrix:
+        """Sezon ürünlerinin fiyat ve sürelerini tek sorguda tabloya yükler"""
+        price_fields = SeasonPriceMatrixService.price_fields()
+        rows = SeasonProduct.objects.filter(season_id=season_id).order_by('id').values_list(
+            'id',
+            'rootstock_planting_duration',
+            'scion_planting_duration',
+            'waiting_on_room_duration',
+            'head_formation_duration',
+            'single_stem_grafting_duration',
+            'double_stem_grafting_duration',
+            *price_fields
+        )
+        
+        product_rows = {}
+        prices = array('q')
+        delivery_days = array('l')
+        for row in rows:
+            product_rows[row[0]] = len(product_rows)
+            # calculate_delivery_date ile aynı toplam
+            base_days = row[1] + row[2] + row[3] + row[4]
+            delivery_days.append(base_days + row[5])
+            delivery_days.append(base_days + row[6])
+            prices.extend(int(value * 100) for value in row[7:])
+        
+        return SeasonPriceMatrix(season_id, version, product_rows, prices, delivery_days)
+    
+    @staticmethod
+    def invalidate(*season_ids: int) -> None:
+        """Sezon fiyat tablolarını tüm süreçler için geçersiz kılar
+        
+        Damga çağıranın işlemi içinde yenilenir; bu sürecin önbelleği işlem
+        onaylandığında temizlenir.
+        """
+        if not season_ids:
+            return
+        
+        Season.objects.filter(pk__in=season_ids).update(price_version=time.time_ns())
+        entries = SeasonPriceMatrixService._pending_entries()
+        batch = getattr(SeasonPriceMatrixService._batch, 'matrices', None)
+        if batch is not None:
+            for season_id in season_ids:
+                batch.pop(season_id, None)
+        
+        def clear():
+            for season_id in season_ids:
+                cache.delete(SeasonPriceMatrixService.VERSION_KEY.format(season_id=season_id))
+                with SeasonPriceMatrixService._lock:
+                    SeasonPriceMatrixService._matrices.pop(season_id, None)
+                entries.pop(season_id, None)
+        
+        if transaction.get_connection().in_atomic_block:
+            for season_id in season_ids:
+                entry = entries.setdefault(season_id, {'callbacks': [], 'matrix': None})
+                entry['callbacks'].append(clear)
+                entry['matrix'] = None
+        
+        transaction.on_commit(clear)
+    
+    @staticmethod
+    def get_unit_price(season_product: SeasonProduct, stem_type: str, order_date: date) -> Decimal:
+        """Sezon ürününün teslimat ayına göre birim fiyatı"""
+        matrix = SeasonPriceMatrixService.get_matrix(season_product.season_id)
+        return matrix.unit_price(season_product.pk, stem_type, order_date)
+
+
+class SeasonPriceGridService:
+    """Sezon fiyatlarının toplu (ızgara) düzenlenmesi
+    
+    Hücre bazlı değişiklikler sadece değişen ürün ve alanlar için
+    bulk_update ile yazılır. Oransal/tutarsal toplu değişiklikler seçilen
+    ürünler üzerinde F() ifadeleriyle tek UPDATE olarak çalışır. Her iki
+    işlemde de dry_run ile veritabanına yazmadan önizleme alınabilir.
+    """
+    
+    PRICE_QUANTUM = Decimal('0.01')
+    MAX_PRICE = Decimal('99999999.99')
+    PREVIEW_LIMIT = 50
+    
+    @staticmethod
+    def get_products(
+        season_id: int,
+        species_id: Optional[int] = None,
+        variety_id: Optional[int] = None,
+        rootstock_id: Optional[int] = None,
+        product_ids: Optional[List[int]] = None
+    ) -> QuerySet[SeasonProduct]:
+        """Izgarada düzenlenecek sezon ürünleri"""
+        products = SeasonProduct.objects.filter(season_id=season_id)
+        if species_id:
+            products = products.filter(variety__species_id=species_id)
+        if variety_id:
+            products = products.filter(variety_id=variety_id)
+        if rootstock_id:
+            products = products.filter(rootstock_id=rootstock_id)
+        if product_ids is not None:
+            products = products.filter(id__in=product_ids)
+        return products
+    
+    @staticmethod
+    def get_grid(season_id: int, **filters) -> List[Dict]:
+        """Ürün başına 36 fiyat hücresini tek sorguda döner"""
+        price_fields = SeasonPriceMatrixService.price_fields()
+        rows = SeasonPriceGridService.get_products(season_id, **filters).order_by(
+            'variety__species__name', 'variety__name', 'rootstock__name', 'id'
+        ).values(
+            'id', 'variety__name', 'variety__species__name', 'rootstock__name', *price_fields
+        )
+        
+        return [
+            {
+                'id': row['id'],
+                'variety': row['variety__name'],
+                'species': row['variety__species__name'],
+                'rootstock': row['rootstock__name'],
+                'prices': {field: row[field] for field in price_fields},
+            }
+            for row in rows
+        ]
+    
+    @staticmethod
+    def parse_price(value) -> Decimal:
+        """Hücre değerini 2 haneli, negatif olmayan Decimal'a çevirir"""
+        try:
+            price = Decimal(str(value).replace(',', '.')).quantize(SeasonPriceGridService.PRICE_QUANTUM)
+        except (InvalidOperation, ValueError, TypeError):
+            raise ValueError('Geçersiz fiyat')
+        if price < 0 or price > SeasonPriceGridService.MAX_PRICE:
+            raise ValueError('Fiyat aralık dışında')
+        return price
+    
+    @staticmethod
+    def apply_changes(season_id: int, changes: Dict, dry_run: bool = False) -> Dict:
+        """Hücre değişikliklerini uygular: {ürün_id: {alan: fiyat}}
+        
+        Hatalı hücre varsa hiçbir değişiklik yazılmaz. Değeri zaten aynı olan
+        hücreler yok sayılır; aynı alan kümesi değişen ürünler tek
+        bulk_update ile güncellenir.
+        """
+        price_fields = set(SeasonPriceMatrixService.price_fields())
+        result = {
+            'success': True,
+            'dry_run': dry_run,
+            'updated_products': 0,
+            'updated_cells': 0,
+            'changes': [],
+            'errors': {}
+        }
+        
+        parsed = {}
+        for product_id, cells in changes.items():
+            try:
+                product_id = int(product_id)
+            except (TypeError, ValueError):
+                result['errors'][str(product_id)] = 'Geçersiz ürün'
+                continue
+            if not isinstance(cells, dict):
+                result['errors'][str(product_id)] = 'Geçersiz hücre listesi'
+                continue
+            for field, value in cells.items():
+                if field not in price_fields:
+                    result['errors'][f'{product_id}.{field}'] = 'Geçersiz fiyat alanı'
+                    continue
+                try:
+                    parsed.setdefault(product_id, {})[field] = SeasonPriceGridService.parse_price(value)
+                except ValueError as e:
+                    result['errors'][f'{product_id}.{field}'] = str(e)
+        
+        fields_needed = sorted({field for cells in parsed.values() for field in cells})
+        products = {
+            product.id: product
+            for product in SeasonProduct.objects.filter(
+                season_id=season_id, id__in=parsed
+            ).only('id', 'season_id', *fields_needed)
+        }
+        for product_id in parsed.keys() - products.keys():
+            result['errors'][str(product_id)] = 'Ürün bu sezonda bulunamadı'
+        
+        if result['errors']:
+            result['success'] = False
+            return result
+        
+        # Değişen alan kümesine göre grupla
+        groups = {}
+        for product_id, cells in parsed.items():
+            product = products[product_id]
+            changed_fields = []
+            for field, price in cells.items():
+                old_price = getattr(product, field)
+                if old_price == price:
+                    continue
+                result['changes'].append({'id': product_id, 'field': field, 'old': old_price, 'new': price})
+                setattr(product, field, price)
+                changed_fields.append(field)
+            if changed_fields:
+                groups.setdefault(tuple(sorted(changed_fields)), []).append(product)
+        
+        result['updated_products'] = sum(len(group) for group in groups.values())
+        result['updated_cells'] = len(result['changes'])
+        if dry_run or not groups:
+            return result
+        
+        now = timezone.now()
+        with transaction.atomic():
+            for fields, group in groups.items():
+                for product in group:
+                    product.updated_at = now
+                SeasonProduct.objects.bulk_update(group, [*fields, 'updated_at'])
+        
+        SeasonPriceMatrixService.invalidate(season_id)
+        return result
+    
+    @staticmethod
+    def adjust_prices(
+        season_id: int,
+        percent: Optional[Decimal] = None,
+        amount: Optional[Decimal] = None,
+        stem_types: Tuple[str, ...] = SeasonPriceMatrix.STEM_TYPES,
+        month_from: int = 1,
+        month_to: int = SeasonPriceMatrix.MONTHS,
+        dry_run: bool = False,
+        **filters
+    ) -> Dict:
+        """Seçilen ürün/gövde/ay hücrelerine oransal veya sabit tutarlı değişiklik uygular
+        
+        Örn. X türünün tek gövde 6-18. ay fiyatlarına %8 zam:
+        adjust_prices(season_id, percent=8, stem_types=('single',), month_from=6, species_id=X).
+        Yeni fiyat 2 haneye yuvarlanır ve sıfırın altına inmez.
+        """
+        if percent is None and amount is None:
+            raise ValueError('Yüzde veya tutar girilmelidir')
+        if not 1 <= month_from <= month_to <= SeasonPriceMatrix.MONTHS:
+            raise ValueError('Ay aralığı 1-18 arasında olmalıdır')
+        if not stem_types or set(stem_types) - set(SeasonPriceMatrix.STEM_TYPES):
+            raise ValueError('Geçersiz gövde tipi')
+        
+        fields = [
+            f'price_{stem_type}_stem_{month}'
+            for stem_type in stem_types
+            for month in range(month_from, month_to + 1)
+        ]
+        price_field = DecimalField(max_digits=10, decimal_places=2)
+        factor = Decimal('1') + Decimal(str(percent or 0)) / Decimal('100')
+        addition = Decimal(str(amount or 0))
+        expressions = {
+            field: Greatest(
+                Round(F(field) * Value(factor) + Value(addition), 2, output_field=price_field),
+                Value(Decimal('0.00')),
+                output_field=price_field
+            )
+            for field in fields
+        }
+        
+        products = SeasonPriceGridService.get_products(season_id, **filters)
+        result = {
+            'dry_run': dry_run,
+            'fields': fields,
+            'product_count': 0,
+            'preview': []
+        }
+        
+        if dry_run:
+            result['product_count'] = products.count()
+            preview_rows = products.order_by('id').annotate(
+                **{f'new_{field}': expression for field, expression in expressions.items()}
+            ).values('id', *fields, *[f'new_{field}' for field in fields])[:SeasonPriceGridService.PREVIEW_LIMIT]
+            for row in preview_rows:
+                result['preview'].append({
+                    'id': row['id'],
+                    'changes': {
+                        field: {'old': row[field], 'new': Decimal(str(row[f'new_{field}'])).quantize(SeasonPriceGridService.PRICE_QUANTUM)}
+                        for field in fields
+                    }
+                })
+            return result
+        
+        result['product_count'] = products.update(updated_at=timezone.now(), **expressions)
+        SeasonPriceMatrixService.invalidate(season_id)
+        return result
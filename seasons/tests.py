@@ -1,3 +1,213 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
 from django.test import TestCase
 
-# Create your tests here.
+from products.models import Rootstock, SeedBrand, Species, Variety
+
+from .models import Season, SeasonProduct
+from .services import SeasonPriceGridService, SeasonPriceMatrixService
+
+
+class SeasonPriceMatrixTests(TestCase):
+    """Sezon fiyat tablosunun önbelleği ve işlem içi geçerliliği"""
+    
+    ORDER_DATE = date(2026, 1, 10)
+    
+    @classmethod
+    def setUpTestData(cls):
+        species = Species.objects.create(name='Domates')
+        seed_brand = SeedBrand.objects.create(name='Marka', price_per_packet=10, seeds_per_packet=100)
+        variety = Variety.objects.create(name='Çeşit', species=species, seed_brand=seed_brand)
+        rootstock = Rootstock.objects.create(name='Anaç', species=species)
+        cls.season = Season.objects.create(name='2026', start_date=date(2026, 1, 1))
+        # Tek gövde 60, çift gövde 70 gün: 10 Ocak siparişi Mart'ta (3. ay) teslim
+        cls.product = SeasonProduct.objects.create(
+            season=cls.season, variety=variety, rootstock=rootstock,
+            rootstock_planting_duration=20, scion_planting_duration=10, waiting_on_room_duration=0,
+            head_formation_duration=10, single_stem_grafting_duration=20, double_stem_grafting_duration=30,
+            price_single_stem_3=Decimal('1.25'), price_double_stem_3=Decimal('2.50')
+        )
+    
+    def setUp(self):
+        # Süreç içi tablolar ve damgalar testler arasında taşınmasın
+        cache.clear()
+        SeasonPriceMatrixService._matrices.clear()
+        SeasonPriceMatrixService._pending.entries = {}
+    
+    def unit_price(self, stem_type='single'):
+        matrix = SeasonPriceMatrixService.get_matrix(self.season.pk)
+        return matrix.unit_price(self.product.pk, stem_type, self.ORDER_DATE)
+    
+    def set_single_price(self, price):
+        product = SeasonProduct.objects.get(pk=self.product.pk)
+        product.price_single_stem_3 = price
+        product.save()
+    
+    def test_matrix_prices_and_delivery_dates(self):
+        matrix = SeasonPriceMatrixService.get_matrix(self.season.pk)
+        
+        self.assertIn(self.product.pk, matrix)
+        self.assertEqual(matrix.delivery_date(self.product.pk, 'single', self.ORDER_DATE), date(2026, 3, 11))
+        self.assertEqual(matrix.delivery_date(self.product.pk, 'double', self.ORDER_DATE), date(2026, 3, 21))
+        self.assertEqual(self.unit_price('single'), Decimal('1.25'))
+        self.assertEqual(self.unit_price('double'), Decimal('2.50'))
+        # Tabloda olmayan ürün
+        self.assertIsNone(matrix.delivery_date(0, 'single', self.ORDER_DATE))
+        self.assertEqual(matrix.unit_price(0, 'single', self.ORDER_DATE), Decimal('0.00'))
+    
+    def test_loaded_matrix_is_reused_without_queries(self):
+        SeasonPriceMatrixService.get_matrix(self.season.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unit_price(), Decimal('1.25'))
+    
+    def test_uncommitted_change_is_memoized_for_the_transaction(self):
+        self.assertEqual(self.unit_price(), Decimal('1.25'))
+        
+        self.set_single_price(Decimal('3.00'))
+        self.assertEqual(self.unit_price(), Decimal('3.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unit_price(), Decimal('3.00'))
+    
+    def test_rolled_back_change_is_dropped(self):
+        self.assertEqual(self.unit_price(), Decimal('1.25'))
+        
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.set_single_price(Decimal('3.00'))
+                self.assertEqual(self.unit_price(), Decimal('3.00'))
+                raise RuntimeError
+        
+        self.assertEqual(self.unit_price(), Decimal('1.25'))
+        self.assertEqual(SeasonPriceMatrixService._pending.entries, {})
+    
+    def test_committed_change_refreshes_process_cache(self):
+        stale = SeasonPriceMatrixService.get_matrix(self.season.pk)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.set_single_price(Decimal('4.00'))
+        
+        self.assertNotIn(self.season.pk, SeasonPriceMatrixService._pending.entries)
+        matrix = SeasonPriceMatrixService.get_matrix(self.season.pk)
+        self.assertIsNot(matrix, stale)
+        self.assertEqual(matrix.version, Season.objects.get(pk=self.season.pk).price_version)
+        self.assertEqual(self.unit_price(), Decimal('4.00'))
+    
+    def test_batch_resolves_each_season_once(self):
+        with SeasonPriceMatrixService.batch():
+            first = SeasonPriceMatrixService.get_matrix(self.season.pk)
+            with self.assertNumQueries(0):
+                self.assertIs(SeasonPriceMatrixService.get_matrix(self.season.pk), first)
+            
+            # Blok içindeki değişiklik tablodan düşülür
+            self.set_single_price(Decimal('5.00'))
+            self.assertEqual(self.unit_price(), Decimal('5.00'))
+
+
+class SeasonPriceGridTests(TestCase):
+    """Fiyat ızgarasında hücre ve oransal toplu değişiklikler"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.species = Species.objects.create(name='Biber')
+        other_species = Species.objects.create(name='Patlıcan')
+        seed_brand = SeedBrand.objects.create(name='Marka', price_per_packet=10, seeds_per_packet=100)
+        cls.season = Season.objects.create(name='2026', start_date=date(2026, 1, 1))
+        cls.other_season = Season.objects.create(name='2027', start_date=date(2027, 1, 1))
+        cls.products = [
+            SeasonProduct.objects.create(
+                season=cls.season,
+                variety=Variety.objects.create(name=f'Çeşit {index}', species=species, seed_brand=seed_brand),
+                price_single_stem_1=Decimal('10.00'), price_single_stem_2=Decimal('10.00'),
+                price_double_stem_1=Decimal('20.00')
+            )
+            for index, species in enumerate([cls.species, cls.species, other_species])
+        ]
+        cls.foreign_product = SeasonProduct.objects.create(
+            season=cls.other_season, variety=cls.products[0].variety
+        )
+    
+    def prices(self, *fields):
+        return {
+            row[0]: row[1:]
+            for row in SeasonProduct.objects.filter(season=self.season).values_list('id', *fields)
+        }
+    
+    def test_apply_changes_writes_only_changed_cells(self):
+        first, second, _ = self.products
+        changes = {
+            str(first.pk): {'price_single_stem_1': '12,5', 'price_single_stem_2': '10'},
+            second.pk: {'price_double_stem_1': 21},
+        }
+        
+        preview = SeasonPriceGridService.apply_changes(self.season.pk, changes, dry_run=True)
+        self.assertTrue(preview['success'])
+        self.assertEqual((preview['updated_products'], preview['updated_cells']), (2, 2))
+        self.assertEqual(self.prices('price_single_stem_1')[first.pk], (Decimal('10.00'),))
+        
+        result = SeasonPriceGridService.apply_changes(self.season.pk, changes)
+        self.assertEqual(
+            sorted((change['id'], change['field'], change['new']) for change in result['changes']),
+            [
+                (first.pk, 'price_single_stem_1', Decimal('12.50')),
+                (second.pk, 'price_double_stem_1', Decimal('21.00')),
+            ]
+        )
+        prices = self.prices('price_single_stem_1', 'price_double_stem_1')
+        self.assertEqual(prices[first.pk], (Decimal('12.50'), Decimal('20.00')))
+        self.assertEqual(prices[second.pk], (Decimal('10.00'), Decimal('21.00')))
+    
+    def test_apply_changes_rejects_whole_batch_on_error(self):
+        first = self.products[0]
+        result = SeasonPriceGridService.apply_changes(self.season.pk, {
+            first.pk: {'price_single_stem_1': '11', 'price_single_stem_19': '1', 'price_double_stem_1': '-1'},
+            self.foreign_product.pk: {'price_single_stem_1': '1'},
+            'x': {},
+        })
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['errors'], {
+            f'{first.pk}.price_single_stem_19': 'Geçersiz fiyat alanı',
+            f'{first.pk}.price_double_stem_1': 'Fiyat aralık dışında',
+            str(self.foreign_product.pk): 'Ürün bu sezonda bulunamadı',
+            'x': 'Geçersiz ürün',
+        })
+        self.assertEqual(self.prices('price_single_stem_1')[first.pk], (Decimal('10.00'),))
+    
+    def test_adjust_prices_dry_run_previews_without_writing(self):
+        result = SeasonPriceGridService.adjust_prices(
+            self.season.pk, percent=Decimal('8'), stem_types=('single',), month_from=2, month_to=2,
+            dry_run=True, species_id=self.species.pk
+        )
+        
+        self.assertEqual(result['fields'], ['price_single_stem_2'])
+        self.assertEqual(result['product_count'], 2)
+        self.assertEqual(
+            [row['changes']['price_single_stem_2'] for row in result['preview']],
+            [{'old': Decimal('10.00'), 'new': Decimal('10.80')}] * 2
+        )
+        self.assertEqual(set(self.prices('price_single_stem_2').values()), {(Decimal('10.00'),)})
+    
+    def test_adjust_prices_updates_selected_cells(self):
+        result = SeasonPriceGridService.adjust_prices(
+            self.season.pk, amount=Decimal('-15'), stem_types=('single', 'double'), month_from=1, month_to=1,
+            species_id=self.species.pk
+        )
+        
+        self.assertEqual(result['product_count'], 2)
+        prices = self.prices('price_single_stem_1', 'price_single_stem_2', 'price_double_stem_1')
+        first, second, other = self.products
+        # Fiyatlar sıfırın altına inmez, seçilmeyen ay ve türler değişmez
+        for product in (first, second):
+            self.assertEqual(prices[product.pk], (Decimal('0.00'), Decimal('10.00'), Decimal('5.00')))
+        self.assertEqual(prices[other.pk], (Decimal('10.00'), Decimal('10.00'), Decimal('20.00')))
+    
+    def test_adjust_prices_validates_arguments(self):
+        with self.assertRaises(ValueError):
+            SeasonPriceGridService.adjust_prices(self.season.pk)
+        with self.assertRaises(ValueError):
+            SeasonPriceGridService.adjust_prices(self.season.pk, percent=5, month_from=3, month_to=2)
+        with self.assertRaises(ValueError):
+            SeasonPriceGridService.adjust_prices(self.season.pk, percent=5, stem_types=('triple',))
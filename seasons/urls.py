@@ -19,8 +19,11 @@ urlpatterns = [
     path('<int:season_id>/products/<int:product_id>/delete/', views.season_product_delete, name='season_product_delete'),
     path('<int:season_id>/products/<int:product_id>/quick-price-update/', 
          views.season_product_quick_price_update, name='season_product_quick_price_update'),
+    path('<int:season_id>/products/price-grid/', views.season_price_grid, name='season_price_grid'),
     
     # API URLs
     path('api/<int:season_id>/products/', views.api_season_products, name='api_season_products'),
     path('api/<int:season_id>/statistics/', views.api_season_statistics, name='api_season_statistics'),
+    path('api/<int:season_id>/price-grid/', views.api_season_price_grid, name='api_season_price_grid'),
+    path('api/<int:season_id>/price-grid/adjust/', views.api_season_price_adjust, name='api_season_price_adjust'),
 ]
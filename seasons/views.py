@@ -10,13 +10,13 @@ import json
 from decimal import Decimal
 
 from .models import Season, SeasonProduct
-from .services import SeasonService, SeasonProductService
+from .services import SeasonService, SeasonProductService, SeasonPriceGridService
 from .utils import (
     format_season_name, get_price_fields_mapping, get_duration_fields_mapping,
     validate_price_data, validate_duration_data, get_season_statistics,
     export_season_products_data, check_season_completeness
 )
-from products.models import Variety, Rootstock
+from products.models import Variety, Rootstock, Species
 
 
 def season_list(request):
@@ -371,6 +371,104 @@ def season_product_quick_price_update(request, season_id, product_id):
         return JsonResponse({'success': False, 'error': str(e)})
 
 
+def _price_grid_filters(data) -> dict:
+    """İstek verisinden ızgara ürün filtrelerini okur"""
+    filters = {}
+    for key in ('species_id', 'variety_id', 'rootstock_id'):
+        value = data.get(key)
+        if value not in (None, ''):
+            filters[key] = int(value)
+    return filters
+
+
+def season_price_grid(request, season_id):
+    """Sezon fiyat ızgarası - çok sayıda ürün fiyatını tek ekranda düzenleme"""
+    season = get_object_or_404(Season, id=season_id)
+    stem_type = 'double' if request.GET.get('stem') == 'double' else 'single'
+    
+    try:
+        filters = _price_grid_filters(request.GET)
+    except ValueError:
+        filters = {}
+    
+    grid = SeasonPriceGridService.get_grid(season_id, **filters)
+    months = list(range(1, 19))
+    for row in grid:
+        row['cells'] = [
+            {'field': f'price_{stem_type}_stem_{month}', 'value': row['prices'][f'price_{stem_type}_stem_{month}']}
+            for month in months
+        ]
+    
+    context = {
+        'season': season,
+        'grid': grid,
+        'months': months,
+        'stem_type': stem_type,
+        'filters': filters,
+        'species_list': Species.objects.order_by('name'),
+        'rootstocks': Rootstock.objects.filter(is_active=True).order_by('name'),
+        'page_title': f'{season.name} - Fiyat Izgarası'
+    }
+    return render(request, 'seasons/season_price_grid.html', context)
+
+
+@require_http_methods(["GET", "POST"])
+def api_season_price_grid(request, season_id):
+    """Fiyat ızgarası API
+    
+    GET: ürün başına 36 fiyat hücresi.
+    POST: {"changes": {"<ürün id>": {"price_single_stem_1": "12.50"}}, "dry_run": false}
+    """
+    season = get_object_or_404(Season, id=season_id)
+    
+    if request.method == 'GET':
+        try:
+            filters = _price_grid_filters(request.GET)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Geçersiz filtre'}, status=400)
+        return JsonResponse({'success': True, 'products': SeasonPriceGridService.get_grid(season.id, **filters)})
+    
+    try:
+        data = json.loads(request.body)
+        changes = data.get('changes') or {}
+        if not isinstance(changes, dict):
+            raise ValueError('changes bir sözlük olmalıdır')
+    except (ValueError, AttributeError) as e:
+        return JsonResponse({'success': False, 'error': f'Geçersiz veri: {e}'}, status=400)
+    
+    result = SeasonPriceGridService.apply_changes(season.id, changes, dry_run=bool(data.get('dry_run')))
+    return JsonResponse(result, status=200 if result['success'] else 400)
+
+
+@require_http_methods(["POST"])
+def api_season_price_adjust(request, season_id):
+    """Toplu fiyat değişikliği API
+    
+    {"percent": 8, "stem_types": ["single"], "month_from": 6, "month_to": 18,
+    "species_id": 3, "dry_run": true} - amount ile sabit tutar da eklenebilir.
+    """
+    season = get_object_or_404(Season, id=season_id)
+    
+    try:
+        data = json.loads(request.body)
+        percent = data.get('percent')
+        amount = data.get('amount')
+        result = SeasonPriceGridService.adjust_prices(
+            season.id,
+            percent=Decimal(str(percent)) if percent not in (None, '') else None,
+            amount=Decimal(str(amount)) if amount not in (None, '') else None,
+            stem_types=tuple(data.get('stem_types') or ('single', 'double')),
+            month_from=int(data.get('month_from') or 1),
+            month_to=int(data.get('month_to') or 18),
+            dry_run=bool(data.get('dry_run')),
+            **_price_grid_filters(data)
+        )
+    except (ValueError, TypeError, AttributeError, ArithmeticError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({'success': True, **result})
+
+
 def season_export(request, season_id):
     """Sezon verilerini export et"""
     season = get_object_or_404(Season, id=season_id)